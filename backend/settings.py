@@ -43,6 +43,17 @@ LOCAL_CHURCH_REDIRECT_ENABLED = os.environ.get('LOCAL_CHURCH_REDIRECT_ENABLED',
 LOCAL_CHURCH_REDIRECT_MIN_SCORE = int(os.environ.get('LOCAL_CHURCH_REDIRECT_MIN_SCORE', '100'))  # Minimum score for redirect
 LOCAL_CHURCH_REDIRECT_MAX_DISTANCE_KM = int(os.environ.get('LOCAL_CHURCH_REDIRECT_MAX_DISTANCE_KM', '50'))  # Max distance in km
 
+# Visitor IP geolocation (core.geoip): offline MaxMind .mmdb or CSV range file, loaded once per process.
+# The ipapi.co / ip-api.com lookups block the request, so they only run when GEOIP_HTTP_FALLBACK=True.
+GEOIP_DATABASE_PATH = os.environ.get('GEOIP_DATABASE_PATH', str(BASE_DIR / 'geoip' / 'GeoLite2-City.mmdb'))
+GEOIP_CACHE_SIZE = int(os.environ.get('GEOIP_CACHE_SIZE', '4096'))  # LRU entries, keyed by IP
+GEOIP_HTTP_FALLBACK = os.environ.get('GEOIP_HTTP_FALLBACK', 'False') == 'True'
+GEOIP_HTTP_TIMEOUT = float(os.environ.get('GEOIP_HTTP_TIMEOUT', '2'))
+
+# Page-view tracking (core.analytics_tracking): hits are buffered per worker and bulk-written
+ANALYTICS_FLUSH_INTERVAL = float(os.environ.get('ANALYTICS_FLUSH_INTERVAL', '5'))  # seconds
+ANALYTICS_BUFFER_MAX = int(os.environ.get('ANALYTICS_BUFFER_MAX', '10000'))  # oldest hits dropped beyond this
+
 # Database: PostgreSQL in production or local SQLite
 if USE_PROD_DB:
     raw_db_url = os.environ.get("DATABASE_URL", "")
@@ -114,6 +125,7 @@ INSTALLED_APPS = [
 
 # Middleware - Optimized for production
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',  # Per-view latency/query metrics at /metrics (first, to time everything)
     'core.middleware.AllowProductionHostMiddleware',  # Allow production host before Django's host check
     'core.middleware.CanonicalHostSitemapMiddleware',  # Sitemap/robots use SITE_DOMAIN for Google Search Console
     'django.middleware.security.SecurityMiddleware',
@@ -127,6 +139,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'core.middleware.DatabaseIndependentMiddleware',
+    'core.middleware.AnalyticsTrackingMiddleware',
 ]
 
 # URL config
@@ -145,6 +158,8 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.global_settings',
+                'core.context_processors.navigation',
+                'core.context_processors.page_cache',
             ],
             # Memory optimization: Disable template caching in development
             'debug': DEBUG,
@@ -201,6 +216,10 @@ CORS_ALLOW_ALL_ORIGINS = True
 SITE_ID = 1
 # Set SITE_DOMAIN in .env to your production domain (e.g. www.bethel.org) for sitemap/SEO
 SITE_DOMAIN = os.environ.get('SITE_DOMAIN', '').strip()
+# Precomputed sitemap files (python manage.py build_sitemaps; /sitemap.xml also rebuilds on demand)
+SITEMAP_ROOT = os.environ.get('SITEMAP_ROOT', str(BASE_DIR / 'sitemaps'))
+SITEMAP_PAGE_SIZE = int(os.environ.get('SITEMAP_PAGE_SIZE', '50000'))  # URLs per file (protocol maximum)
+SITEMAP_PROTOCOL = os.environ.get('SITEMAP_PROTOCOL', 'https')
 # Public links in emails, calendar .ics, push — always use the live site visitors use
 CANONICAL_PUBLIC_DOMAIN = (
     os.environ.get('CANONICAL_PUBLIC_DOMAIN', '').strip()
@@ -221,17 +240,46 @@ else:
     SESSION_SAVE_EVERY_REQUEST = True
     SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
-# Memory optimization: Cache settings (simple in-memory cache)
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
-        'TIMEOUT': 60,  # Reduced to 1 minute
-        'OPTIONS': {
-            'MAX_ENTRIES': 100,  # Reduced from 1000
+# Cache: 'sqlite' (default) is one WAL-mode file shared by all gunicorn workers and
+# kept across worker recycling, with a small in-process L1 (core.cache_backends).
+# 'locmem' is per worker; 'file' is Django's file-based cache. Cached values are
+# pickled, so CACHE_ROOT must only be writable by the app user (never /tmp).
+CACHE_ROOT = os.environ.get('CACHE_ROOT', str(BASE_DIR / 'cache'))
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'sqlite')
+if CACHE_BACKEND == 'locmem':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'unique-snowflake',
+            'TIMEOUT': 60,  # Reduced to 1 minute
+            'OPTIONS': {
+                'MAX_ENTRIES': 100,  # Reduced from 1000
+            }
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_FILE_DIR', os.path.join(CACHE_ROOT, 'files')),
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 5000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.SQLiteCache',
+            'LOCATION': os.environ.get('CACHE_SQLITE_PATH', os.path.join(CACHE_ROOT, 'bethel_cache.sqlite3')),
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'MAX_ENTRIES': 20000,
+                'L1_MAX_ENTRIES': 512,
+                'L1_TIMEOUT': 2,  # seconds before another worker's write is seen
+                'L1_EXCLUDE': ('bethel:version:',),  # version counters are always read fresh
+            },
         }
     }
-}
 
 # Memory optimization: Logging (reduce verbosity)
 LOGGING = {
@@ -294,9 +342,11 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
-        'user': '1000/hour'
+        'user': '1000/hour',
+        'api_v1': os.environ.get('API_V1_THROTTLE_RATE', '3600/hour'),  # polled by the PWA and church apps
     }
 }
+API_CACHE_MAX_AGE = int(os.environ.get('API_CACHE_MAX_AGE', '60'))  # seconds; clients revalidate with If-None-Match
 
 # OTP / MFA (TOTP) for local admin
 OTP_TOTP_ISSUER = os.environ.get('OTP_TOTP_ISSUER', 'Bethel Church Admin')
@@ -308,6 +358,42 @@ WEBPUSH_VAPID_ADMIN_EMAIL = os.environ.get(
     'WEBPUSH_VAPID_ADMIN_EMAIL',
     'admin@bethelprayerministryinternational.com',
 ).strip()
+# Fan-out (core.push_notifications): queued off the request path, sent concurrently
+WEBPUSH_ASYNC = os.environ.get('WEBPUSH_ASYNC', 'True') == 'True'
+WEBPUSH_MAX_WORKERS = int(os.environ.get('WEBPUSH_MAX_WORKERS', '16'))
+WEBPUSH_MAX_RETRIES = int(os.environ.get('WEBPUSH_MAX_RETRIES', '3'))  # for 429/5xx and network errors
+WEBPUSH_TIMEOUT = float(os.environ.get('WEBPUSH_TIMEOUT', '10'))
+
+# Video uploads are re-encoded by `manage.py process_media_jobs`
+MEDIA_TRANSCODE_TIMEOUT = int(os.environ.get('MEDIA_TRANSCODE_TIMEOUT', '1800'))  # seconds per ffmpeg run
+
+# Background database probe and circuit breaker (core.db_health)
+DB_HEALTH_ENABLED = os.environ.get('DB_HEALTH_ENABLED', 'True') == 'True'
+DB_HEALTH_INTERVAL = float(os.environ.get('DB_HEALTH_INTERVAL', '5'))  # seconds between probes
+DB_HEALTH_TIMEOUT = float(os.environ.get('DB_HEALTH_TIMEOUT', '5'))  # a probe hanging longer opens the circuit
+DB_HEALTH_FAILURE_THRESHOLD = int(os.environ.get('DB_HEALTH_FAILURE_THRESHOLD', '3'))  # failed probes before opening
+
+# Per-view request metrics (core.metrics), scraped from /metrics by staff or with METRICS_TOKEN
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'True') == 'True'
+METRICS_FLUSH_INTERVAL = int(os.environ.get('METRICS_FLUSH_INTERVAL', '10'))  # seconds between flushes to the shared cache
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '').strip()  # "Authorization: Bearer <token>" for Prometheus
+METRICS_QUERY_BUDGETS = {}  # view name -> max queries; overrides @query_budget
+
+# Transactional email is queued (core.outbox) and sent by `manage.py send_outbox`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_RETRY_DELAY = int(os.environ.get('EMAIL_OUTBOX_RETRY_DELAY', '60'))  # seconds, doubled per attempt
+EMAIL_OUTBOX_CHURCH_RATE = int(os.environ.get('EMAIL_OUTBOX_CHURCH_RATE', '100'))  # per church per hour; 0 = no limit
+
+# Responsive image renditions (core.renditions); batch with `manage.py generate_renditions`
+IMAGE_RENDITIONS_LAZY = os.environ.get('IMAGE_RENDITIONS_LAZY', 'True') == 'True'
+# Seconds before a missing or unreadable source image is tried again
+IMAGE_RENDITIONS_RETRY_AFTER = int(os.environ.get('IMAGE_RENDITIONS_RETRY_AFTER', '600'))
+
+# Anonymous full-page cache for public pages (core.page_cache)
+PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', 'True') == 'True'
+PAGE_CACHE_TIMEOUT = int(os.environ.get('PAGE_CACHE_TIMEOUT', '300'))  # seconds; content changes invalidate sooner
+CONDITIONAL_GET_ENABLED = os.environ.get('CONDITIONAL_GET_ENABLED', 'True') == 'True'  # ETag/Last-Modified 304s (core.conditional)
 
 # Local storage initialization completed
 print("Local Django file storage configured")
@@ -18,37 +18,11 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
-from django.contrib.sitemaps.views import sitemap
-from django.contrib.sites.shortcuts import get_current_site
 from django.http import HttpResponse
 
-from core.sitemaps import (
-    StaticViewSitemap,
-    ChurchSitemap,
-    ChurchLocationSitemap,
-    ChurchPagesSitemap,
-    EventSitemap,
-    ChurchEventSitemap,
-    MinistrySitemap,
-    ChurchMinistrySitemap,
-    NewsSitemap,
-)
 from core.views import church_detail_by_location, custom_error_500, custom_error_404, custom_error_403, custom_error_400
 from core.views_push import apple_touch_icon, service_worker_js, web_app_manifest
 
-# Sitemaps for SEO (churches/events/ministries/news included; new churches appear automatically)
-sitemaps = {
-    'static': StaticViewSitemap,
-    'churches': ChurchSitemap,
-    'church_locations': ChurchLocationSitemap,
-    'church_pages': ChurchPagesSitemap,
-    'events': EventSitemap,
-    'church_events': ChurchEventSitemap,
-    'ministries': MinistrySitemap,
-    'church_ministries': ChurchMinistrySitemap,
-    'news': NewsSitemap,
-}
-
 
 def robots_txt(request):
     """Serve robots.txt allowing crawlers and pointing to sitemap."""
@@ -70,34 +44,13 @@ def robots_txt(request):
     return HttpResponse("\n".join(lines), content_type="text/plain")
 
 
-def sitemap_with_canonical_domain(request, **kwargs):
-    """Serve sitemap using SITE_DOMAIN as the domain so URLs show your real domain, not example.com."""
-    site_domain = getattr(settings, 'SITE_DOMAIN', '').strip()
-    if site_domain:
-        # Django sitemap uses get_current_site(request).domain; patch it so we use SITE_DOMAIN
-        from types import SimpleNamespace
-        _real_get_current_site = get_current_site
-        _fake_site = SimpleNamespace(domain=site_domain, name=site_domain.split('.')[0] or 'Site')
-
-        def _patched_get_current_site(req):
-            return _fake_site
-
-        import django.contrib.sites.shortcuts as shortcuts_module
-        shortcuts_module.get_current_site = _patched_get_current_site
-        try:
-            return sitemap(request, **kwargs)
-        finally:
-            shortcuts_module.get_current_site = _real_get_current_site
-    return sitemap(request, **kwargs)
-
-
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('sw.js', service_worker_js, name='service_worker'),
     path('manifest.webmanifest', web_app_manifest, name='web_app_manifest'),
     path('apple-touch-icon.png', apple_touch_icon, name='apple_touch_icon'),
     path('robots.txt', robots_txt),
-    path('sitemap.xml', sitemap_with_canonical_domain, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    # /sitemap.xml and /sitemaps/*.xml.gz: precomputed files, see core.urls and core.sitemap_files
     # Location-based church URL (e.g. /churches/germany/hamburg/) – before core.urls so it matches
     path('churches/<str:country_slug>/<str:city_slug>/', church_detail_by_location, name='church_detail_by_location'),
     path('', include('core.urls')),
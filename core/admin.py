@@ -13,12 +13,12 @@ from .models import (
     Church, ChurchAdmin, Event, Ministry, News, Sermon, 
     DonationMethod, Convention,
     NewsletterSignup, Hero, LocalHero, ChurchApplication, GlobalFeatureRequest, Testimony, AboutPage, LeadershipPage, LocalLeadershipPage, LocalAboutPage, MinistryJoinRequest,
-    PushSubscription,
+    PushSubscription, MediaTranscodeJob, OutboundEmail,
     EventRegistration, EventHighlight, EventSpeaker, EventScheduleItem, EventHeroMedia, HeroMedia, GlobalSettings, LiveStreamSettings
 )
 from .analytics_models import VisitorSession, PageView, AnalyticsSettings
 from django.utils import timezone
-from django.core.mail import send_mail
+from .outbox import enqueue_email
 from .admin_utils import EnhancedImagePreviewMixin
 
 from .models import HeroMedia
@@ -864,7 +864,8 @@ class EventHeroMediaInline(admin.StackedInline):
     form = EventHeroMediaForm
     extra = 3  # Allow adding 3 new media items at once
     max_num = 10  # Maximum 10 media items per event
-    fields = ('image', 'video', 'order')
+    fields = ('image', 'video', 'video_status', 'order')
+    readonly_fields = ('video_status',)
     verbose_name = "Event Media"
     verbose_name_plural = "Event Media"
     help_text = "Add images and videos for your event. Images will be used on event cards and in the hero carousel. Videos will appear in the hero carousel. You can add up to 10 media items."
@@ -972,13 +973,12 @@ class MinistryJoinRequestAdmin(LocalAdminMixin, admin.ModelAdmin):
     def mark_as_reviewed(self, request, queryset):
         for obj in queryset:
             if not obj.is_reviewed:
-                # Send email notification
-                send_mail(
-                    subject='Your Ministry Join Request Has Been Reviewed',
-                    message=f"Dear {obj.name},\n\nYour request to join the ministry '{obj.ministry.name}' at {obj.church.name} has been reviewed by our team. We appreciate your interest and will be in touch if any further steps are needed.\n\nGod bless you!\n\nBethel Church Team",
-                    from_email=None,  # Use DEFAULT_FROM_EMAIL
-                    recipient_list=[obj.email],
-                    fail_silently=True,
+                # Queue email notification (sent by send_outbox)
+                enqueue_email(
+                    'Your Ministry Join Request Has Been Reviewed',
+                    f"Dear {obj.name},\n\nYour request to join the ministry '{obj.ministry.name}' at {obj.church.name} has been reviewed by our team. We appreciate your interest and will be in touch if any further steps are needed.\n\nGod bless you!\n\nBethel Church Team",
+                    [obj.email],
+                    church=obj.church,
                 )
         queryset.update(is_reviewed=True)
 
@@ -1179,10 +1179,10 @@ class SermonForm(forms.ModelForm):
 
 class SermonAdmin(EnhancedImagePreviewMixin, LocalAdminMixin, admin.ModelAdmin):
     form = SermonForm
-    list_display = ['title', 'church', 'preacher', 'date', 'created_at']
+    list_display = ['title', 'church', 'preacher', 'date', 'video_status', 'created_at']
     list_filter = ['date', 'created_at']
     search_fields = ['title', 'description', 'preacher', 'church__name']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'video_status', 'created_at', 'updated_at']
     
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -1208,7 +1208,7 @@ class SermonAdmin(EnhancedImagePreviewMixin, LocalAdminMixin, admin.ModelAdmin):
             'fields': ('scripture_reference', 'scripture_text')
         }),
         ('Media', {
-            'fields': ('audio_file', 'video_file', 'thumbnail', 'link')
+            'fields': ('audio_file', 'video_file', 'video_status', 'thumbnail', 'link')
         }),
         ('Details', {
             'fields': ('duration', 'language')
@@ -1380,7 +1380,8 @@ class HeroMediaInline(admin.TabularInline):
     form = HeroMediaForm
     extra = 3  # Allow adding 3 new media items at once
     max_num = 10  # Maximum 10 media items per hero
-    fields = ('image', 'video', 'order')
+    fields = ('image', 'video', 'video_status', 'order')
+    readonly_fields = ('video_status',)
     verbose_name = "Hero Media Item"
     verbose_name_plural = "Hero Media Items"
     help_text = "Add multiple images and videos for the hero carousel. Images and videos will be displayed in order. You can add up to 10 media items."
@@ -1595,10 +1596,10 @@ class LocalHeroAdmin(LocalAdminMixin, admin.ModelAdmin):
 
 class HeroAdmin(GlobalAdminMixin, admin.ModelAdmin):
     form = HeroForm
-    list_display = ['title', 'is_active', 'is_global_featured', 'order', 'created_at']
+    list_display = ['title', 'is_active', 'is_global_featured', 'order', 'video_status', 'created_at']
     list_filter = ['is_active', 'is_global_featured', 'created_at']
     search_fields = ['title', 'subtitle']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'video_status', 'created_at', 'updated_at']
     inlines = [HeroMediaInline]
     
     def get_inline_instances(self, request, obj=None):
@@ -1611,7 +1612,7 @@ class HeroAdmin(GlobalAdminMixin, admin.ModelAdmin):
     
     fieldsets = (
         ('Hero Information', {
-            'fields': ('title', 'subtitle', 'background_type', 'background_image', 'background_video')
+            'fields': ('title', 'subtitle', 'background_type', 'background_image', 'background_video', 'video_status')
         }),
         ('Hero Media', {
             'fields': (),  # No direct fields, managed via HeroMediaInline
@@ -2281,6 +2282,55 @@ class PushSubscriptionAdmin(admin.ModelAdmin):
     readonly_fields = ('endpoint', 'p256dh_key', 'auth_key', 'user_agent', 'created_at', 'updated_at')
 
 
+@admin.register(MediaTranscodeJob)
+class MediaTranscodeJobAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'status', 'progress_display', 'attempts', 'size_display', 'created_at', 'finished_at')
+    list_filter = ('status', 'model_label')
+    search_fields = ('object_id', 'source_name', 'output_name', 'error')
+    readonly_fields = [f.name for f in MediaTranscodeJob._meta.fields]
+    actions = ['retry_jobs']
+
+    def progress_display(self, obj):
+        return f"{obj.progress}%"
+    progress_display.short_description = 'Progress'
+
+    def size_display(self, obj):
+        if obj.original_size and obj.output_size:
+            return f"{obj.original_size / 1048576:.1f} MB → {obj.output_size / 1048576:.1f} MB"
+        return "-"
+    size_display.short_description = 'Size'
+
+    def retry_jobs(self, request, queryset):
+        jobs = queryset.filter(status='failed')
+        for job in jobs:
+            model = job._meta.apps.get_model('core', job.model_label)
+            model.objects.filter(pk=job.object_id, **{job.field_name: job.source_name}).update(video_status='queued')
+        updated = jobs.update(status='pending', progress=0, error='', finished_at=None)
+        self.message_user(request, f"{updated} job(s) queued again.")
+    retry_jobs.short_description = "Retry failed jobs"
+
+    def has_add_permission(self, request):
+        return False  # Jobs are created when videos are uploaded
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients_display', 'church', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'church')
+    search_fields = ('subject', 'to', 'error')
+    readonly_fields = [f.name for f in OutboundEmail._meta.fields]
+    actions = ['retry_emails']
 
+    def recipients_display(self, obj):
+        return ', '.join(obj.to)
+    recipients_display.short_description = 'To'
 
+    def retry_emails(self, request, queryset):
+        updated = queryset.filter(status='failed').update(
+            status='pending', attempts=0, error='', next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} email(s) queued again.")
+    retry_emails.short_description = "Retry failed emails"
 
+    def has_add_permission(self, request):
+        return False  # Emails are queued by the site (core.outbox)
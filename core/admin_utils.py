@@ -1,6 +1,8 @@
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 
+from .renditions import rendition_url
+
 class EnhancedImagePreviewMixin:
     """
     Mixin to provide enhanced image preview methods for Django admin
@@ -27,6 +29,8 @@ class EnhancedImagePreviewMixin:
                 # Get the URL method if it exists, otherwise use the field directly
                 url_method = getattr(obj, f'get_{field_name}_url', None)
                 image_url = url_method() if url_method else image_field.url
+                # Show a small rendition (retina-sized); the click still opens the original
+                preview_url = image_url if image_url.startswith('http') else rendition_url(image_field, max_width * 2)
                 
                 # Determine border radius
                 radius = '50%' if is_circular else f'{border_radius}px'
@@ -37,7 +41,7 @@ class EnhancedImagePreviewMixin:
                     '<img src="{}" class="enhanced-image-preview" style="max-width: {}px; max-height: {}px; '
                     'border-radius: {}; box-shadow: 0 6px 20px rgba(0,0,0,0.15); '
                     'object-fit: cover; cursor: pointer; transition: transform 0.2s ease-in-out;" '
-                    'onclick="window.open(this.src, \'_blank\')" '
+                    'onclick="window.open(\'{}\', \'_blank\')" '
                     'title="Click to view full size" />'
                     '<div class="image-preview-overlay">'
                     '<div class="overlay-content">'
@@ -46,7 +50,7 @@ class EnhancedImagePreviewMixin:
                     '</div>'
                     '</div>'
                     '</div>',
-                    image_url, max_width, max_height, radius
+                    preview_url, max_width, max_height, radius, image_url
                 )
                 return preview_html
             else:
@@ -126,8 +126,82 @@ class AnalyticsSettings(models.Model):
     def __str__(self):
         return f"Analytics Settings (Tracking: {'On' if self.enable_tracking else 'Off'})"
     
+    # (version, instance) for this process; see get_settings()
+    _cached = None
+    CACHE_VERSION_NAME = 'analytics_settings'
+
     @classmethod
     def get_settings(cls):
-        """Get or create analytics settings"""
+        """Get or create analytics settings (cached per process until saved, see core.signals)"""
+        from .cache_versions import get_version
+
+        version = get_version(cls.CACHE_VERSION_NAME)
+        cached = cls._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
         settings, created = cls.objects.get_or_create()
+        cls._cached = (version, settings)
         return settings
+
+    @classmethod
+    def invalidate_cache(cls, *args, **kwargs):
+        """Drop the cached instance here and in every other worker."""
+        from .cache_versions import bump_version
+
+        cls._cached = None
+        bump_version(cls.CACHE_VERSION_NAME)
+
+
+class AnalyticsDailyRollup(models.Model):
+    """
+    Pre-aggregated analytics per day, church and dimension (see rollup_analytics command).
+    'site' rows (church empty) hold the whole site's totals, including distinct visitors;
+    every other dimension has one row per church (or no church) and value.
+    """
+    DIMENSION_CHOICES = [
+        ('site', 'Whole site'),
+        ('total', 'Church totals'),
+        ('device', 'Device type'),
+        ('browser', 'Browser'),
+        ('country', 'Country'),
+        ('location', 'Country / city'),
+        ('referrer', 'Referrer domain'),
+        ('hour', 'Hour of day'),
+        ('page', 'Page path'),
+    ]
+
+    day = models.DateField(db_index=True)
+    church = models.ForeignKey(Church, on_delete=models.CASCADE, null=True, blank=True, help_text="Empty for visits without church context")
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=500, blank=True, help_text="Dimension value, e.g. 'mobile' or '/events/'")
+
+    sessions = models.PositiveIntegerField(default=0)
+    page_views = models.PositiveIntegerField(default=0)
+    unique_visitors = models.PositiveIntegerField(default=0, help_text="Distinct IPs that day (totals only)")
+    completed_sessions = models.PositiveIntegerField(default=0)
+    duration_total = models.PositiveBigIntegerField(default=0, help_text="Summed duration of completed sessions (seconds)")
+
+    class Meta:
+        ordering = ['-day', 'dimension']
+        verbose_name = 'Analytics Daily Rollup'
+        verbose_name_plural = 'Analytics Daily Rollups'
+        indexes = [
+            models.Index(fields=['dimension', 'day'], name='core_rollup_dim_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.dimension}={self.value or '-'} ({self.sessions} sessions)"
+
+
+class AnalyticsRollupState(models.Model):
+    """Watermark for rollup_analytics: raw rows at or before it are already aggregated"""
+    name = models.CharField(max_length=50, unique=True, default='daily')
+    watermark = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Analytics Rollup State'
+        verbose_name_plural = 'Analytics Rollup State'
+
+    def __str__(self):
+        return f"{self.name}: {self.watermark or 'never'}"
@@ -0,0 +1,128 @@
+"""
+Incremental daily rollups of VisitorSession / PageView for the analytics dashboard.
+
+rollup_analytics() finds the days touched since the stored watermark and
+re-aggregates only those days. A day is always replaced as a whole, so
+re-running is idempotent and late updates (page_views_count, ended_at) are
+picked up. The dashboard then sums daily rows for any date range instead of
+scanning raw rows.
+"""
+from collections import defaultdict
+from datetime import datetime, time as dt_time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from .analytics_models import AnalyticsDailyRollup, AnalyticsRollupState, PageView, VisitorSession
+
+# Rows committed slightly after a run started can carry older timestamps
+# (the page-view flusher batches writes), so the watermark trails the run.
+WATERMARK_LAG = timedelta(minutes=5)
+
+SESSION_DIMENSIONS = {
+    'device': 'device_type',
+    'browser': 'browser',
+    'country': 'country',
+    'referrer': 'referrer_domain',
+}
+
+
+def _day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(day, dt_time.min), tz)
+    return start, start + timedelta(days=1)
+
+
+def aggregate_day(day):
+    """Rollup rows for one day (unsaved)."""
+    start, end = _day_bounds(day)
+    sessions = VisitorSession.objects.filter(started_at__gte=start, started_at__lt=end)
+    views = PageView.objects.filter(viewed_at__gte=start, viewed_at__lt=end)
+    completed = Q(ended_at__isnull=False)
+    rows = []
+
+    def row(dimension, church_id=None, value='', **counts):
+        rows.append(AnalyticsDailyRollup(day=day, church_id=church_id, dimension=dimension, value=value or '', **counts))
+
+    totals = {
+        'sessions': Count('id'),
+        'unique_visitors': Count('ip_address', distinct=True),
+        'completed_sessions': Count('id', filter=completed),
+        'duration_total': Sum('duration', filter=completed),
+    }
+    site = sessions.aggregate(**totals)
+    site_views = views.count()
+    if site['sessions'] or site_views:
+        row(
+            'site', sessions=site['sessions'], page_views=site_views,
+            unique_visitors=site['unique_visitors'], completed_sessions=site['completed_sessions'],
+            duration_total=site['duration_total'] or 0,
+        )
+
+    per_church = defaultdict(dict)
+    for item in sessions.values('church_id').annotate(**totals):
+        per_church[item['church_id']].update(item)
+    for item in views.values('church_id').annotate(page_views=Count('id')):
+        per_church[item['church_id']]['page_views'] = item['page_views']
+    for church_id, item in per_church.items():
+        row(
+            'total', church_id,
+            sessions=item.get('sessions') or 0, page_views=item.get('page_views') or 0,
+            unique_visitors=item.get('unique_visitors') or 0,
+            completed_sessions=item.get('completed_sessions') or 0,
+            duration_total=item.get('duration_total') or 0,
+        )
+
+    for dimension, field in SESSION_DIMENSIONS.items():
+        for item in sessions.exclude(**{field: ''}).values('church_id', field).annotate(n=Count('id')):
+            row(dimension, item['church_id'], str(item[field])[:500], sessions=item['n'])
+    for item in sessions.exclude(country='').values('church_id', 'country', 'city').annotate(n=Count('id')):
+        row('location', item['church_id'], f"{item['country']}|{item['city']}"[:500], sessions=item['n'])
+    for item in sessions.annotate(h=ExtractHour('started_at')).values('church_id', 'h').annotate(n=Count('id')):
+        row('hour', item['church_id'], f"{item['h']:02d}", sessions=item['n'])
+    for item in views.values('church_id', 'path').annotate(n=Count('id')):
+        row('page', item['church_id'], item['path'][:500], page_views=item['n'])
+    return rows
+
+
+def touched_days(since):
+    """Days with sessions or page views written/updated after ``since`` (all days if None)."""
+    sessions = VisitorSession.objects.all()
+    views = PageView.objects.all()
+    if since is not None:
+        sessions = sessions.filter(last_activity__gt=since)
+        views = views.filter(viewed_at__gt=since)
+    days = set(sessions.annotate(d=TruncDate('started_at')).order_by().values_list('d', flat=True).distinct())
+    days.update(views.annotate(d=TruncDate('viewed_at')).order_by().values_list('d', flat=True).distinct())
+    return sorted(days)
+
+
+def rollup_days(days):
+    """Replace the rollup rows of ``days``; returns the number of rows written."""
+    written = 0
+    for day in days:
+        rows = aggregate_day(day)
+        with transaction.atomic():
+            AnalyticsDailyRollup.objects.filter(day=day).delete()
+            AnalyticsDailyRollup.objects.bulk_create(rows, batch_size=500)
+        written += len(rows)
+    return written
+
+
+def rollup_analytics(full=False):
+    """Aggregate everything new since the watermark; returns (days, rows)."""
+    run_started = timezone.now()
+    state, _ = AnalyticsRollupState.objects.get_or_create(name='daily')
+    since = None if full else state.watermark
+    days = touched_days(since)
+    rows = rollup_days(days)
+    state.watermark = run_started - WATERMARK_LAG
+    state.save(update_fields=['watermark', 'updated_at'])
+    return days, rows
+
+
+def rollup_watermark():
+    state = AnalyticsRollupState.objects.filter(name='daily').first()
+    return state.watermark if state else None
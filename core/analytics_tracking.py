@@ -0,0 +1,339 @@
+"""
+Buffered page-view tracking for VisitorSession / PageView.
+
+AnalyticsTrackingMiddleware (core.middleware) only appends a small dict to an
+in-memory buffer; a background thread per worker drains it every
+ANALYTICS_FLUSH_INTERVAL seconds (or as soon as AnalyticsSettings.batch_size
+hits are waiting) and writes sessions and page views with bulk_create. User
+agent parsing, GeoIP lookups and bot filtering also happen in the flusher,
+never on the request path.
+"""
+import atexit
+import ipaddress
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+VISITOR_COOKIE = 'bethel_vid'
+# A visitor session ends after this much inactivity (matches VisitorSession.is_active)
+VISITOR_COOKIE_MAX_AGE = 30 * 60
+# Visitor ids are uuid4().hex; anything else in the cookie is replaced
+VISITOR_ID_RE = re.compile(r'^[0-9a-f]{32}$')
+
+SKIP_PREFIXES = (
+    '/admin', '/static', '/media', '/api', '/health', '/startup-health',
+    '/favicon', '/sw.js', '/manifest', '/robots.txt', '/sitemap',
+)
+
+
+def stored_ip(ip: str, anonymize=True) -> str:
+    """IP as written to VisitorSession; anonymized zeroes the host part (/24, /48)."""
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        return '0.0.0.0'
+    if not anonymize:
+        return str(addr)
+    if addr.version == 4:
+        return str(ipaddress.ip_network(f'{addr}/24', strict=False).network_address)
+    return str(ipaddress.ip_network(f'{addr}/48', strict=False).network_address)
+
+
+def visitor_id_from(request):
+    """The visitor id from the cookie if well formed, otherwise a new one."""
+    import uuid
+
+    visitor_id = request.COOKIES.get(VISITOR_COOKIE) or ''
+    if VISITOR_ID_RE.match(visitor_id):
+        return visitor_id
+    return uuid.uuid4().hex
+
+
+def _device_info(user_agent):
+    """(is_bot, device_type, browser, browser_version, os) from a raw User-Agent."""
+    try:
+        from user_agents import parse
+    except ImportError:
+        return False, 'other', '', '', ''
+    ua = parse(user_agent or '')
+    if ua.is_mobile:
+        device = 'mobile'
+    elif ua.is_tablet:
+        device = 'tablet'
+    elif ua.is_pc:
+        device = 'desktop'
+    else:
+        device = 'other'
+    return (
+        ua.is_bot,
+        device,
+        (ua.browser.family or '')[:50],
+        (ua.browser.version_string or '')[:20],
+        (ua.os.family or '')[:50],
+    )
+
+
+class PageViewBuffer:
+    """Per-process queue of page-view hits with a background bulk writer."""
+
+    def __init__(self, max_size=None, flush_interval=None):
+        self.max_size = max_size or getattr(settings, 'ANALYTICS_BUFFER_MAX', 10000)
+        self.flush_interval = flush_interval or getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 5)
+        self._hits = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.batch_size = 100
+
+    def __len__(self):
+        return len(self._hits)
+
+    def record(self, hit):
+        """Queue one hit; never touches the database."""
+        with self._lock:
+            if len(self._hits) >= self.max_size:
+                self._hits.popleft()
+                self.dropped += 1
+            self._hits.append(hit)
+            self.recorded += 1
+            pending = len(self._hits)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_thread(self):
+        # A forked worker inherits the object but not the thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='analytics-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Analytics flush failed')
+            finally:
+                close_old_connections()
+
+    def _drain(self):
+        with self._lock:
+            hits = list(self._hits)
+            self._hits.clear()
+        return hits
+
+    def _requeue(self, hits):
+        with self._lock:
+            room = self.max_size - len(self._hits)
+            if room < len(hits):
+                self.dropped += len(hits) - max(room, 0)
+                hits = hits[len(hits) - max(room, 0):]
+            self._hits.extendleft(reversed(hits))
+
+    def flush(self):
+        """Write every queued hit; returns the number of page views stored."""
+        from .analytics_models import AnalyticsSettings
+
+        with self._flush_lock:
+            hits = self._drain()
+            if not hits:
+                return 0
+            stored = 0
+            try:
+                config = AnalyticsSettings.get_settings()
+            except Exception:
+                self._requeue(hits)
+                logger.warning('Analytics flush deferred; %d hits re-queued', len(hits), exc_info=True)
+                return 0
+            self.batch_size = max(1, config.batch_size or 100)
+            for start in range(0, len(hits), self.batch_size):
+                chunk = hits[start:start + self.batch_size]
+                try:
+                    with transaction.atomic():
+                        stored += self._write(chunk, config)
+                except (OperationalError, InterfaceError):
+                    # Database unreachable: keep the rest for the next flush
+                    self._requeue(hits[start:])
+                    logger.warning('Analytics flush deferred; %d hits re-queued', len(hits) - start, exc_info=True)
+                    break
+                except Exception:
+                    # Bad rows would fail again on every retry, so never requeue them
+                    logger.warning('Analytics batch failed; writing %d hits one by one', len(chunk), exc_info=True)
+                    stored += self._write_each(chunk, config)
+            self.written += stored
+            return stored
+
+    def _write_each(self, hits, config):
+        """Fallback for a failed batch: store what can be stored, drop the rest."""
+        stored = 0
+        for hit in hits:
+            try:
+                with transaction.atomic():
+                    stored += self._write([hit], config)
+            except Exception:
+                self.dropped += 1
+                logger.error('Dropped analytics hit for %s', hit.get('path'), exc_info=True)
+        return stored
+
+    def _write(self, hits, config):
+        from .analytics_models import PageView, VisitorSession
+        from .church_registry import get_church_registry
+        from .geoip import lookup_ip
+
+        registry = get_church_registry()
+        parsed = {}
+        kept = []
+        for hit in hits:
+            ua = hit['user_agent']
+            if ua not in parsed:
+                parsed[ua] = _device_info(ua)
+            if not parsed[ua][0]:
+                kept.append(hit)
+        if not kept:
+            return 0
+
+        by_visitor = {}
+        for hit in kept:
+            by_visitor.setdefault(hit['visitor_id'], []).append(hit)
+
+        sessions = {
+            s.session_id: s
+            for s in VisitorSession.objects.filter(session_id__in=list(by_visitor)).only('id', 'session_id')
+        }
+        new_sessions = []
+        for visitor_id, visitor_hits in by_visitor.items():
+            if visitor_id in sessions:
+                continue
+            first = visitor_hits[0]
+            is_bot, device, browser, browser_version, os_name = parsed[first['user_agent']]
+            country = city = ''
+            if config.track_geolocation:
+                country, city, _, _ = lookup_ip(first['ip'])
+            referrer = first['referrer'] if config.track_referrers else ''
+            church_id = first['church_id'] if registry.get(first['church_id']) else None
+            new_sessions.append(VisitorSession(
+                session_id=visitor_id,
+                ip_address=stored_ip(first['ip'], anonymize=config.anonymize_ips),
+                user_agent=first['user_agent'] if config.track_user_agent else '',
+                country=(country or '')[:100],
+                city=(city or '')[:100],
+                device_type=device if config.track_user_agent else 'other',
+                browser=browser if config.track_user_agent else '',
+                browser_version=browser_version if config.track_user_agent else '',
+                os=os_name if config.track_user_agent else '',
+                referrer=referrer[:200],
+                referrer_domain=(urlparse(referrer).netloc if referrer else '')[:200],
+                church_id=church_id,
+            ))
+        if new_sessions:
+            # Another worker may have created the same visitor meanwhile
+            VisitorSession.objects.bulk_create(new_sessions, ignore_conflicts=True)
+            missing = [s.session_id for s in new_sessions]
+            sessions.update(
+                (s.session_id, s)
+                for s in VisitorSession.objects.filter(session_id__in=missing).only('id', 'session_id')
+            )
+
+        views = []
+        # Sessions grouped by views gained and latest hit, for one UPDATE per group
+        increments = {}
+        for visitor_id, visitor_hits in by_visitor.items():
+            session = sessions.get(visitor_id)
+            if session is None:
+                continue
+            for hit in visitor_hits:
+                views.append(PageView(
+                    session_id=session.id,
+                    url=hit['url'][:200],
+                    path=hit['path'][:500],
+                    view_name=hit['view_name'][:100],
+                    church_id=hit['church_id'] if registry.get(hit['church_id']) else None,
+                    load_time=hit['load_time'],
+                ))
+            last_activity = max(hit['timestamp'] for hit in visitor_hits)
+            increments.setdefault((len(visitor_hits), last_activity), []).append(session.id)
+        PageView.objects.bulk_create(views, batch_size=config.batch_size or None)
+        for (count, last_activity), session_ids in increments.items():
+            VisitorSession.objects.filter(pk__in=session_ids).update(
+                page_views_count=F('page_views_count') + count,
+                last_activity=last_activity,
+            )
+        return len(views)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = PageViewBuffer()
+                atexit.register(_flush_at_exit)
+    return _buffer
+
+
+def _flush_at_exit():
+    # gunicorn recycles workers every max_requests; don't lose their queue
+    if _buffer is not None and len(_buffer):
+        try:
+            _buffer.flush()
+        except Exception:
+            pass
+
+
+def should_track(request, response):
+    if request.method != 'GET' or response.status_code != 200:
+        return False
+    if not (response.get('Content-Type') or '').startswith('text/html'):
+        return False
+    path = request.path
+    return not any(path.startswith(prefix) for prefix in SKIP_PREFIXES)
+
+
+def build_hit(request, visitor_id, started):
+    """Everything the flusher needs, captured from the request."""
+    from .location_utils import get_client_ip
+
+    match = getattr(request, 'resolver_match', None)
+    church_id = match.kwargs.get('church_id') if match else None
+    referrer = request.META.get('HTTP_REFERER', '')
+    if referrer and urlparse(referrer).netloc == request.get_host():
+        referrer = ''
+    return {
+        'visitor_id': visitor_id,
+        'ip': get_client_ip(request) or '0.0.0.0',
+        'user_agent': request.META.get('HTTP_USER_AGENT', ''),
+        'referrer': referrer,
+        'url': request.build_absolute_uri(),
+        'path': request.path,
+        'view_name': (match.view_name or '') if match else '',
+        'church_id': str(church_id) if church_id else None,
+        'load_time': int((time.perf_counter() - started) * 1000),
+        'timestamp': timezone.now(),
+    }
@@ -6,5 +6,7 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
+        from .metrics import install as install_metrics
         from .signals import connect_signals
         connect_signals()
+        install_metrics()
@@ -0,0 +1,322 @@
+"""
+Shared cache backend on a local SQLite file (WAL mode), with a small
+in-process L1.
+
+Every gunicorn worker opens the same file, so cached data and the version
+counters in core.cache_versions are shared between workers and survive worker
+recycling (max_requests) and restarts. No external service is needed.
+
+Integers are stored as SQLite integers so incr() is a single UPDATE inside an
+immediate transaction (atomic across processes); everything else is pickled.
+The L1 keeps recently read values (as pickled bytes) for L1_TIMEOUT seconds;
+writes from this worker update it immediately, writes from other workers are
+seen after at most L1_TIMEOUT. Keys starting with an L1_EXCLUDE prefix (e.g.
+version counters) always go to SQLite.
+
+Values are unpickled on read, so LOCATION must be in a directory only the app
+user can write to; the directory is created with mode 0700.
+
+    CACHES = {'default': {
+        'BACKEND': 'core.cache_backends.SQLiteCache',
+        'LOCATION': '/srv/bethel/cache/bethel_cache.sqlite3',
+        'OPTIONS': {'MAX_ENTRIES': 20000, 'L1_MAX_ENTRIES': 512, 'L1_TIMEOUT': 2},
+    }}
+"""
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.exceptions import ImproperlyConfigured
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache_entries ('
+    ' key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_entries_expires ON cache_entries (expires)',
+)
+
+
+class _L1:
+    """Bounded LRU of pickled values with a short TTL."""
+
+    def __init__(self, max_entries, max_bytes, ttl):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            blob, fresh_until, expires = item
+            now = time.time()
+            if fresh_until < now or (expires is not None and expires <= now):
+                self._pop(key)
+                return None
+            self._data.move_to_end(key)
+            return blob
+
+    def put(self, key, blob, expires):
+        if self.max_entries <= 0 or len(blob) > self.max_bytes // 8:
+            self.discard(key)
+            return
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (blob, time.time() + self.ttl, expires)
+            self._bytes += len(blob)
+            while self._data and (len(self._data) > self.max_entries or self._bytes > self.max_bytes):
+                self._pop(next(iter(self._data)))
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[0])
+
+    def discard(self, key):
+        with self._lock:
+            self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+_l1_by_location = {}
+_l1_lock = threading.Lock()
+
+
+class SQLiteCache(BaseCache):
+    """Cross-process cache in one SQLite file; see the module docstring."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        if not location:
+            raise ImproperlyConfigured('SQLiteCache needs a LOCATION in a private directory')
+        self.path = location
+        self.busy_timeout = float(options.get('BUSY_TIMEOUT', 5))
+        # Expired rows are purged (and the table trimmed to MAX_ENTRIES) on
+        # roughly one in CULL_EVERY writes
+        self.cull_every = int(options.get('CULL_EVERY', 200))
+        self.l1_exclude = tuple(self.make_key(prefix) for prefix in options.get('L1_EXCLUDE', ()))
+        # Django builds one backend instance per thread; the L1 is per process
+        with _l1_lock:
+            self.l1 = _l1_by_location.get(self.path)
+            if self.l1 is None:
+                self.l1 = _l1_by_location[self.path] = _L1(
+                    int(options.get('L1_MAX_ENTRIES', 512)),
+                    int(options.get('L1_MAX_BYTES', 32 * 1024 * 1024)),
+                    float(options.get('L1_TIMEOUT', 2)),
+                )
+        self._local = threading.local()
+        self._schema_ready = False
+
+    # -- connection -------------------------------------------------------
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        # New thread, or a forked worker that must not share the parent's handle
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout * 1000)}')
+        if not self._schema_ready:
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            self._schema_ready = True
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+        return conn
+
+    def _execute(self, sql, params=()):
+        return self._connection().execute(sql, params)
+
+    # -- encoding ---------------------------------------------------------
+
+    @staticmethod
+    def _encode(value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(stored):
+        if isinstance(stored, int):
+            return stored
+        return pickle.loads(stored)
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def _use_l1(self, key):
+        return not key.startswith(self.l1_exclude) if self.l1_exclude else True
+
+    def _l1_put(self, key, stored, expires):
+        if self._use_l1(key):
+            blob = stored if isinstance(stored, bytes) else pickle.dumps(stored, pickle.HIGHEST_PROTOCOL)
+            self.l1.put(key, blob, expires)
+
+    # -- API ----------------------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        if self._use_l1(key):
+            blob = self.l1.get(key)
+            if blob is not None:
+                return pickle.loads(blob)
+        row = self._execute(
+            'SELECT value, expires FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone()
+        if row is None:
+            return default
+        self._l1_put(key, row[0], row[1])
+        return self._decode(row[0])
+
+    def get_many(self, keys, version=None):
+        mapping = {self.make_and_validate_key(key, version=version): key for key in keys}
+        result = {}
+        missing = []
+        for full_key, key in mapping.items():
+            blob = self.l1.get(full_key) if self._use_l1(full_key) else None
+            if blob is not None:
+                result[key] = pickle.loads(blob)
+            else:
+                missing.append(full_key)
+        now = time.time()
+        for start in range(0, len(missing), 500):
+            chunk = missing[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._execute(
+                f'SELECT key, value, expires FROM cache_entries WHERE key IN ({placeholders}) '
+                'AND (expires IS NULL OR expires > ?)',
+                (*chunk, now),
+            ).fetchall()
+            for full_key, stored, expires in rows:
+                self._l1_put(full_key, stored, expires)
+                result[mapping[full_key]] = self._decode(stored)
+        return result
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expiry(timeout)
+        if expires is not None and expires <= time.time():
+            self._delete(key)
+            return
+        stored = self._encode(value)
+        self._execute(
+            'INSERT OR REPLACE INTO cache_entries (key, value, expires) VALUES (?, ?, ?)',
+            (key, stored, expires),
+        )
+        self._l1_put(key, stored, expires)
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            self.set(key, value, timeout, version=version)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self._expiry(timeout)
+        stored = self._encode(value)
+        cursor = self._execute(
+            'INSERT INTO cache_entries (key, value, expires) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, expires = excluded.expires '
+            'WHERE cache_entries.expires IS NOT NULL AND cache_entries.expires <= ?',
+            (key, stored, expires, time.time()),
+        )
+        if cursor.rowcount:
+            self._l1_put(key, stored, expires)
+            self._maybe_cull()
+            return True
+        return False
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self.l1.discard(key)
+        cursor = self._execute(
+            'UPDATE cache_entries SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self._expiry(timeout), key, time.time()),
+        )
+        return bool(cursor.rowcount)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        conn = self._connection()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT value, expires FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (key, now),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found.")
+            if isinstance(row[0], int):
+                conn.execute('UPDATE cache_entries SET value = value + ? WHERE key = ?', (delta, key))
+                new_value = row[0] + delta
+            else:
+                new_value = self._decode(row[0]) + delta
+                conn.execute('UPDATE cache_entries SET value = ? WHERE key = ?', (self._encode(new_value), key))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        self.l1.discard(key)
+        return new_value
+
+    def delete(self, key, version=None):
+        return self._delete(self.make_and_validate_key(key, version=version))
+
+    def _delete(self, key):
+        self.l1.discard(key)
+        return bool(self._execute('DELETE FROM cache_entries WHERE key = ?', (key,)).rowcount)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._execute(
+            'SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone() is not None
+
+    def clear(self):
+        self.l1.clear()
+        self._execute('DELETE FROM cache_entries')
+
+    def close(self, **kwargs):
+        # Keep the per-thread connection open across requests
+        pass
+
+    def _maybe_cull(self):
+        if self.cull_every <= 0 or random.randrange(self.cull_every):
+            return
+        self._execute('DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))
+        count = self._execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        if count > self._max_entries:
+            # Drop the entries closest to expiry (permanent ones last)
+            excess = count - self._max_entries + self._max_entries // max(self._cull_frequency, 1)
+            self._execute(
+                'DELETE FROM cache_entries WHERE key IN ('
+                ' SELECT key FROM cache_entries ORDER BY expires IS NULL, expires LIMIT ?)',
+                (excess,),
+            )
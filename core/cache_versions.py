@@ -0,0 +1,53 @@
+"""
+Version counters for process-local caches.
+
+Each worker keeps its own copy of derived data (church registry, settings,
+etc.) tagged with the version it was built from. Saving the underlying model
+bumps the counter in the Django cache, so every worker sees a new number on
+its next read and rebuilds. Counters start from a time-based value so a
+counter that was evicted never comes back as a number a worker already holds.
+"""
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'bethel:version:'
+
+
+def _key(name):
+    return f'{KEY_PREFIX}{name}'
+
+
+def _seed():
+    return int(time.time() * 1000)
+
+
+def get_version(name) -> int:
+    """Current version of ``name`` (created on first read)."""
+    key = _key(name)
+    try:
+        version = cache.get(key)
+        if version is None:
+            cache.add(key, _seed(), timeout=None)
+            version = cache.get(key)
+    except Exception:
+        return 0
+    return version or 0
+
+
+def bump_version(name) -> int:
+    """Invalidate everything built from ``name``; returns the new version."""
+    key = _key(name)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _seed()
+        cache.set(key, version, timeout=None)
+        return version
+    except Exception:
+        # Readers keep the old version until the next bump; make that visible
+        logger.exception('Could not bump cache version %s; data cached under it may be stale', name)
+        return 0
@@ -1,11 +1,17 @@
-"""Build .ics calendar files for events."""
-from datetime import timedelta
+"""Build .ics calendar files for events and the month calendar grid."""
+import calendar
+import time
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
 
+from .cache_versions import bump_version, get_version
+
 # Church events are in Germany — use local times in calendar apps
 EVENT_TZ = ZoneInfo('Europe/Berlin')
 
@@ -75,13 +81,12 @@ def _calendar_end_datetime(event):
     return end_dt
 
 
-def build_event_ics(event, request) -> str:
-    """Return a complete VCALENDAR string with event URL and correct local times."""
+def _vevent_lines(event, stamp) -> list:
+    """VEVENT lines for one event (URL, local times, description with the event page link)."""
     start_dt = _aware(event.start_date)
     end_dt = _calendar_end_datetime(event)
 
-    event_url = event_absolute_url(event, request)
-    now_stamp = _to_ics_utc_stamp(timezone.now())
+    event_url = event_absolute_url(event)
     start = _to_ics_local(start_dt)
     end = _to_ics_local(end_dt)
 
@@ -100,14 +105,9 @@ def build_event_ics(event, request) -> str:
     location = ics_escape(', '.join(location_parts))
 
     lines = [
-        'BEGIN:VCALENDAR',
-        'VERSION:2.0',
-        'PRODID:-//Bethel Prayer Ministry//EN',
-        'CALSCALE:GREGORIAN',
-        'METHOD:PUBLISH',
         'BEGIN:VEVENT',
         f'UID:{event.id}@bethelprayerministryinternational.com',
-        f'DTSTAMP:{now_stamp}',
+        f'DTSTAMP:{stamp}',
         f'DTSTART;TZID=Europe/Berlin:{start}',
         f'DTEND;TZID=Europe/Berlin:{end}',
         f'SUMMARY:{ics_escape(event.title)}',
@@ -117,5 +117,192 @@ def build_event_ics(event, request) -> str:
     ]
     if location:
         lines.append(f'LOCATION:{location}')
-    lines.extend(['END:VEVENT', 'END:VCALENDAR'])
-    return '\r\n'.join(lines) + '\r\n'
+    lines.append('END:VEVENT')
+    return lines
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets (RFC 5545 3.1), without splitting UTF-8 sequences."""
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line
+    parts, start, limit = [], 0, 75
+    while start < len(data):
+        end = min(start + limit, len(data))
+        while end < len(data) and (data[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(data[start:end].decode('utf-8'))
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(parts)
+
+
+def _ics(lines) -> str:
+    return ''.join(_fold(line) + '\r\n' for line in lines)
+
+
+CALENDAR_HEADER = [
+    'BEGIN:VCALENDAR',
+    'VERSION:2.0',
+    'PRODID:-//Bethel Prayer Ministry//EN',
+    'CALSCALE:GREGORIAN',
+    'METHOD:PUBLISH',
+]
+
+
+def build_event_ics(event, request) -> str:
+    """Return a complete VCALENDAR string with event URL and correct local times."""
+    stamp = _to_ics_utc_stamp(timezone.now())
+    return _ics(CALENDAR_HEADER + _vevent_lines(event, stamp) + ['END:VCALENDAR'])
+
+
+# Subscription feeds ----------------------------------------------------
+
+FEED_FIELDS = (
+    'id', 'church_id', 'title', 'description', 'details', 'start_date', 'end_date', 'location', 'address',
+    'event_type', 'is_big_event', 'updated_at',
+)
+
+
+def feed_events(church_id=None):
+    """Public events of a subscription feed: recent past and everything ahead."""
+    from .models import Event
+
+    past_days = getattr(settings, 'CALENDAR_FEED_PAST_DAYS', 90)
+    events = Event.objects.filter(
+        is_public=True, church__is_active=True, church__is_approved=True,
+        end_date__gte=timezone.now() - timedelta(days=past_days),
+    )
+    if church_id:
+        events = events.filter(church_id=church_id)
+    return events.only(*FEED_FIELDS).order_by('start_date', 'id')
+
+
+def iter_calendar_feed(events, name):
+    """
+    Yield a VCALENDAR one VEVENT at a time (``events`` is iterated lazily,
+    in chunks), so a large calendar is never held in memory as one string.
+    """
+    yield _ics(CALENDAR_HEADER + [
+        f'X-WR-CALNAME:{ics_escape(name)}',
+        'X-WR-TIMEZONE:Europe/Berlin',
+        'REFRESH-INTERVAL;VALUE=DURATION:PT1H',
+        'X-PUBLISHED-TTL:PT1H',
+    ])
+    for event in events.iterator(chunk_size=500):
+        # DTSTAMP from the event so the feed only changes when events do
+        yield _ics(_vevent_lines(event, _to_ics_utc_stamp(event.updated_at)))
+    yield _ics(['END:VCALENDAR'])
+
+
+def calendar_feed_version(church_id=None):
+    """
+    Version of a feed: the church's (or all churches') calendar version and
+    today's date, since events fall out of the window as days pass.
+    """
+    return f'{get_version(_calendar_version_name(church_id))}:{timezone.localdate().isoformat()}'
+
+
+def calendar_feed(church_id=None, name='Events'):
+    """
+    (version, built_at, body) of a subscription feed. ``body`` is the cached
+    bytes, or on a miss a generator that streams the feed and caches it once
+    complete (``built_at`` is then None). built_at, the Unix time the cached
+    feed was first generated, serves as its Last-Modified.
+    """
+    version = calendar_feed_version(church_id)
+    key = f'calendar:feed:{church_id or "all"}:{version}'
+    cached = cache.get(key)
+    if cached is not None:
+        return version, cached[0], cached[1]
+
+    def stream():
+        chunks = []
+        for chunk in iter_calendar_feed(feed_events(church_id), name):
+            data = chunk.encode('utf-8')
+            chunks.append(data)
+            yield data
+        cache.set(key, (int(time.time()), b''.join(chunks)), getattr(settings, 'CALENDAR_FEED_TIMEOUT', 86400))
+
+    return version, None, stream()
+
+
+# Month grid ------------------------------------------------------------
+
+MONTH_GRID_FIELDS = (
+    'id', 'church_id', 'title', 'start_date', 'end_date', 'location', 'event_type', 'is_big_event',
+)
+
+
+def _calendar_version_name(church_id=None):
+    return f'calendar:{church_id}' if church_id else 'calendar:all'
+
+
+def invalidate_event_calendars(*church_ids):
+    """Drop cached month grids for the global calendar and the given churches."""
+    bump_version(_calendar_version_name())
+    for church_id in {c for c in church_ids if c}:
+        bump_version(_calendar_version_name(church_id))
+
+
+def _month_bounds(year, month):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime(year, month, 1), tz)
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    end = timezone.make_aware(datetime(next_year, next_month, 1), tz)
+    return start, end
+
+
+def month_events(year, month, church_id=None):
+    """Public events overlapping the month (one query), ordered by start."""
+    from .models import Event
+
+    start, end = _month_bounds(year, month)
+    events = Event.objects.filter(
+        Q(end_date__gte=start) | Q(start_date__gte=start),
+        is_public=True,
+        start_date__lt=end,
+    )
+    if church_id:
+        events = events.filter(church_id=church_id)
+    return list(events.only(*MONTH_GRID_FIELDS).order_by('start_date'))
+
+
+def build_month_grid(year, month, events):
+    """
+    Bucket events into the calendar.monthcalendar() grid.
+    Each cell is {'day': int or '', 'events': [...]}; events spanning several days
+    appear on every day they cover within the month (clamped like the .ics end time).
+    """
+    by_day = {}
+    last_day = calendar.monthrange(year, month)[1]
+    for event in events:
+        first = timezone.localtime(_aware(event.start_date)).date()
+        end_dt = timezone.localtime(_calendar_end_datetime(event))
+        last = end_dt.date()
+        # An end exactly at midnight belongs to the previous day
+        if last > first and end_dt.time() == datetime.min.time():
+            last -= timedelta(days=1)
+        day = max(first, datetime(year, month, 1).date())
+        stop = min(last, datetime(year, month, last_day).date())
+        while day <= stop:
+            by_day.setdefault(day.day, []).append(event)
+            day += timedelta(days=1)
+
+    grid = []
+    for week in calendar.monthcalendar(year, month):
+        grid.append([
+            {'day': day, 'events': by_day.get(day, [])} if day else {'day': '', 'events': []}
+            for day in week
+        ])
+    return grid
+
+
+def month_calendar(year, month, church_id=None):
+    """Cached month grid for the global calendar or one church's calendar."""
+    version = get_version(_calendar_version_name(church_id))
+    key = f'calendar:grid:{church_id or "all"}:{year}-{month:02d}:{version}'
+    grid = cache.get(key)
+    if grid is None:
+        grid = build_month_grid(year, month, month_events(year, month, church_id))
+        cache.set(key, grid, getattr(settings, 'CALENDAR_CACHE_TIMEOUT', 3600))
+    return grid
@@ -0,0 +1,290 @@
+"""
+Process-wide registry of active, approved churches for location lookups.
+
+Built once from Church rows and rebuilt when a Church is saved or deleted
+(see core.signals). Holds precomputed normalized city/country keys, the
+country alias groups from COUNTRY_ALIASES and a 1°x1° grid over the church
+coordinates, so nearest-church resolution runs without touching the database.
+"""
+import math
+import threading
+from collections import defaultdict
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is in requirements.txt
+    np = None
+
+from .cache_versions import bump_version, get_version
+from .location_utils import (
+    COUNTRY_ALIASES,
+    normalize_city,
+    normalize_country,
+)
+
+VERSION_NAME = 'church_registry'
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.2
+GRID_DEGREES = 1.0
+
+# Normalized alias -> names of the COUNTRY_ALIASES groups it belongs to
+ALIAS_GROUPS = defaultdict(set)
+for _group, _aliases in COUNTRY_ALIASES.items():
+    for _alias in _aliases:
+        ALIAS_GROUPS[normalize_country(_alias)].add(_group)
+ALIAS_GROUPS = {alias: frozenset(groups) for alias, groups in ALIAS_GROUPS.items()}
+
+
+def city_keys_match(a: str, b: str) -> bool:
+    """cities_match() for already-normalized names."""
+    if not a or not b:
+        return False
+    if a == b or a in b or b in a:
+        return True
+    a_parts, b_parts = a.split(), b.split()
+    return bool(a_parts and b_parts and a_parts[0] == b_parts[0])
+
+
+def _cell(lat_deg, lon_deg):
+    return (
+        int(math.floor(lat_deg / GRID_DEGREES)),
+        int(math.floor((lon_deg % 360.0) / GRID_DEGREES)),
+    )
+
+
+def haversine_many(lat, lon, lats_rad, lons_rad):
+    """Great-circle distances (km) from one point to arrays of radian coordinates."""
+    phi1 = math.radians(float(lat))
+    lam1 = math.radians(float(lon))
+    if np is not None:
+        dphi = lats_rad - phi1
+        dlam = lons_rad - lam1
+        a = np.sin(dphi / 2) ** 2 + math.cos(phi1) * np.cos(lats_rad) * np.sin(dlam / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    out = []
+    cos_phi1 = math.cos(phi1)
+    for phi2, lam2 in zip(lats_rad, lons_rad):
+        a = math.sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * math.cos(phi2) * math.sin((lam2 - lam1) / 2) ** 2
+        out.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return out
+
+
+class ChurchRegistry:
+    """Immutable snapshot of the public church list plus lookup indexes."""
+
+    COUNTRY_MEMO_LIMIT = 512
+
+    def __init__(self, churches, version=0):
+        self.version = version
+        self.churches = list(churches)
+        self.by_id = {str(c.id): c for c in self.churches}
+        self._positions = {str(c.id): i for i, c in enumerate(self.churches)}
+        self.city_keys = [normalize_city(c.city) for c in self.churches]
+        self.country_keys = [normalize_country(c.country) for c in self.churches]
+        self._country_memo = {}
+        self._lock = threading.Lock()
+
+        # Positions (into self.churches) of churches with coordinates
+        located, lats, lons = [], [], []
+        grid = defaultdict(list)
+        for idx, church in enumerate(self.churches):
+            if church.latitude is None or church.longitude is None:
+                continue
+            lat, lon = float(church.latitude), float(church.longitude)
+            grid[_cell(lat, lon)].append(len(located))
+            located.append(idx)
+            lats.append(math.radians(lat))
+            lons.append(math.radians(lon))
+        self._located = located
+        if np is not None:
+            self._located_arr = np.array(located, dtype=np.int64)
+            self._lats = np.array(lats, dtype=np.float64)
+            self._lons = np.array(lons, dtype=np.float64)
+        else:
+            self._located_arr = located
+            self._lats = lats
+            self._lons = lons
+        self._grid = dict(grid)
+
+        self.location_json = [
+            {
+                'id': str(self.churches[i].id),
+                'city': self.churches[i].city or '',
+                'lat': float(self.churches[i].latitude),
+                'lon': float(self.churches[i].longitude),
+            }
+            for i in located
+        ]
+
+    def __len__(self):
+        return len(self.churches)
+
+    def get(self, church_id):
+        return self.by_id.get(str(church_id))
+
+    # Country / city ------------------------------------------------------
+
+    def _country_positions(self, country):
+        key = normalize_country(country)
+        if not key:
+            return ()
+        positions = self._country_memo.get(key)
+        if positions is not None:
+            return positions
+        groups = ALIAS_GROUPS.get(key, frozenset())
+        matches = {}
+        out = []
+        for idx, church_key in enumerate(self.country_keys):
+            if not church_key:
+                continue
+            hit = matches.get(church_key)
+            if hit is None:
+                hit = (
+                    key == church_key
+                    or key in church_key
+                    or church_key in key
+                    or bool(groups & ALIAS_GROUPS.get(church_key, frozenset()))
+                )
+                matches[church_key] = hit
+            if hit:
+                out.append(idx)
+        positions = tuple(out)
+        with self._lock:
+            if len(self._country_memo) >= self.COUNTRY_MEMO_LIMIT:
+                self._country_memo.clear()
+            self._country_memo[key] = positions
+        return positions
+
+    def in_country(self, country):
+        """Churches whose country matches (same rules as countries_match)."""
+        return [self.churches[i] for i in self._country_positions(country)]
+
+    def count_in_country(self, country):
+        return len(self._country_positions(country))
+
+    def first_in_city(self, city, churches=None):
+        """First church (in registry order) whose city matches ``city``."""
+        key = normalize_city(city)
+        if not key:
+            return None
+        pool = self.churches if churches is None else churches
+        for church in pool:
+            idx = self._index_of(church)
+            church_key = self.city_keys[idx] if idx is not None else normalize_city(church.city)
+            if city_keys_match(key, church_key):
+                return church
+        return None
+
+    def _index_of(self, church):
+        return self._positions.get(str(church.id))
+
+    # Spatial -------------------------------------------------------------
+
+    def _grid_candidates(self, lat, lon, radius_km):
+        """Located positions in grid cells overlapping the radius bounding box, or None for all."""
+        dlat = radius_km / KM_PER_DEGREE
+        cos_lat = math.cos(math.radians(min(89.0, abs(float(lat)) + dlat)))
+        if dlat >= 90 or cos_lat <= 0:
+            return None
+        dlon = radius_km / (KM_PER_DEGREE * cos_lat)
+        if dlon >= 180:
+            return None
+        lat0, lon0 = _cell(float(lat) - dlat, float(lon) - dlon)
+        lat1, lon1 = _cell(float(lat) + dlat, float(lon) + dlon)
+        lon_cells = (lon1 - lon0) % int(360 / GRID_DEGREES) + 1
+        if (lat1 - lat0 + 1) * lon_cells > max(len(self._grid), 1):
+            return None
+        out = []
+        lon_span = int(360 / GRID_DEGREES)
+        for lat_cell in range(lat0, lat1 + 1):
+            for step in range(lon_cells):
+                out.extend(self._grid.get((lat_cell, (lon0 + step) % lon_span), ()))
+        return out
+
+    def _distances(self, lat, lon, candidates=None):
+        """(positions into self.churches, distances) for located churches."""
+        if candidates is None:
+            return self._located_arr, haversine_many(lat, lon, self._lats, self._lons)
+        if np is not None:
+            cand = np.array(candidates, dtype=np.int64)
+            return self._located_arr[cand], haversine_many(lat, lon, self._lats[cand], self._lons[cand])
+        return (
+            [self._located[c] for c in candidates],
+            haversine_many(lat, lon, [self._lats[c] for c in candidates], [self._lons[c] for c in candidates]),
+        )
+
+    def nearest(self, lat, lon, k=1, max_km=None, among=None):
+        """
+        Up to ``k`` (church, km) pairs ordered by distance.
+        ``max_km`` limits the search radius (answered from the grid);
+        ``among`` restricts results to the given churches.
+        """
+        if lat is None or lon is None or not self._located:
+            return []
+        candidates = None
+        if max_km is not None and math.isfinite(max_km):
+            candidates = self._grid_candidates(lat, lon, max_km)
+            if candidates is not None and not candidates:
+                return []
+        positions, dists = self._distances(lat, lon, candidates)
+        allowed = None
+        if among is not None:
+            allowed = {self._index_of(c) for c in among}
+        if np is not None:
+            order = np.argsort(dists, kind='stable')
+            pairs = ((int(positions[i]), float(dists[i])) for i in order)
+        else:
+            pairs = iter(sorted(zip(positions, dists), key=lambda p: p[1]))
+        out = []
+        for pos, km in pairs:
+            if max_km is not None and km > max_km:
+                break
+            if allowed is not None and pos not in allowed:
+                continue
+            out.append((self.churches[pos], km))
+            if len(out) >= k:
+                break
+        return out
+
+    def within(self, lat, lon, radius_km, among=None):
+        """All (church, km) pairs within ``radius_km``, nearest first."""
+        return self.nearest(lat, lon, k=len(self.churches) or 1, max_km=radius_km, among=among)
+
+    def distance_map(self, lat, lon):
+        """{church.id: km} for every church with coordinates."""
+        if lat is None or lon is None or not self._located:
+            return {}
+        positions, dists = self._distances(lat, lon)
+        return {self.churches[int(p)].id: float(d) for p, d in zip(positions, dists)}
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def build_church_registry(version=0):
+    from .models import Church
+    return ChurchRegistry(Church.objects.filter(is_active=True, is_approved=True), version=version)
+
+
+def get_church_registry():
+    """Current registry; rebuilt when the church list version has moved on."""
+    global _registry
+    version = get_version(VERSION_NAME)
+    registry = _registry
+    if registry is None or registry.version != version:
+        with _registry_lock:
+            registry = _registry
+            if registry is None or registry.version != version:
+                registry = build_church_registry(version)
+                _registry = registry
+    return registry
+
+
+def invalidate_church_registry(*args, **kwargs):
+    """Signal handler: drop this worker's registry and tell the others."""
+    global _registry
+    with _registry_lock:
+        _registry = None
+    bump_version(VERSION_NAME)
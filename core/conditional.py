@@ -0,0 +1,148 @@
+"""
+Conditional GET (ETag / Last-Modified -> 304 Not Modified) for public pages,
+calendar files and the API (the sitemap files carry their own, see core.views_sitemap).
+
+Validators are derived from what a response depends on rather than from its
+body, so a 304 is answered before the view runs:
+
+- Last-Modified is the newest ``updated_at`` among a church's church record,
+  events, news, sermons, ministries and heroes (or all churches' for
+  site-wide responses) and the global settings. It takes one Max() per model
+  and is cached per content version (core.page_cache), so it is recomputed
+  only after something changed. Deletes and models without ``updated_at``
+  also bump the content version; the time of that bump is folded in so
+  Last-Modified still moves forward.
+- The ETag hashes the path, query string, content version and settings
+  version, plus an optional per-visitor ``vary`` value.
+"""
+import functools
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache_versions import get_version
+from .page_cache import GLOBAL_SCOPE, _cacheable_request, content_changed_at, content_version
+
+# Models (with a church FK and updated_at) whose changes show on church pages
+CONTENT_MODELS = ('Event', 'News', 'Sermon', 'Ministry', 'Hero')
+
+LAST_MODIFIED_TIMEOUT = 60 * 60 * 24
+
+
+def _newest_update(church_id):
+    from django.apps import apps
+
+    from .models import Church, GlobalSettings
+
+    churches = Church.objects.all() if church_id == GLOBAL_SCOPE else Church.objects.filter(pk=church_id)
+    candidates = [
+        churches.aggregate(m=Max('updated_at'))['m'],
+        GlobalSettings.objects.aggregate(m=Max('updated_at'))['m'],
+    ]
+    for label in CONTENT_MODELS:
+        queryset = apps.get_model('core', label).objects.all()
+        if church_id != GLOBAL_SCOPE:
+            queryset = queryset.filter(church_id=church_id)
+        candidates.append(queryset.aggregate(m=Max('updated_at'))['m'])
+    return max((c.timestamp() for c in candidates if c is not None), default=0)
+
+
+def last_modified(church_id=None):
+    """Unix time the content of a church (or of the whole site) last changed, or None."""
+    from .models import GlobalSettings
+
+    scope = str(church_id) if church_id else GLOBAL_SCOPE
+    key = 'conditional:lastmod:{}:{}:{}'.format(
+        scope, content_version(scope), get_version(GlobalSettings.CACHE_VERSION_NAME),
+    )
+    newest = cache.get(key)
+    if newest is None:
+        newest = _newest_update(scope)
+        cache.set(key, newest, LAST_MODIFIED_TIMEOUT)
+    newest = max(newest, content_changed_at(scope) or 0)
+    return int(newest) or None
+
+
+def validators(request, church_id=None, vary=None):
+    """(etag, last_modified) for a response built from a church's content, or (None, None)."""
+    from .models import GlobalSettings
+
+    version = content_version(church_id)
+    if not version:
+        return None, None  # no shared cache: versions would never change
+    parts = [
+        request.path, '&'.join(sorted(request.GET.urlencode().split('&'))),
+        str(version), str(get_version(GlobalSettings.CACHE_VERSION_NAME)), repr(vary),
+    ]
+    etag = quote_etag(hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest())
+    return etag, last_modified(church_id)
+
+
+def not_modified(request, etag, modified):
+    """The 304 response if the request's validators match, else None."""
+    return get_conditional_response(request, etag=etag, last_modified=modified)
+
+
+def set_validators(response, etag, modified):
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if modified and not response.has_header('Last-Modified'):
+        response['Last-Modified'] = http_date(modified)
+    return response
+
+
+def conditional_page(scope, *, vary=None, anonymous_only=True):
+    """
+    Answer GET/HEAD with 304 when the client's copy is current.
+
+    ``scope(request, **kwargs)`` returns the church id the response is built
+    from, GLOBAL_SCOPE for site-wide responses, or None to skip (e.g. the
+    object does not exist; the view then renders its 404). ``vary`` is as in
+    cache_public_page. Pages that differ per signed-in user only get
+    validators for anonymous visitors (``anonymous_only``).
+    """
+    def decorator(view_func):
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not getattr(settings, 'CONDITIONAL_GET_ENABLED', True)
+                or request.method not in ('GET', 'HEAD')
+                or (anonymous_only and not _cacheable_request(request))
+            ):
+                return view_func(request, *args, **kwargs)
+            church_id = scope(request, **kwargs)
+            if church_id is None:
+                return view_func(request, *args, **kwargs)
+            etag, modified = validators(
+                request, None if church_id == GLOBAL_SCOPE else church_id,
+                vary(request, **kwargs) if vary else None,
+            )
+            response = not_modified(request, etag, modified) if etag else None
+            if response is not None:
+                return set_validators(response, etag, modified)
+            response = view_func(request, *args, **kwargs)
+            if etag and response.status_code == 200 and not getattr(response, 'streaming', False):
+                set_validators(response, etag, modified)
+            return response
+        return wrapper
+    return decorator
+
+
+def church_scope(request, church_id=None, **kwargs):
+    return church_id
+
+
+def object_church_scope(model_label, kwarg):
+    """Scope of a detail page: the church of the ``kwarg`` object (None if it doesn't exist)."""
+    def scope(request, **kwargs):
+        from django.apps import apps
+
+        return (
+            apps.get_model('core', model_label).objects
+            .filter(pk=kwargs[kwarg]).values_list('church_id', flat=True).first()
+        )
+    return scope
@@ -1,5 +1,10 @@
+import threading
+
 from django.conf import settings as django_settings
+from .cache_versions import get_version
 from .models import GlobalSettings
+from .nav_data import nav_context
+from .page_cache import CSRF_PLACEHOLDER
 from .push_notifications import webpush_enabled
 from .pwa_utils import public_static_url
 
@@ -10,8 +15,29 @@ DEFAULT_META_DESCRIPTION = (
 )
 
 
+# (settings version, scheme, host) -> context dict; the logo URL is absolute per host
+_context_memo = {}
+_context_memo_lock = threading.Lock()
+CONTEXT_MEMO_LIMIT = 32
+
+
 def global_settings(request):
     """Add global settings and default SEO values to all template contexts."""
+    key = (get_version(GlobalSettings.CACHE_VERSION_NAME), request.scheme, request.get_host())
+    context = _context_memo.get(key)
+    if context is None:
+        context = _build_global_context(request)
+        if context['global_settings'] is None:
+            # Settings could not be loaded; retry on the next request
+            return context
+        with _context_memo_lock:
+            if len(_context_memo) >= CONTEXT_MEMO_LIMIT:
+                _context_memo.clear()
+            _context_memo[key] = context
+    return dict(context)
+
+
+def _build_global_context(request):
     try:
         settings = GlobalSettings.get_settings()
         gs = settings
@@ -65,4 +91,18 @@ def global_settings(request):
         "pwa_favicon": public_static_url('/static/img/favicon-32.png'),
         "pwa_icon_192": public_static_url('/static/img/icon-192.png'),
         "pwa_icon_512": public_static_url('/static/img/icon-512.png'),
-    } 
\ No newline at end of file
+    } 
+
+
+def navigation(request):
+    """Cached nav dropdown items; church pages get their own church's events/ministries."""
+    match = getattr(request, 'resolver_match', None)
+    church_id = match.kwargs.get('church_id') if match else None
+    return nav_context(church_id)
+
+
+def page_cache(request):
+    """While a page is rendered for core.page_cache, render the CSRF token as a placeholder."""
+    if getattr(request, '_page_cache_filling', False):
+        return {'csrf_token': CSRF_PLACEHOLDER}
+    return {}
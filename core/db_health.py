@@ -0,0 +1,160 @@
+"""
+Database health as seen by one worker process.
+
+A daemon thread probes the database (SELECT 1 on its own connection) every
+DB_HEALTH_INTERVAL seconds and keeps the result in memory, so requests never
+probe it themselves. After DB_HEALTH_FAILURE_THRESHOLD consecutive failures
+the circuit breaker opens: available() is False at once and
+DatabaseIndependentMiddleware answers from the page cache or with the static
+fallback page instead of letting every request wait on connection timeouts.
+The next successful probe closes it again. A probe that hangs longer than
+DB_HEALTH_TIMEOUT opens the breaker too, and database errors raised by views
+(report_failure) count as failed probes and trigger an early re-probe.
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+CLOSED, OPEN = 'closed', 'open'
+
+
+class DatabaseHealthMonitor:
+    """Background prober with a circuit breaker, one per process (see get_monitor)."""
+
+    def __init__(self, alias=DEFAULT_DB_ALIAS, interval=None, timeout=None, failure_threshold=None):
+        self.alias = alias
+        self.interval = interval or getattr(settings, 'DB_HEALTH_INTERVAL', 5)
+        self.timeout = timeout or getattr(settings, 'DB_HEALTH_TIMEOUT', 5)
+        self.failure_threshold = failure_threshold or getattr(settings, 'DB_HEALTH_FAILURE_THRESHOLD', 3)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_checked = None
+        self.last_ok = None
+        self.latency_ms = None
+        self.opened_at = None
+        self.probes = 0
+        self._probe_started = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def available(self):
+        """False while the breaker is open; True before the first probe finished."""
+        self._ensure_thread()
+        started = self._probe_started
+        if started is not None and time.monotonic() - started > self.timeout:
+            self._open('Database probe timed out')
+        return self.state != OPEN
+
+    def report_failure(self, error):
+        """A request hit a database error: count it and re-probe now."""
+        self._record_failure(error)
+        self._wake.set()
+
+    def probe(self):
+        """Run one probe on this thread's connection and record the result."""
+        self._probe_started = time.monotonic()
+        try:
+            connection = connections[self.alias]
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+        except Exception as exc:
+            self._record_failure(exc)
+            try:
+                connections[self.alias].close()  # reconnect on the next probe
+            except Exception:
+                pass
+        else:
+            self._record_success((time.monotonic() - self._probe_started) * 1000)
+        finally:
+            self._probe_started = None
+            self.probes += 1
+
+    def snapshot(self):
+        """Current state for health endpoints (no database access)."""
+        with self._lock:
+            return {
+                'available': self.state != OPEN,
+                'circuit': self.state if self.last_checked else 'unknown',
+                'consecutive_failures': self.consecutive_failures,
+                'last_error': self.last_error,
+                'last_checked': self.last_checked,
+                'last_ok': self.last_ok,
+                'latency_ms': round(self.latency_ms, 2) if self.latency_ms is not None else None,
+                'opened_at': self.opened_at,
+                'probe_interval': self.interval,
+            }
+
+    def _record_success(self, latency_ms):
+        with self._lock:
+            if self.state == OPEN:
+                logger.warning('Database available again after %.0fs; circuit closed', time.time() - self.opened_at)
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.last_checked = self.last_ok = time.time()
+            self.latency_ms = latency_ms
+            self.opened_at = None
+
+    def _record_failure(self, error):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = str(error)[:500]
+            self.last_checked = time.time()
+            trip = self.state != OPEN and self.consecutive_failures >= self.failure_threshold
+        if trip:
+            self._open(self.last_error)
+
+    def _open(self, error):
+        with self._lock:
+            if self.state == OPEN:
+                return
+            self.state = OPEN
+            self.opened_at = time.time()
+            self.last_error = str(error)[:500]
+        logger.error('Database unavailable (%s); circuit opened', error)
+
+    def _ensure_thread(self):
+        if not getattr(settings, 'DB_HEALTH_ENABLED', True):
+            return
+        # A forked worker inherits the object but not the thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='db-health', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.probe()
+            except Exception:
+                logger.exception('Database probe crashed')
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+
+_monitor = None
+_monitor_lock = threading.Lock()
+
+
+def get_monitor():
+    global _monitor
+    if _monitor is None:
+        with _monitor_lock:
+            if _monitor is None:
+                _monitor = DatabaseHealthMonitor()
+    return _monitor
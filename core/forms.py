@@ -294,15 +294,6 @@ class LocalAdminEventHeroMediaForm(forms.ModelForm):
                 return compressed
         return image
 
-    def clean_video(self):
-        video = self.cleaned_data.get('video')
-        if video:
-            from .media_utils import compress_video_upload
-            compressed = compress_video_upload(video)
-            if compressed:
-                return compressed
-        return video
-
     def clean(self):
         cleaned = super().clean()
         if not cleaned.get('image') and not cleaned.get('video'):
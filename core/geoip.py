@@ -0,0 +1,257 @@
+"""
+Resolve visitor IP addresses to (country, city, latitude, longitude).
+
+Lookups run against an offline database loaded once per process (MaxMind
+.mmdb via geoip2, or a CSV of IP ranges) and are memoised in a bounded LRU.
+The old ipapi.co / ip-api.com calls are only used when GEOIP_HTTP_FALLBACK
+is switched on, so a page view never waits on an outbound request by default.
+"""
+import bisect
+import csv
+import ipaddress
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+from pathlib import Path
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GeoLocation = namedtuple('GeoLocation', ['country', 'city', 'latitude', 'longitude'])
+
+EMPTY_LOCATION = GeoLocation(None, None, None, None)
+
+DEFAULT_CACHE_SIZE = 4096
+
+
+def _float_or_none(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_public_ip(ip: str) -> bool:
+    """False for loopback, private and malformed addresses (nothing to look up)."""
+    try:
+        addr = ipaddress.ip_address((ip or '').strip())
+    except ValueError:
+        return False
+    return addr.is_global
+
+
+class MMDBResolver:
+    """MaxMind GeoLite2/GeoIP2 City database read through geoip2."""
+    name = 'mmdb'
+
+    def __init__(self, path):
+        import geoip2.database
+        self.path = str(path)
+        self._reader = geoip2.database.Reader(self.path)
+
+    def lookup(self, ip):
+        import geoip2.errors
+        try:
+            resp = self._reader.city(ip)
+        except (geoip2.errors.AddressNotFoundError, ValueError):
+            return None
+        return GeoLocation(
+            resp.country.name,
+            resp.city.name,
+            resp.location.latitude,
+            resp.location.longitude,
+        )
+
+
+class CSVRangeResolver:
+    """
+    Sorted IP-range table from a CSV with the columns
+    start_ip,end_ip,country,city,latitude,longitude (header row optional).
+    Lookups are a bisect over the range starts.
+    """
+    name = 'csv'
+
+    def __init__(self, path=None, rows=None):
+        self.path = str(path) if path else None
+        if rows is None:
+            rows = self._read_rows(path)
+        ranges = []
+        for row in rows:
+            try:
+                start = int(ipaddress.ip_address(row[0].strip()))
+                end = int(ipaddress.ip_address(row[1].strip()))
+            except (ValueError, IndexError, AttributeError):
+                continue
+            country = (row[2].strip() if len(row) > 2 else '') or None
+            city = (row[3].strip() if len(row) > 3 else '') or None
+            lat = _float_or_none(row[4]) if len(row) > 4 else None
+            lon = _float_or_none(row[5]) if len(row) > 5 else None
+            ranges.append((start, end, GeoLocation(country, city, lat, lon)))
+        ranges.sort(key=lambda r: r[0])
+        self._starts = [r[0] for r in ranges]
+        self._ranges = ranges
+
+    @staticmethod
+    def _read_rows(path):
+        with open(path, newline='', encoding='utf-8') as fh:
+            yield from csv.reader(fh)
+
+    def __len__(self):
+        return len(self._ranges)
+
+    def lookup(self, ip):
+        try:
+            value = int(ipaddress.ip_address(ip))
+        except ValueError:
+            return None
+        idx = bisect.bisect_right(self._starts, value) - 1
+        if idx < 0:
+            return None
+        start, end, location = self._ranges[idx]
+        if start <= value <= end:
+            return location
+        return None
+
+
+class HTTPResolver:
+    """ipapi.co, then ip-api.com — blocking, only used when explicitly enabled."""
+    name = 'http'
+
+    def __init__(self, timeout=5):
+        self.timeout = timeout
+
+    def lookup(self, ip):
+        try:
+            response = requests.get(f'https://ipapi.co/{ip}/json/', timeout=self.timeout)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('country_name'):
+                    return GeoLocation(
+                        data.get('country_name'),
+                        data.get('city'),
+                        _float_or_none(data.get('latitude')),
+                        _float_or_none(data.get('longitude')),
+                    )
+        except Exception:
+            pass
+
+        try:
+            response = requests.get(f'http://ip-api.com/json/{ip}', timeout=self.timeout)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('status') == 'success':
+                    return GeoLocation(
+                        data.get('country'),
+                        data.get('city'),
+                        _float_or_none(data.get('lat')),
+                        _float_or_none(data.get('lon')),
+                    )
+        except Exception:
+            pass
+        return None
+
+
+class GeoIPResolver:
+    """Chain of backends in front of a thread-safe, bounded LRU keyed by IP."""
+
+    def __init__(self, backends, cache_size=DEFAULT_CACHE_SIZE):
+        self.backends = list(backends)
+        self.cache_size = max(0, int(cache_size))
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, ip) -> GeoLocation:
+        ip = (ip or '').strip()
+        if not is_public_ip(ip):
+            return EMPTY_LOCATION
+
+        with self._lock:
+            cached = self._cache.get(ip)
+            if cached is not None:
+                self._cache.move_to_end(ip)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        location = EMPTY_LOCATION
+        for backend in self.backends:
+            try:
+                found = backend.lookup(ip)
+            except Exception as exc:
+                logger.warning('GeoIP backend %s failed: %s', backend.name, exc)
+                continue
+            if found and found.country:
+                location = found
+                break
+
+        if self.cache_size:
+            with self._lock:
+                self._cache[ip] = location
+                self._cache.move_to_end(ip)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return location
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.misses = 0
+
+
+def _load_database(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        if path.suffix.lower() == '.csv':
+            backend = CSVRangeResolver(path)
+            logger.info('GeoIP: loaded %s ranges from %s', len(backend), path)
+            return backend
+        return MMDBResolver(path)
+    except Exception as exc:
+        logger.warning('GeoIP: could not load %s: %s', path, exc)
+        return None
+
+
+def build_resolver():
+    """Build the resolver chain from GEOIP_* settings."""
+    backends = []
+    db_path = getattr(settings, 'GEOIP_DATABASE_PATH', '')
+    if db_path:
+        backend = _load_database(db_path)
+        if backend:
+            backends.append(backend)
+    if getattr(settings, 'GEOIP_HTTP_FALLBACK', False):
+        backends.append(HTTPResolver(timeout=getattr(settings, 'GEOIP_HTTP_TIMEOUT', 5)))
+    if not backends:
+        logger.info('GeoIP: no database configured and HTTP fallback disabled')
+    return GeoIPResolver(backends, cache_size=getattr(settings, 'GEOIP_CACHE_SIZE', DEFAULT_CACHE_SIZE))
+
+
+_resolver = None
+_resolver_lock = threading.Lock()
+
+
+def get_resolver():
+    """Process-wide resolver; the database is opened on first use only."""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = build_resolver()
+    return _resolver
+
+
+def reset_resolver():
+    """Drop the process-wide resolver (after changing GEOIP_* settings)."""
+    global _resolver
+    with _resolver_lock:
+        _resolver = None
+
+
+def lookup_ip(ip) -> GeoLocation:
+    return get_resolver().lookup(ip)
@@ -0,0 +1,174 @@
+"""
+Public listings (sermons, news, testimonies, prayer requests) shared by the
+listing pages and the infinite-scroll feed (/api/feed/<listing>/).
+
+Each listing has a queryset builder, a keyset ordering (see core.pagination)
+and the card templates it can render, so a page's first screen and the cards
+appended while scrolling come from the same query and the same markup.
+"""
+from datetime import datetime
+
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .pagination import CursorError, paginate
+
+SERMON_ORDERING = ('-date', '-created_at', 'id')
+NEWS_ORDERING = ('-date', '-created_at', 'id')
+TESTIMONY_ORDERING = ('-created_at', 'id')
+PRAYER_REQUEST_ORDERING = ('-created_at', 'id')
+
+
+def parse_date(value):
+    """YYYY-MM-DD filter value as a date, or None if empty or invalid."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+
+def sermons(church_id=None, preacher='', date=None):
+    from .models import Sermon
+
+    queryset = Sermon.objects.filter(is_public=True)
+    if church_id:
+        queryset = queryset.filter(church_id=church_id)
+    if preacher:
+        queryset = queryset.filter(preacher__icontains=preacher)
+    if date:
+        queryset = queryset.filter(date=date)
+    return queryset
+
+
+def news(church_id=None):
+    from .models import News
+
+    queryset = News.objects.filter(is_public=True)
+    if church_id:
+        return queryset.filter(church_id=church_id)
+    return queryset.select_related('church')
+
+
+def testimonies():
+    from .models import Testimony
+
+    return Testimony.objects.filter(is_approved=True)
+
+
+def prayer_requests(category=''):
+    from .models import PrayerRequest
+
+    queryset = PrayerRequest.objects.filter(is_approved=True, is_public=True)
+    if category:
+        queryset = queryset.filter(category=category)
+    return queryset
+
+
+def _sermon_json(sermon):
+    return {
+        'id': str(sermon.id),
+        'church_id': str(sermon.church_id),
+        'title': sermon.title,
+        'preacher': sermon.preacher,
+        'date': sermon.date.isoformat(),
+        'scripture_reference': sermon.scripture_reference or '',
+        'description': sermon.description,
+        'link': sermon.link or '',
+        'thumbnail': sermon.get_thumbnail_url() if sermon.thumbnail else '',
+    }
+
+
+def _news_json(item):
+    return {
+        'id': str(item.id),
+        'church_id': str(item.church_id),
+        'title': item.title,
+        'date': item.date.isoformat(),
+        'excerpt': item.excerpt,
+        'url': reverse('news_detail', args=[item.id]),
+    }
+
+
+def _testimony_json(testimony):
+    return {
+        'id': str(testimony.id),
+        'title': testimony.title,
+        'content': testimony.content,
+        'author': testimony.get_display_name(),
+        'location': testimony.location,
+        'category': testimony.category,
+        'created_at': testimony.created_at.isoformat(),
+    }
+
+
+def _prayer_request_json(prayer):
+    return {
+        'id': str(prayer.id),
+        'title': prayer.title,
+        'request': prayer.get_short_request(),
+        'author': prayer.get_display_name(),
+        'category': prayer.category,
+        'created_at': prayer.created_at.isoformat(),
+    }
+
+
+# name -> queryset builder (called with the feed's query parameters), ordering,
+# the card templates and the variable name they expect, and the JSON serializer
+LISTINGS = {
+    'sermons': {
+        'queryset': lambda params: sermons(params.get('church'), params.get('preacher', ''), parse_date(params.get('date'))),
+        'ordering': SERMON_ORDERING,
+        'item_name': 'sermon',
+        'cards': {'default': 'core/_sermon_list_card.html', 'watch': 'core/_sermon_watch_card.html'},
+        'json': _sermon_json,
+    },
+    'news': {
+        'queryset': lambda params: news(params.get('church')),
+        'ordering': NEWS_ORDERING,
+        'item_name': 'article',
+        'cards': {'default': 'core/_news_card.html'},
+        'json': _news_json,
+    },
+    'testimonies': {
+        'queryset': lambda params: testimonies(),
+        'ordering': TESTIMONY_ORDERING,
+        'item_name': 'testimony',
+        'cards': {'default': 'core/_testimony_card.html'},
+        'json': _testimony_json,
+    },
+    'prayer-requests': {
+        'queryset': lambda params: prayer_requests(params.get('category', '')),
+        'ordering': PRAYER_REQUEST_ORDERING,
+        'item_name': 'prayer',
+        'cards': {'default': 'core/_prayer_request_card.html'},
+        'json': _prayer_request_json,
+    },
+}
+
+
+def page_for_request(request, queryset, ordering):
+    """First page, or the page after ?cursor= (a bad cursor falls back to the first page)."""
+    try:
+        return paginate(queryset, ordering, request.GET.get('cursor'))
+    except CursorError:
+        return paginate(queryset, ordering)
+
+
+def listing_context(request, name, page, card='default', **params):
+    """
+    Template context for the "Load more" link and infinite scroll of a listing:
+    the feed URL (with the page's filters) and the plain next-page URL.
+    """
+    query = {key: value for key, value in params.items() if value}
+    if card != 'default':
+        query['card'] = card
+    next_url = None
+    if page.has_next:
+        page_query = request.GET.copy()
+        page_query['cursor'] = page.next_cursor
+        next_url = f'?{page_query.urlencode()}'
+    return {
+        'feed_url': reverse('listing_feed', args=[name]) + (f'?{urlencode(query)}' if query else ''),
+        'next_cursor': page.next_cursor or '',
+        'next_url': next_url,
+    }
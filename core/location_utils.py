@@ -2,10 +2,10 @@
 import math
 import unicodedata
 
-import requests
 from django.conf import settings
 
-from .models import Church, GlobalSettings
+from .geoip import lookup_ip
+from .models import GlobalSettings
 
 
 CITY_SLUG_ALTERNATIVES = {
@@ -120,42 +120,10 @@ def get_user_location(request):
             )
 
     ip = get_client_ip(request)
-    country = city = None
-    lat = lon = None
-
-    try:
-        response = requests.get(f'https://ipapi.co/{ip}/json/', timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            country = data.get('country_name')
-            city = data.get('city')
-            lat = data.get('latitude')
-            lon = data.get('longitude')
-    except Exception:
-        pass
-
-    if not country:
-        try:
-            response = requests.get(f'http://ip-api.com/json/{ip}', timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    country = data.get('country')
-                    city = data.get('city')
-                    lat = data.get('lat')
-                    lon = data.get('lon')
-        except Exception:
-            pass
-
     if ip in ('127.0.0.1', 'localhost', '::1'):
         return 'Germany', 'Düsseldorf', 51.2277, 6.7735
 
-    if lat is not None and lon is not None:
-        try:
-            lat, lon = float(lat), float(lon)
-        except (TypeError, ValueError):
-            lat = lon = None
-
+    country, city, lat, lon = lookup_ip(ip)
     return country, city, lat, lon
 
 
@@ -199,7 +167,10 @@ def find_nearest_church(country, city, user_lat=None, user_lon=None, request=Non
     Pick the church for the visitor's current city or country.
     Coordinates beat IP city names (mobile IPs often say Frankfurt for Düsseldorf).
     """
-    churches = list(Church.objects.filter(is_active=True, is_approved=True))
+    from .church_registry import get_church_registry
+
+    registry = get_church_registry()
+    churches = registry.churches
     if not churches:
         return None
     if len(churches) == 1:
@@ -212,14 +183,9 @@ def find_nearest_church(country, city, user_lat=None, user_lon=None, request=Non
     # Manual or GPS-confirmed choice from picker / phone
     if request and request.session.get('user_church_id'):
         if request.session.get('user_gps_confirmed') or request.session.get('user_church_manual'):
-            try:
-                return Church.objects.get(
-                    pk=request.session['user_church_id'],
-                    is_active=True,
-                    is_approved=True,
-                )
-            except Church.DoesNotExist:
-                pass
+            chosen = registry.get(request.session['user_church_id'])
+            if chosen is not None:
+                return chosen
 
     lat, lon = user_lat, user_lon
     if request and request.session.get('user_gps_confirmed'):
@@ -228,21 +194,18 @@ def find_nearest_church(country, city, user_lat=None, user_lon=None, request=Non
         if lon is None:
             lon = request.session.get('user_lon')
 
-    in_country = churches_in_country(churches, country) if country else []
+    in_country = registry.in_country(country) if country else []
     pool = in_country if in_country else churches
     multi_in_country = len(in_country) > 1
 
     closest = None
     closest_dist = None
     if lat is not None and lon is not None:
-        closest, closest_dist = find_closest_by_coordinates(pool, lat, lon, max_distance_km=max_km)
+        found = registry.nearest(lat, lon, k=1, max_km=max_km, among=in_country or None)
+        if found:
+            closest, closest_dist = found[0]
 
-    city_church = None
-    if city:
-        for church in pool:
-            if church.city and cities_match(city, church.city):
-                city_church = church
-                break
+    city_church = registry.first_in_city(city, pool) if city else None
 
     # IP city name disagrees with coordinates → trust coordinates (Rhine-Ruhr fix)
     if closest and city_church and closest.id != city_church.id and closest_dist is not None:
@@ -277,30 +240,19 @@ def needs_browser_location(request, country=None):
     """Germany (and similar) needs phone GPS — IP alone is unreliable."""
     if request.session.get('user_gps_confirmed') or request.session.get('user_church_manual'):
         return False
-    churches = list(Church.objects.filter(is_active=True, is_approved=True))
-    if country and country_has_multiple_churches(churches, country):
+    from .church_registry import get_church_registry
+
+    registry = get_church_registry()
+    if country and registry.count_in_country(country) > 1:
         return True
-    for c in churches:
-        if c.country and countries_match(c.country, 'Germany'):
-            if country_has_multiple_churches(churches, 'Germany'):
-                return True
-            break
-    return False
+    return registry.count_in_country('Germany') > 1
 
 
 def churches_for_location_json():
     """Churches with coordinates for browser-side nearest detection."""
-    result = []
-    for church in Church.objects.filter(is_active=True, is_approved=True):
-        if church.latitude is None or church.longitude is None:
-            continue
-        result.append({
-            'id': str(church.id),
-            'city': church.city or '',
-            'lat': float(church.latitude),
-            'lon': float(church.longitude),
-        })
-    return result
+    from .church_registry import get_church_registry
+
+    return list(get_church_registry().location_json)
 
 
 def church_location_redirect(church):
@@ -0,0 +1,86 @@
+"""Measure page-view ingestion: buffered bulk writes vs one INSERT per view."""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.analytics_models import AnalyticsSettings, PageView, VisitorSession
+from core.analytics_tracking import PageViewBuffer, stored_ip
+
+USER_AGENTS = (
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (Linux; Android 14) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Mobile Safari/537.36',
+)
+PATHS = ('/', '/churches/', '/events/', '/events/calendar/', '/watch/', '/sermon/', '/about/')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark analytics ingestion throughput (page views per second)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--views', type=int, default=20000)
+        parser.add_argument('--visitors', type=int, default=2000)
+        parser.add_argument('--naive', type=int, default=500, help='Views to write one-by-one for comparison (0 to skip)')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _hits(self, count, visitors, rng, prefix):
+        now = timezone.now()
+        for i in range(count):
+            visitor = rng.randrange(visitors)
+            path = rng.choice(PATHS)
+            yield {
+                'visitor_id': f'{prefix}{visitor}',
+                'ip': f'{rng.randint(11, 220)}.{visitor % 256}.{rng.randint(0, 255)}.{rng.randint(1, 254)}',
+                'user_agent': USER_AGENTS[visitor % len(USER_AGENTS)],
+                'referrer': 'https://www.google.com/' if i % 5 == 0 else '',
+                'url': f'https://bethelprayerministryinternational.com{path}',
+                'path': path,
+                'view_name': 'bench',
+                'church_id': None,
+                'load_time': rng.randint(5, 200),
+                'timestamp': now,
+            }
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = f'bench-{int(time.time())}-'
+        config = AnalyticsSettings.get_settings()
+        buffer = PageViewBuffer(max_size=options['views'] + 1)
+        hits = list(self._hits(options['views'], options['visitors'], rng, prefix))
+
+        # Request path: only the in-memory append (no flusher thread)
+        buffer._ensure_thread = lambda: None
+        t0 = time.perf_counter()
+        for hit in hits:
+            buffer.record(hit)
+        record_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        stored = buffer.flush()
+        flush_s = time.perf_counter() - t0
+
+        naive_s = 0.0
+        naive = options['naive']
+        if naive:
+            t0 = time.perf_counter()
+            for hit in self._hits(naive, options['visitors'], rng, f'{prefix}naive-'):
+                session, _ = VisitorSession.objects.get_or_create(
+                    session_id=hit['visitor_id'],
+                    defaults={'ip_address': stored_ip(hit['ip']), 'user_agent': hit['user_agent']},
+                )
+                PageView.objects.create(session=session, url=hit['url'], path=hit['path'], load_time=hit['load_time'])
+                VisitorSession.objects.filter(pk=session.pk).update(page_views_count=session.page_views_count + 1)
+            naive_s = time.perf_counter() - t0
+
+        VisitorSession.objects.filter(session_id__startswith=prefix).delete()
+
+        self.stdout.write(self.style.SUCCESS(f'Analytics ingestion (batch_size={config.batch_size})'))
+        self.stdout.write(
+            f'request path (buffer append) {len(hits) / record_s:12.0f} views/s  '
+            f'({record_s / len(hits) * 1e6:.2f}us per view)'
+        )
+        self.stdout.write(f'background bulk flush        {stored / flush_s:12.0f} views/s  ({stored} stored in {flush_s:.2f}s)')
+        if naive:
+            self.stdout.write(f'one INSERT per view (old)    {naive / naive_s:12.0f} views/s  ({naive} in {naive_s:.2f}s)')
@@ -0,0 +1,100 @@
+"""Micro-benchmark cache backends: locmem vs file-based vs the shared SQLite cache."""
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from core.cache_backends import SQLiteCache
+
+
+def _make(kind, workdir, l1=True):
+    params = {'TIMEOUT': 300, 'OPTIONS': {'MAX_ENTRIES': 100000}}
+    if kind == 'locmem':
+        return LocMemCache(f'bench-{time.time()}', params)
+    if kind == 'file':
+        return FileBasedCache(os.path.join(workdir, 'filecache'), params)
+    # Counters skip the L1, as the version keys do in settings.CACHES
+    params['OPTIONS'].update(L1_MAX_ENTRIES=512 if l1 else 0, L1_TIMEOUT=2, L1_EXCLUDE=('bench:counter',))
+    return SQLiteCache(os.path.join(workdir, f'cache-{"l1" if l1 else "nol1"}.sqlite3'), params)
+
+
+def _incr_worker(kind, workdir, l1, count):
+    cache = _make(kind, workdir, l1)
+    try:
+        for _ in range(count):
+            cache.incr('bench:counter')
+    except ValueError:
+        # Process-local backend: the parent's counter is not visible here
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Compare get/set/incr throughput and cross-process counters of cache backends'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=5000)
+        parser.add_argument('--page-kb', type=int, default=60, help='Size of the "page" values')
+        parser.add_argument('--processes', type=int, default=4, help='Processes incrementing one shared counter')
+
+    def _timed(self, count, fn):
+        t0 = time.perf_counter()
+        for i in range(count):
+            fn(i)
+        return count / (time.perf_counter() - t0)
+
+    def handle(self, *args, **options):
+        ops = options['ops']
+        page = 'x' * (options['page_kb'] * 1024)
+        small = {'id': 42, 'title': 'Sunday Service', 'tags': ['worship', 'prayer']}
+        workdir = tempfile.mkdtemp(prefix='bench-cache-')
+        backends = (
+            ('locmem', 'locmem', True),
+            ('file', 'file', True),
+            ('sqlite (no L1)', 'sqlite', False),
+            ('sqlite + L1', 'sqlite', True),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Cache backends: {ops} ops each, {options["page_kb"]} KB pages (ops/s, higher is better)'
+        ))
+        self.stdout.write(f'{"backend":<16}{"set small":>11}{"get hot":>11}{"get miss":>11}'
+                          f'{"set page":>11}{"get page":>11}{"incr":>11}  shared counter')
+        try:
+            for label, kind, l1 in backends:
+                cache = _make(kind, workdir, l1)
+                cache.clear()
+                set_small = self._timed(ops, lambda i: cache.set(f'small:{i}', small))
+                get_hot = self._timed(ops, lambda i: cache.get(f'small:{i % 50}'))
+                get_miss = self._timed(ops, lambda i: cache.get(f'missing:{i}'))
+                page_ops = max(1, ops // 10)
+                set_page = self._timed(page_ops, lambda i: cache.set(f'page:{i % 20}', page))
+                get_page = self._timed(page_ops, lambda i: cache.get(f'page:{i % 20}'))
+                cache.set('bench:counter', 0)
+                incr = self._timed(ops, lambda i: cache.incr('bench:counter'))
+
+                # Several processes incrementing the same key (gunicorn workers bumping a version)
+                cache.set('bench:counter', 0)
+                per_process = max(1, ops // 10)
+                procs = [
+                    multiprocessing.Process(target=_incr_worker, args=(kind, workdir, l1, per_process))
+                    for _ in range(options['processes'])
+                ]
+                for proc in procs:
+                    proc.start()
+                for proc in procs:
+                    proc.join()
+                expected = per_process * options['processes']
+                got = _make(kind, workdir, l1).get('bench:counter') if kind != 'locmem' else cache.get('bench:counter')
+                shared = f'{got}/{expected}'
+                if got != expected:
+                    shared += ' (lost updates)' if got else ' (not shared)'
+                self.stdout.write(
+                    f'{label:<16}{set_small:>11.0f}{get_hot:>11.0f}{get_miss:>11.0f}'
+                    f'{set_page:>11.0f}{get_page:>11.0f}{incr:>11.0f}  {shared}'
+                )
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
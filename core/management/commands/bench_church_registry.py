@@ -0,0 +1,76 @@
+"""Compare nearest-church lookups: per-request Python scan vs the church registry."""
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.church_registry import ChurchRegistry, get_church_registry, np
+from core.location_utils import find_closest_by_coordinates
+from core.models import Church
+
+from .bench_geoip import _percentile
+
+
+class Command(BaseCommand):
+    help = 'Benchmark nearest-church lookups: linear haversine scan vs registry (grid + vectorized)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookups', type=int, default=2000)
+        parser.add_argument(
+            '--synthetic', type=int, default=0,
+            help='Use this many generated (unsaved) churches instead of the database',
+        )
+        parser.add_argument('--max-km', type=float, default=400)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _report(self, label, samples):
+        ms = [s * 1000 for s in samples]
+        self.stdout.write(
+            f'{label:<24} n={len(ms):<6} mean={statistics.mean(ms):9.4f}ms '
+            f'p50={_percentile(ms, 50):9.4f}ms p95={_percentile(ms, 95):9.4f}ms '
+            f'p99={_percentile(ms, 99):9.4f}ms'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        if options['synthetic']:
+            churches = [
+                Church(
+                    id=i, name=f'Church {i}', city=f'City {i}', country=f'Country {i % 50}',
+                    latitude=round(rng.uniform(-55, 65), 6), longitude=round(rng.uniform(-180, 180), 6),
+                )
+                for i in range(options['synthetic'])
+            ]
+            t0 = time.perf_counter()
+            registry = ChurchRegistry(churches)
+            self.stdout.write(f'Built registry for {len(registry)} churches in {(time.perf_counter() - t0) * 1000:.1f}ms')
+        else:
+            registry = get_church_registry()
+            churches = registry.churches
+        if not churches:
+            self.stderr.write('No churches; use --synthetic N.')
+            return
+
+        points = [(rng.uniform(-55, 65), rng.uniform(-180, 180)) for _ in range(options['lookups'])]
+        max_km = options['max_km']
+
+        scan, indexed, mismatches = [], [], 0
+        for lat, lon in points:
+            t0 = time.perf_counter()
+            expected, _ = find_closest_by_coordinates(churches, lat, lon, max_distance_km=max_km)
+            scan.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            found = registry.nearest(lat, lon, k=1, max_km=max_km)
+            indexed.append(time.perf_counter() - t0)
+            got = found[0][0] if found else None
+            if (expected and expected.id) != (got and got.id):
+                mismatches += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Nearest church within {max_km:g}km ({len(churches)} churches, numpy={"yes" if np is not None else "no"})'
+        ))
+        self._report('linear scan (old)', scan)
+        self._report('registry', indexed)
+        if mismatches:
+            self.stderr.write(f'{mismatches} lookups disagreed with the linear scan')
@@ -0,0 +1,113 @@
+"""Compare visitor geolocation latency: per-request HTTP lookups vs the offline resolver."""
+import ipaddress
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.geoip import CSVRangeResolver, GeoIPResolver, HTTPResolver, get_resolver
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def _synthetic_rows(count, rng):
+    """Contiguous /20 ranges across public IPv4 space with made-up locations."""
+    rows = []
+    base = int(ipaddress.ip_address('11.0.0.0'))
+    for i in range(count):
+        start = base + i * 4096
+        rows.append([
+            str(ipaddress.ip_address(start)),
+            str(ipaddress.ip_address(start + 4095)),
+            f'Country {i % 200}',
+            f'City {i}',
+            str(rng.uniform(-60, 60)),
+            str(rng.uniform(-180, 180)),
+        ])
+    return rows, base, base + count * 4096 - 1
+
+
+class Command(BaseCommand):
+    help = 'Benchmark IP geolocation: old HTTP providers vs offline database + LRU'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lookups', type=int, default=5000, help='Offline lookups to time')
+        parser.add_argument('--distinct', type=int, default=500, help='Distinct IPs in the workload')
+        parser.add_argument('--http-lookups', type=int, default=5, help='HTTP lookups to time (0 to skip)')
+        parser.add_argument(
+            '--synthetic', type=int, default=0,
+            help='Benchmark a generated CSV range table with this many ranges instead of GEOIP_DATABASE_PATH',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _report(self, label, samples):
+        if not samples:
+            self.stdout.write(f'{label:<28} (no samples)')
+            return
+        ms = [s * 1000 for s in samples]
+        self.stdout.write(
+            f'{label:<28} n={len(ms):<6} mean={statistics.mean(ms):9.4f}ms '
+            f'p50={_percentile(ms, 50):9.4f}ms p95={_percentile(ms, 95):9.4f}ms '
+            f'p99={_percentile(ms, 99):9.4f}ms'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        if options['synthetic']:
+            rows, low, high = _synthetic_rows(options['synthetic'], rng)
+            t0 = time.perf_counter()
+            backend = CSVRangeResolver(rows=rows)
+            self.stdout.write(f'Loaded {len(backend)} synthetic ranges in {(time.perf_counter() - t0) * 1000:.1f}ms')
+            resolver = GeoIPResolver([backend])
+        else:
+            resolver = get_resolver()
+            if not resolver.backends:
+                self.stderr.write('No GeoIP database configured; use --synthetic N or set GEOIP_DATABASE_PATH.')
+                return
+            low = int(ipaddress.ip_address('1.0.0.0'))
+            high = int(ipaddress.ip_address('223.255.255.255'))
+
+        ips = []
+        while len(ips) < options['distinct']:
+            ip = str(ipaddress.ip_address(rng.randint(low, high)))
+            if ipaddress.ip_address(ip).is_global:
+                ips.append(ip)
+        workload = [rng.choice(ips) for _ in range(options['lookups'])]
+
+        resolver.clear()
+        cold = []
+        for ip in ips:
+            t0 = time.perf_counter()
+            resolver.lookup(ip)
+            cold.append(time.perf_counter() - t0)
+        warm = []
+        for ip in workload:
+            t0 = time.perf_counter()
+            resolver.lookup(ip)
+            warm.append(time.perf_counter() - t0)
+
+        http = []
+        http_failures = 0
+        if options['http_lookups']:
+            backend = HTTPResolver(timeout=5)
+            for ip in ips[:options['http_lookups']]:
+                t0 = time.perf_counter()
+                if backend.lookup(ip) is None:
+                    http_failures += 1
+                http.append(time.perf_counter() - t0)
+
+        self.stdout.write(self.style.SUCCESS('GeoIP lookup latency'))
+        self._report('http (old, per request)', http)
+        if http_failures:
+            self.stdout.write(f'  {http_failures}/{len(http)} HTTP lookups returned nothing')
+        self._report('offline, cold cache', cold)
+        self._report('offline + LRU, mixed', warm)
+        self.stdout.write(f'LRU hits={resolver.hits} misses={resolver.misses}')
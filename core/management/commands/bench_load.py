@@ -0,0 +1,293 @@
+"""Load benchmark of the public and admin hot paths on a seeded dataset, with a saved baseline to compare against."""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import metrics, synthetic_data
+from core.analytics_models import VisitorSession
+from core.models import Church, Event
+
+from .bench_geoip import _percentile
+
+SLUG_PREFIX = 'bench-load-'
+STAFF_USERNAME = 'bench-load-staff'
+USER_AGENT = 'bethel-bench-load'
+HOST = 'localhost'
+
+# Views measured, in order: name -> url builder(dataset)
+VIEWS = {
+    'smart_home': lambda d: reverse('smart_home'),
+    'church_home': lambda d: reverse('church_home', args=[d['church'].id]),
+    'church_list': lambda d: reverse('church_list'),
+    'calendar_view': lambda d: reverse('calendar'),
+    'watch': lambda d: reverse('watch'),
+    'event_detail': lambda d: reverse('event_detail', args=[d['event'].id]),
+    'sitemap': lambda d: reverse('sitemap'),
+    'analytics_dashboard': lambda d: reverse('analytics_dashboard'),
+}
+STAFF_VIEWS = {'analytics_dashboard'}
+
+# Request-path middleware that writes elsewhere (analytics flusher, shared metrics) is left out in-process
+SKIPPED_MIDDLEWARE = ('core.middleware.AnalyticsTrackingMiddleware', 'core.middleware.MetricsMiddleware')
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark hot-path views (p50/p95/p99 latency, queries) on seeded data; compare with a baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--churches', type=int, default=50)
+        parser.add_argument('--events', type=int, default=30, help='Events per church')
+        parser.add_argument('--sermons', type=int, default=30, help='Sermons per church')
+        parser.add_argument('--news', type=int, default=10, help='News articles per church')
+        parser.add_argument('--ministries', type=int, default=5, help='Ministries per church')
+        parser.add_argument('--visits', type=int, default=5000, help='Analytics visitor sessions (about 3 page views each)')
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per view')
+        parser.add_argument('--warmup', type=int, default=3, help='Unmeasured requests per view first')
+        parser.add_argument('--views', nargs='+', choices=list(VIEWS), default=list(VIEWS))
+        parser.add_argument('--page-cache', action='store_true', help='Keep the full-page cache on (off by default)')
+        parser.add_argument('--gunicorn', action='store_true', help='Drive a local gunicorn over HTTP (data is committed, then deleted)')
+        parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--output', help='Results JSON (default bench_results/load-<time>.json)')
+        parser.add_argument('--baseline', help='Baseline JSON to compare with')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline instead of comparing')
+        parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed p95 slowdown (fraction)')
+        parser.add_argument('--min-delta-ms', type=float, default=5.0, help='Ignore p95 slowdowns smaller than this')
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline needs --baseline PATH')
+        with tempfile.TemporaryDirectory() as sitemap_root, override_settings(
+            SITEMAP_ROOT=sitemap_root, PAGE_CACHE_ENABLED=options['page_cache'],
+        ):
+            if options['gunicorn']:
+                results = self._run_gunicorn(options, sitemap_root)
+            else:
+                results = self._run_in_process(options)
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'bench_results' / f"load-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f'Results written to {output}')
+
+        if options['baseline']:
+            baseline = Path(options['baseline'])
+            if options['save_baseline']:
+                baseline.parent.mkdir(parents=True, exist_ok=True)
+                baseline.write_text(json.dumps(results, indent=2))
+                self.stdout.write(f'Baseline saved to {baseline}')
+            else:
+                self._compare(results, json.loads(baseline.read_text()), options)
+
+    # Dataset
+
+    def _seed(self, options):
+        from django.contrib.auth.models import User
+
+        sizes = {key: options[key] for key in ('churches', 'events', 'sermons', 'news', 'ministries')}
+        sizes.update(sessions=options['visits'], views_per_session=3, days=30)
+        t0 = time.perf_counter()
+        try:
+            report = synthetic_data.generate(sizes, seed=options['seed'], prefix=SLUG_PREFIX)
+        except ValueError as exc:
+            raise CommandError(f'{exc} (left over from an interrupted run?)')
+        staff = User.objects.create_user(STAFF_USERNAME, password=None, is_staff=True)
+        self.stdout.write(
+            'Seeded ' + ', '.join(f'{phase} {rows}' for phase, (rows, _) in report.items())
+            + f' rows in {time.perf_counter() - t0:.1f}s'
+        )
+
+        ids = synthetic_data.church_ids(SLUG_PREFIX)
+        listed = Church.objects.filter(pk__in=ids, is_active=True, is_approved=True)
+        order = {pk: index for index, pk in enumerate(ids)}
+        church = min(listed, key=lambda c: order[c.pk], default=None)
+        events = Event.objects.filter(church=church, is_public=True)
+        event = (
+            events.filter(start_date__gte=timezone.now()).order_by('start_date').first()
+            or events.order_by('-start_date').first()
+        )
+        if church is None or event is None:
+            raise CommandError('The dataset needs at least one listed church with a public event')
+        return {'church_ids': ids, 'church': church, 'event': event, 'staff': staff}
+
+    def _dataset_meta(self, options):
+        return {key: options[key] for key in ('churches', 'events', 'sermons', 'news', 'ministries', 'visits', 'seed')}
+
+    # Runners
+
+    def _run_in_process(self, options):
+        middleware = [m for m in settings.MIDDLEWARE if m not in SKIPPED_MIDDLEWARE]
+        results = None
+        try:
+            with transaction.atomic(), override_settings(MIDDLEWARE=middleware):
+                dataset = self._seed(options)
+                anonymous, staff = Client(HTTP_HOST=HOST), Client(HTTP_HOST=HOST)
+                staff.force_login(dataset['staff'])
+
+                def fetch(name, url):
+                    client = staff if name in STAFF_VIEWS else anonymous
+                    with metrics.collect() as stats:
+                        started = time.perf_counter()
+                        response = client.get(url)
+                        elapsed = time.perf_counter() - started
+                    return response.status_code, elapsed, stats.queries
+
+                results = self._measure(options, dataset, fetch, mode='client')
+                raise _Rollback
+        except _Rollback:
+            synthetic_data.invalidate_caches(dataset['church_ids'])
+            self.stdout.write('Seeded rows rolled back.')
+        return results
+
+    def _run_gunicorn(self, options, sitemap_root):
+        import requests
+        from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+        from django.contrib.auth.models import User
+        from importlib import import_module
+
+        dataset = self._seed(options)
+        server = None
+        try:
+            store = import_module(settings.SESSION_ENGINE).SessionStore()
+            store[SESSION_KEY] = str(dataset['staff'].pk)
+            store[BACKEND_SESSION_KEY] = 'django.contrib.auth.backends.ModelBackend'
+            store[HASH_SESSION_KEY] = dataset['staff'].get_session_auth_hash()
+            store.save()
+
+            port = 8000 + random.Random().randint(1000, 8999)
+            env = {
+                **os.environ, 'SITEMAP_ROOT': sitemap_root,
+                'PAGE_CACHE_ENABLED': str(options['page_cache']), 'DJANGO_SETTINGS_MODULE': 'backend.settings',
+            }
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', 'backend.wsgi:application', '--bind', f'127.0.0.1:{port}',
+                 '--workers', str(options['workers']), '--access-logfile', os.devnull],
+                cwd=settings.BASE_DIR, env=env,
+            )
+            base = f'http://127.0.0.1:{port}'
+            session = requests.Session()
+            session.headers.update({'Host': HOST, 'User-Agent': USER_AGENT})
+            for _ in range(100):
+                try:
+                    session.get(f'{base}/startup-health/', timeout=1)
+                    break
+                except requests.ConnectionError:
+                    time.sleep(0.2)
+            else:
+                raise CommandError('gunicorn did not start')
+            cookies = {settings.SESSION_COOKIE_NAME: store.session_key}
+
+            def fetch(name, url):
+                started = time.perf_counter()
+                response = session.get(
+                    base + url, allow_redirects=False, timeout=30,
+                    cookies=cookies if name in STAFF_VIEWS else None,
+                )
+                return response.status_code, time.perf_counter() - started, None
+
+            return self._measure(options, dataset, fetch, mode='gunicorn')
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+            # Also the sessions the workers' analytics middleware recorded for our requests
+            VisitorSession.objects.filter(user_agent=USER_AGENT).delete()
+            synthetic_data.delete(SLUG_PREFIX)
+            User.objects.filter(username=STAFF_USERNAME).delete()
+            self.stdout.write('Seeded rows deleted.')
+
+    def _measure(self, options, dataset, fetch, mode):
+        views = {}
+        for name in options['views']:
+            url = VIEWS[name](dataset)
+            for _ in range(options['warmup']):
+                fetch(name, url)
+            samples, queries, statuses = [], [], set()
+            for _ in range(options['requests']):
+                status, elapsed, count = fetch(name, url)
+                samples.append(elapsed * 1000)
+                statuses.add(status)
+                if count is not None:
+                    queries.append(count)
+            views[name] = {
+                'url': url,
+                'status': sorted(statuses),
+                'n': len(samples),
+                'mean_ms': round(sum(samples) / len(samples), 3),
+                'p50_ms': round(_percentile(samples, 50), 3),
+                'p95_ms': round(_percentile(samples, 95), 3),
+                'p99_ms': round(_percentile(samples, 99), 3),
+                'queries': _percentile(queries, 50) if queries else None,
+                'queries_max': max(queries) if queries else None,
+            }
+            row = views[name]
+            self.stdout.write(
+                f"{name:<20} {'/'.join(map(str, row['status'])):<8} p50={row['p50_ms']:8.2f}ms p95={row['p95_ms']:8.2f}ms "
+                f"p99={row['p99_ms']:8.2f}ms queries={row['queries'] if row['queries'] is not None else '-'}"
+            )
+        return {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'mode': mode,
+                'commit': _git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': settings.DATABASES['default']['ENGINE'],
+                'page_cache': options['page_cache'],
+                'requests': options['requests'],
+                'dataset': self._dataset_meta(options),
+            },
+            'views': views,
+        }
+
+    # Baseline
+
+    def _compare(self, results, baseline, options):
+        if baseline['meta'].get('dataset') != results['meta']['dataset'] or baseline['meta'].get('mode') != results['meta']['mode']:
+            self.stdout.write(self.style.WARNING('Baseline was taken with a different dataset or mode; comparing anyway'))
+        regressions = []
+        for name, row in results['views'].items():
+            base = baseline['views'].get(name)
+            if base is None:
+                continue
+            delta = row['p95_ms'] - base['p95_ms']
+            pct = delta / base['p95_ms'] * 100 if base['p95_ms'] else 0.0
+            line = f"{name:<20} p95 {base['p95_ms']:8.2f} -> {row['p95_ms']:8.2f}ms ({pct:+.0f}%)"
+            if row['queries'] is not None and base.get('queries') is not None:
+                line += f"  queries {base['queries']} -> {row['queries']}"
+            if delta > options['min_delta_ms'] and row['p95_ms'] > base['p95_ms'] * (1 + options['tolerance']):
+                regressions.append(f'{name}: p95 {base["p95_ms"]:.2f}ms -> {row["p95_ms"]:.2f}ms')
+            if row['queries'] is not None and base.get('queries') is not None and row['queries'] > base['queries']:
+                regressions.append(f'{name}: queries {base["queries"]} -> {row["queries"]}')
+            if row['status'] != base.get('status'):
+                regressions.append(f'{name}: status {base.get("status")} -> {row["status"]}')
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError('Performance regressions against the baseline:\n  ' + '\n  '.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against the baseline.'))
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
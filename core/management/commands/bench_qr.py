@@ -0,0 +1,76 @@
+"""Compare event page QR codes: inline base64 PNG generated per request vs stored files (core.qr_codes)."""
+import base64
+import io
+import statistics
+import tempfile
+import time
+
+import qrcode
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from core import qr_codes
+
+from .bench_geoip import _percentile
+
+
+def _inline_png(url):
+    """What event_detail did on every request before QR codes were stored."""
+    qr = qrcode.QRCode(box_size=8, border=2)
+    qr.add_data(url)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="#1e3a8a", back_color="white")
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark QR code rendering for event pages (files go to a temporary storage)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--events', type=int, default=200, help='Distinct event URLs')
+        parser.add_argument('--requests', type=int, default=2000, help='Page renders per warm phase')
+
+    def _report(self, label, samples):
+        ms = [s * 1000 for s in samples]
+        self.stdout.write(
+            f'{label:<38} n={len(ms):<5} mean={statistics.mean(ms):8.3f}ms '
+            f'p50={_percentile(ms, 50):8.3f}ms p95={_percentile(ms, 95):8.3f}ms'
+        )
+
+    def _time(self, func, urls):
+        samples = []
+        for url in urls:
+            t0 = time.perf_counter()
+            func(url)
+            samples.append(time.perf_counter() - t0)
+        return samples
+
+    def handle(self, *args, **options):
+        paths = [f'/church/00000000-0000-0000-0000-{i:012d}/events/{i:08x}-0000-0000-0000-000000000000/'
+                 for i in range(options['events'])]
+        warm = [paths[i % len(paths)] for i in range(options['requests'])]
+
+        self._report('before: inline PNG + base64', self._time(lambda p: _inline_png(qr_codes.canonical_url(p)), warm))
+        inline_bytes = len(f'<img src="data:image/png;base64,{_inline_png(qr_codes.canonical_url(paths[0]))}">')
+
+        with tempfile.TemporaryDirectory() as location, override_settings(STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage', 'OPTIONS': {'location': location}},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+        }):
+            qr_codes._known.clear()
+            self._report('after: first render (generate+store)', self._time(qr_codes.event_qr_url, paths))
+            self._report('after: warm process', self._time(qr_codes.event_qr_url, warm))
+            qr_codes._known.clear()
+            self._report('after: new process (file exists)', self._time(qr_codes.event_qr_url, paths))
+            url = qr_codes.event_qr_url(paths[0])
+            name = qr_codes.storage_name(qr_codes.digest(qr_codes.canonical_url(paths[0]), 'png'), 'png')
+            file_size = default_storage.size(name)
+            qr_codes._known.clear()
+
+        self.stdout.write(
+            f'HTML per page: {inline_bytes} bytes inline vs {len(f"<img src={url!r}>")} bytes linked '
+            f'(PNG file {file_size} bytes, fetched once and cached for a year)'
+        )
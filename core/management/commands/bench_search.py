@@ -0,0 +1,137 @@
+"""Compare sermon keyword search: icontains table scan vs the full-text index, on generated rows."""
+import datetime
+import random
+import statistics
+import time
+
+from django.db import transaction
+from django.core.management.base import BaseCommand
+
+from core import search
+from core.models import Church, SearchDocument, Sermon
+
+from .bench_geoip import _percentile
+
+WORDS = (
+    'grace faith hope love prayer worship praise glory kingdom spirit holy light salvation mercy peace joy '
+    'healing covenant promise blessing wisdom truth life word gospel cross resurrection heaven righteousness '
+    'forgiveness strength victory harvest revival fellowship family servant shepherd river fire water bread '
+    'mountain valley journey calling purpose identity freedom anointing breakthrough patience gratitude'
+).split()
+PREACHERS = [f'Pastor {name}' for name in 'Mensah Boateng Owusu Asante Adjei Darko Appiah Osei Amoah Badu'.split()]
+BOOKS = 'Genesis Exodus Psalms Proverbs Isaiah Matthew Mark Luke John Acts Romans Ephesians Hebrews James'.split()
+SYLLABLES = 'ba be bo da de di ka ke ko la le li ma me mo na ne ni ra re ro sa se si ta te to va ve wa ya za'.split()
+
+
+def _vocabulary(rng, size):
+    """Real theme words followed by generated ones, most frequent first (Zipf-like weights)."""
+    words = list(WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    cum_weights, total = [], 0.0
+    for rank in range(len(words)):
+        total += 1.0 / (rank + 1)
+        cum_weights.append(total)
+    return words, cum_weights
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark sermon search on N generated sermons (rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000)
+        parser.add_argument('--churches', type=int, default=20)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--vocabulary', type=int, default=20000, help='Distinct words in generated text')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def _report(self, label, samples):
+        ms = [s * 1000 for s in samples]
+        self.stdout.write(
+            f'{label:<28} n={len(ms):<5} mean={statistics.mean(ms):9.2f}ms '
+            f'p50={_percentile(ms, 50):9.2f}ms p95={_percentile(ms, 95):9.2f}ms'
+        )
+
+    def _text(self, rng, words):
+        return ' '.join(rng.choices(self.vocabulary, cum_weights=self.cum_weights, k=words))
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(options)
+                raise _Rollback
+        except _Rollback:
+            self.stdout.write('Generated rows rolled back.')
+
+    def _run(self, options):
+        from django.db.models import Q
+
+        rng = random.Random(options['seed'])
+        self.vocabulary, self.cum_weights = _vocabulary(rng, options['vocabulary'])
+        t0 = time.perf_counter()
+        churches = Church.objects.bulk_create([
+            Church(
+                name=f'Bench Church {i}', slug=f'bench-church-{i}', address='1 Main St', city=f'City {i}', country='Ghana',
+                email=f'bench{i}@example.com', phone='0', is_approved=True, is_active=True,
+            )
+            for i in range(options['churches'])
+        ])
+        start = datetime.date(2000, 1, 1)
+        sermons = [
+            Sermon(
+                church=churches[i % len(churches)],
+                title=self._text(rng, 4).title(),
+                preacher=rng.choice(PREACHERS),
+                description=self._text(rng, 60),
+                scripture_reference=f'{rng.choice(BOOKS)} {rng.randint(1, 30)}:{rng.randint(1, 40)}',
+                date=start + datetime.timedelta(days=i % 9000),
+            )
+            for i in range(options['rows'])
+        ]
+        Sermon.objects.bulk_create(sermons, batch_size=2000)
+        self.stdout.write(f'Generated {len(sermons)} sermons in {time.perf_counter() - t0:.1f}s')
+
+        t0 = time.perf_counter()
+        docs = [SearchDocument(kind='sermon', object_id=s.pk, **search._document_fields('sermon', s)) for s in sermons]
+        SearchDocument.objects.bulk_create(docs, batch_size=2000)
+        self.stdout.write(f'Indexed {len(docs)} documents in {time.perf_counter() - t0:.1f}s')
+
+        # Theme words and mid-frequency words, whole or as a 4-letter prefix
+        candidates = self.vocabulary[:2000]
+        queries = [
+            ' '.join(rng.sample(candidates, rng.choice((1, 2)))) if i % 3 else rng.choice(candidates)[:4]
+            for i in range(options['queries'])
+        ]
+        church = churches[0]
+        scan_all, scan_church, fts_all, fts_church = [], [], [], []
+        for query in queries:
+            words = query.split()
+            for church_id, samples in ((None, scan_all), (church.id, scan_church)):
+                qs = Sermon.objects.filter(is_public=True)
+                if church_id:
+                    qs = qs.filter(church_id=church_id)
+                for word in words:
+                    qs = qs.filter(
+                        Q(title__icontains=word) | Q(description__icontains=word) | Q(scripture_reference__icontains=word)
+                    )
+                t0 = time.perf_counter()
+                list(qs.order_by('-date')[:20])
+                samples.append(time.perf_counter() - t0)
+            for church_id, samples in ((None, fts_all), (church.id, fts_church)):
+                t0 = time.perf_counter()
+                search.search(query, church_id=church_id, kinds=['sermon'], limit=20)
+                samples.append(time.perf_counter() - t0)
+
+        self.stdout.write(self.style.SUCCESS(f'Top-20 sermon search, {len(queries)} queries'))
+        self._report('icontains (all churches)', scan_all)
+        self._report('full-text (all churches)', fts_all)
+        self._report('icontains (one church)', scan_church)
+        self._report('full-text (one church)', fts_church)
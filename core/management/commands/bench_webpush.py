@@ -0,0 +1,121 @@
+"""Benchmark web push fan-out against a local stand-in push service."""
+import base64
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core.push_notifications import fan_out
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+class StandInPushHandler(BaseHTTPRequestHandler):
+    """Accepts pushes like FCM/Mozilla autopush: 201, plus scripted 410/429/503."""
+    latency = 0.05
+    seen = set()
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        time.sleep(self.latency)
+        kind = self.path.split('/')[1]
+        status = 201
+        if kind == 'gone':
+            status = 410
+        elif kind == 'flaky':
+            with self.lock:
+                first = self.path not in self.seen
+                self.seen.add(self.path)
+            if first:
+                status = random.choice((429, 503))
+        self.send_response(status)
+        if status == 429:
+            self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Compare sequential vs pooled web push delivery against a local stand-in server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscriptions', type=int, default=300)
+        parser.add_argument('--latency-ms', type=float, default=50, help='Stand-in server response time')
+        parser.add_argument('--gone', type=float, default=0.05, help='Share of endpoints answering 410')
+        parser.add_argument('--flaky', type=float, default=0.05, help='Share answering 429/503 once')
+        parser.add_argument('--workers', type=int, default=16)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        try:
+            from cryptography.hazmat.primitives.asymmetric import ec
+            from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+            from py_vapid import Vapid
+        except ImportError:
+            self.stderr.write('Install pywebpush first: pip install pywebpush')
+            return
+
+        rng = random.Random(options['seed'])
+        StandInPushHandler.latency = options['latency_ms'] / 1000.0
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StandInPushHandler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_address[1]}'
+
+        vapid = Vapid()
+        vapid.generate_keys()
+        private_pem = vapid.private_pem().decode('utf-8')
+
+        def subscriptions(run):
+            subs = []
+            for i in range(options['subscriptions']):
+                roll = rng.random()
+                kind = 'gone' if roll < options['gone'] else 'flaky' if roll < options['gone'] + options['flaky'] else 'ok'
+                key = ec.generate_private_key(ec.SECP256R1()).public_key().public_bytes(
+                    Encoding.X962, PublicFormat.UncompressedPoint,
+                )
+                subs.append(SimpleNamespace(
+                    pk=i,
+                    endpoint=f'{base_url}/{kind}/{run}-{i}',
+                    p256dh_key=_b64(key),
+                    auth_key=_b64(os.urandom(16)),
+                ))
+            return subs
+
+        payload = {'title': 'Benchmark', 'body': 'Stand-in push', 'url': '/', 'tag': 'bench'}
+        results = []
+        common = dict(
+            WEBPUSH_VAPID_PRIVATE_KEY=private_pem,
+            WEBPUSH_RETRY_BACKOFF=0.05,
+            WEBPUSH_TIMEOUT=5,
+        )
+        for label, workers in (('sequential (old)', 1), (f'pool x{options["workers"]}', options['workers'])):
+            subs = subscriptions(label.split()[0])
+            with override_settings(WEBPUSH_MAX_WORKERS=workers, **common):
+                t0 = time.perf_counter()
+                report = fan_out(subs, payload, prune=None)
+                elapsed = time.perf_counter() - t0
+            results.append((label, elapsed, report))
+        server.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Web push fan-out: {options["subscriptions"]} subscriptions, '
+            f'{options["latency_ms"]:g}ms stand-in latency'
+        ))
+        for label, elapsed, report in results:
+            self.stdout.write(
+                f'{label:<18} {elapsed:7.2f}s {len(subs) / elapsed:8.1f} pushes/s  '
+                f'sent={report.sent} failed={report.failed} pruned={report.pruned} retried={report.retried}'
+            )
@@ -0,0 +1,20 @@
+"""Build the precomputed sitemap files (see core.sitemap_files); cron it or rely on /sitemap.xml rebuilding on demand."""
+from django.core.management.base import BaseCommand
+
+from core import sitemap_files
+
+
+class Command(BaseCommand):
+    help = 'Write the sitemap index and gzipped section files (only sections whose content changed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Rebuild every section')
+
+    def handle(self, *args, **options):
+        rebuilt = sitemap_files.build(force=options['force'])
+        manifest = sitemap_files.load_manifest()
+        for name, section in manifest['sections'].items():
+            urls = sum(f['urls'] for f in section['files'])
+            state = 'rebuilt' if name in rebuilt else 'unchanged'
+            self.stdout.write(f"{name:<18} {len(section['files']):>3} file(s) {urls:>7} URLs  {state}")
+        self.stdout.write(self.style.SUCCESS(f'Sitemaps written to {sitemap_files.root()}'))
@@ -0,0 +1,43 @@
+"""Pre-build responsive image renditions for every ImageField on the core models."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.renditions import available_formats, generate_renditions, iter_image_fields, load_manifest
+
+
+class Command(BaseCommand):
+    help = 'Generate WebP/AVIF/JPEG width renditions for uploaded images'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-encode even if renditions exist')
+        parser.add_argument('--model', help='Only this model, e.g. Sermon')
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        formats = ', '.join(fmt for fmt, *_ in available_formats())
+        self.stdout.write(f'Encoding {formats}')
+        built = skipped = failed = 0
+        seen = set()
+        for model, field_name in iter_image_fields():
+            if options['model'] and model.__name__ != options['model']:
+                continue
+            names = (
+                model.objects.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True).distinct()
+            )
+            for name in names.iterator():
+                if name in seen or name.startswith('http'):
+                    continue
+                seen.add(name)
+                if not options['force'] and load_manifest(name):
+                    skipped += 1
+                    continue
+                if generate_renditions(name, force=options['force']):
+                    built += 1
+                else:
+                    failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Renditions: {built} built, {skipped} up to date, {failed} unreadable '
+            f'({time.perf_counter() - t0:.1f}s)'
+        ))
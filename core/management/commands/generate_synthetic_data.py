@@ -0,0 +1,63 @@
+"""Generate churches, content and analytics at production scale with bulk inserts (see core.synthetic_data)."""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import synthetic_data
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate synthetic churches, events, sermons, news, ministries and analytics from a size preset'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--preset', choices=list(synthetic_data.PRESETS), default='small')
+        parser.add_argument('--churches', type=int, help='Override the preset')
+        parser.add_argument('--events', type=int, help='Events per church')
+        parser.add_argument('--sermons', type=int, help='Sermons per church')
+        parser.add_argument('--news', type=int, help='News articles per church')
+        parser.add_argument('--ministries', type=int, help='Ministries per church')
+        parser.add_argument('--sessions', type=int, help='Analytics visitor sessions')
+        parser.add_argument('--views-per-session', type=int, help='Average page views per session')
+        parser.add_argument('--days', type=int, help='Days of analytics history')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--workers', type=int, default=1, help='Processes writing chunks in parallel')
+        parser.add_argument('--chunk-size', type=int, default=synthetic_data.CHUNK_SIZE, help='Rows per bulk insert chunk')
+        parser.add_argument('--prefix', default=synthetic_data.PREFIX, help='Slug / session id prefix of generated rows')
+        parser.add_argument('--no-rollup', action='store_true', help='Skip rebuilding the analytics rollups')
+        parser.add_argument('--delete', action='store_true', help='Remove previously generated rows instead')
+
+    def handle(self, *args, **options):
+        if options['delete']:
+            t0 = time.perf_counter()
+            deleted = synthetic_data.delete(options['prefix'])
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} rows in {time.perf_counter() - t0:.1f}s'))
+            return
+
+        try:
+            sizes = synthetic_data.resolve(options['preset'], **{
+                key: options[key] for key in
+                ('churches', 'events', 'sermons', 'news', 'ministries', 'sessions', 'views_per_session', 'days')
+            })
+        except ValueError as exc:
+            raise CommandError(exc)
+        if sizes['days'] < 1 or sizes['views_per_session'] < 1:
+            raise CommandError('--days and --views-per-session must be at least 1')
+        self.stdout.write(
+            f"Generating {options['preset']}: " + ', '.join(f'{key}={value}' for key, value in sizes.items())
+            + f" (seed {options['seed']}, {options['workers']} worker(s))"
+        )
+
+        t0 = time.perf_counter()
+        try:
+            report = synthetic_data.generate(
+                sizes, seed=options['seed'], workers=options['workers'], prefix=options['prefix'],
+                chunk_size=options['chunk_size'], rollup=not options['no_rollup'],
+                progress=lambda message: self.stdout.write(f'  {message}', ending='\r'),
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+        self.stdout.write('')
+        for phase, (rows, seconds) in report.items():
+            rate = f' ({rows / seconds:,.0f} rows/s)' if rows and seconds else ''
+            self.stdout.write(f"{phase:<10} {'' if rows is None else f'{rows:>10,} rows'} {seconds:8.1f}s{rate}")
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.perf_counter() - t0:.1f}s'))
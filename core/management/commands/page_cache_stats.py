@@ -0,0 +1,23 @@
+"""Show anonymous page cache hit/miss/bypass counts (core.page_cache)."""
+from django.core.management.base import BaseCommand
+
+from core.page_cache import reset_stats, stats
+
+
+class Command(BaseCommand):
+    help = 'Print page cache hit/miss counters shared through the cache backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing')
+
+    def handle(self, *args, **options):
+        counts = stats()
+        served = counts['hit'] + counts['miss']
+        ratio = counts['hit'] / served * 100 if served else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Page cache: {counts['hit']} hits, {counts['miss']} misses, "
+            f"{counts['bypass']} bypassed ({ratio:.1f}% hit rate)"
+        ))
+        if options['reset']:
+            reset_stats()
+            self.stdout.write('Counters reset')
@@ -0,0 +1,17 @@
+"""Worker for queued video re-encodes (run under systemd/supervisor, or from cron with --once)."""
+from django.core.management.base import BaseCommand
+
+from core.media_jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Re-encode uploaded videos queued as MediaTranscodeJob rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--poll', type=float, default=5, help='Seconds between queue checks')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many jobs')
+
+    def handle(self, *args, **options):
+        handled = run_worker(once=options['once'], poll=options['poll'], limit=options['limit'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {handled} video job(s)'))
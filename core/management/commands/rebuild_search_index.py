@@ -0,0 +1,17 @@
+"""Rebuild the full-text search documents from sermons, events, news, ministries and testimonies."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the site search index'
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        total = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {total} documents in {time.perf_counter() - t0:.1f}s'
+        ))
@@ -0,0 +1,25 @@
+"""Aggregate new VisitorSession/PageView rows into AnalyticsDailyRollup (run from cron)."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.analytics_rollup import rollup_analytics
+
+
+class Command(BaseCommand):
+    help = 'Roll up analytics since the last watermark into daily per-church tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Rebuild every day, ignoring the watermark')
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        days, rows = rollup_analytics(full=options['full'])
+        elapsed = time.perf_counter() - t0
+        if days:
+            span = f'{days[0]}..{days[-1]}' if len(days) > 1 else str(days[0])
+            self.stdout.write(self.style.SUCCESS(
+                f'Rolled up {len(days)} day(s) ({span}) into {rows} rows in {elapsed:.2f}s'
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Nothing new since the last run ({elapsed:.2f}s)'))
@@ -0,0 +1,20 @@
+"""Worker for the transactional email outbox (run under systemd/supervisor, or from cron with --once)."""
+from django.core.management.base import BaseCommand
+
+from core.outbox import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Send queued OutboundEmail rows in batches over one SMTP connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--poll', type=float, default=5, help='Seconds between queue checks')
+        parser.add_argument('--limit', type=int, default=None, help='Stop after this many messages')
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages claimed per batch')
+
+    def handle(self, *args, **options):
+        sent, handled = run_worker(
+            once=options['once'], poll=options['poll'], limit=options['limit'], batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Sent {sent} of {handled} email(s)'))
@@ -0,0 +1,222 @@
+"""
+Background re-encoding of uploaded videos.
+
+Uploads are stored as-is and the row gets video_status='queued'; a
+MediaTranscodeJob is created after the save. `manage.py process_media_jobs`
+claims pending jobs, runs ffmpeg on a local copy, stores the compressed file
+and swaps it in with a conditional UPDATE, so a newer upload that replaced the
+file in the meantime is never overwritten.
+"""
+import logging
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from .media_utils import (
+    DEFAULT_VIDEO_MAX_MB, DEFAULT_VIDEO_MAX_WIDTH, HERO_VIDEO_MAX_MB, HERO_VIDEO_MAX_WIDTH,
+    _ffmpeg_available, transcode_video, web_video_name,
+)
+
+logger = logging.getLogger(__name__)
+
+# Models whose video uploads are queued, and the field holding the file
+VIDEO_MODELS = {
+    'Sermon': 'video_file',
+    'Hero': 'background_video',
+    'HeroMedia': 'video',
+    'EventHeroMedia': 'video',
+}
+HERO_VIDEO_MODELS = ('Hero', 'HeroMedia', 'EventHeroMedia')
+
+# Don't write progress to the database more often than this (seconds)
+PROGRESS_INTERVAL = 2
+
+
+def _job_model():
+    return apps.get_model('core', 'MediaTranscodeJob')
+
+
+def enqueue_transcode(instance, field_name):
+    """Queue a re-encode of instance.<field_name>; supersedes older pending jobs."""
+    MediaTranscodeJob = _job_model()
+    label = instance.__class__.__name__
+    field = getattr(instance, field_name)
+    if not field:
+        return None
+    MediaTranscodeJob.objects.filter(
+        model_label=label, object_id=str(instance.pk), field_name=field_name, status='pending',
+    ).update(status='skipped', error='Superseded by a newer upload', finished_at=timezone.now())
+    return MediaTranscodeJob.objects.create(
+        model_label=label,
+        object_id=str(instance.pk),
+        field_name=field_name,
+        source_name=field.name,
+        hero=label in HERO_VIDEO_MODELS,
+    )
+
+
+def requeue_stale_jobs(max_age=None):
+    """Return jobs left 'processing' by a crashed worker to the queue."""
+    MediaTranscodeJob = _job_model()
+    max_age = max_age or getattr(settings, 'MEDIA_TRANSCODE_TIMEOUT', 1800) * 2
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return MediaTranscodeJob.objects.filter(status='processing', updated_at__lt=cutoff).update(
+        status='pending', progress=0, updated_at=timezone.now(),
+    )
+
+
+def claim_next_job():
+    """Atomically take the oldest pending job, or None when the queue is empty."""
+    MediaTranscodeJob = _job_model()
+    for job in MediaTranscodeJob.objects.filter(status='pending').order_by('created_at')[:10]:
+        # Only one worker wins the conditional UPDATE
+        claimed = MediaTranscodeJob.objects.filter(pk=job.pk, status='pending').update(
+            status='processing', started_at=timezone.now(), updated_at=timezone.now(),
+            attempts=job.attempts + 1, progress=0, error='',
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _set_video_status(model, job, status):
+    model.objects.filter(pk=job.object_id, **{job.field_name: job.source_name}).update(video_status=status)
+
+
+def _finish(job, status, **fields):
+    fields.update(status=status, finished_at=timezone.now(), updated_at=timezone.now())
+    type(job).objects.filter(pk=job.pk).update(**fields)
+    for key, value in fields.items():
+        setattr(job, key, value)
+
+
+def _announce_swap(model, job):
+    # The swap is a queryset UPDATE; let cache invalidation receivers see it
+    instance = model.objects.filter(pk=job.object_id).first()
+    if instance is not None:
+        post_save.send(
+            sender=model, instance=instance, created=False, raw=False,
+            using=instance._state.db, update_fields=frozenset([job.field_name, 'video_status']),
+        )
+
+
+def process_job(job):
+    """Re-encode one claimed job and swap the result in; returns the final status."""
+    model = apps.get_model('core', job.model_label)
+    storage = model._meta.get_field(job.field_name).storage
+    current = model.objects.filter(pk=job.object_id).values_list(job.field_name, flat=True).first()
+    if current != job.source_name:
+        _finish(job, 'skipped', error='File was replaced or removed before processing')
+        return job.status
+
+    if not _ffmpeg_available():
+        logger.info('ffmpeg not installed; keeping %s as uploaded', job.source_name)
+        _set_video_status(model, job, 'ready')
+        _finish(job, 'skipped', progress=100, error='ffmpeg is not installed on this server')
+        return job.status
+
+    _set_video_status(model, job, 'processing')
+    last_write = [0.0]
+
+    def on_progress(percent):
+        now = time.monotonic()
+        if percent < 100 and now - last_write[0] < PROGRESS_INTERVAL:
+            return
+        last_write[0] = now
+        type(job).objects.filter(pk=job.pk).update(progress=percent, updated_at=timezone.now())
+
+    suffix = os.path.splitext(job.source_name)[1] or '.mp4'
+    in_path = out_path = None
+    new_name = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_in:
+            with storage.open(job.source_name, 'rb') as source:
+                for chunk in iter(lambda: source.read(1024 * 1024), b''):
+                    tmp_in.write(chunk)
+            in_path = tmp_in.name
+        out_path = in_path + '_compressed.mp4'
+        if job.hero:
+            limits = {'max_mb': HERO_VIDEO_MAX_MB, 'max_width': HERO_VIDEO_MAX_WIDTH}
+        else:
+            limits = {'max_mb': DEFAULT_VIDEO_MAX_MB, 'max_width': DEFAULT_VIDEO_MAX_WIDTH}
+        transcode_video(
+            in_path, out_path, **limits,
+            timeout=getattr(settings, 'MEDIA_TRANSCODE_TIMEOUT', 1800),
+            on_progress=on_progress,
+        )
+        original_size = os.path.getsize(in_path)
+        output_size = os.path.getsize(out_path)
+        if output_size >= original_size:
+            # Re-encoding didn't help; keep the upload
+            _set_video_status(model, job, 'ready')
+            _finish(job, 'done', progress=100, original_size=original_size, output_size=original_size)
+            return job.status
+
+        upload_to = os.path.dirname(job.source_name)
+        with open(out_path, 'rb') as f:
+            new_name = storage.save(os.path.join(upload_to, web_video_name(job.source_name)), f)
+        swapped = model.objects.filter(pk=job.object_id, **{job.field_name: job.source_name}).update(
+            **{job.field_name: new_name, 'video_status': 'ready'}
+        )
+        if not swapped:
+            storage.delete(new_name)
+            _finish(job, 'skipped', progress=100, error='File was replaced while encoding')
+            return job.status
+        # From here on the new file is live; never clean it up
+        output_name, new_name = new_name, None
+        try:
+            storage.delete(job.source_name)
+        except Exception:
+            logger.warning('Could not delete original video %s', job.source_name, exc_info=True)
+        _announce_swap(model, job)
+        _finish(
+            job, 'done', progress=100, output_name=output_name,
+            original_size=original_size, output_size=output_size,
+        )
+        logger.info(
+            'Transcoded %s.%s %s: %.1f MB -> %.1f MB', job.model_label, job.field_name, job.object_id,
+            original_size / 1048576, output_size / 1048576,
+        )
+    except Exception as exc:
+        logger.warning('Transcode failed for %s: %s', job, exc)
+        if new_name:
+            try:
+                storage.delete(new_name)
+            except Exception:
+                pass
+        _set_video_status(model, job, 'failed')
+        _finish(job, 'failed', error=str(exc)[:2000])
+    finally:
+        for path in (in_path, out_path):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    return job.status
+
+
+def run_worker(*, once=False, poll=5, limit=None):
+    """Process jobs until the queue is empty (once) or forever; returns jobs handled."""
+    handled = 0
+    requeue_stale_jobs()
+    while limit is None or handled < limit:
+        job = claim_next_job()
+        if job is None:
+            if once:
+                break
+            close_old_connections()
+            time.sleep(poll)
+            requeue_stale_jobs()
+            continue
+        process_job(job)
+        handled += 1
+    return handled
@@ -1,16 +1,25 @@
 """
 Compress images and videos before storage so uploads work on slow connections
 and stay within server limits.
+
+Which fields are media comes from each model's own fields (media_fields()):
+every ImageField is compressed, FileFields named in VIDEO_FIELDS are queued
+for re-encoding. Models with media fields mix in MediaSnapshotMixin, which
+remembers the stored file names when a row is loaded or saved, so telling a
+new upload from an unchanged file needs no query.
 """
 import logging
 import os
 import shutil
 import subprocess
 import tempfile
+import time
+from collections import namedtuple
 from io import BytesIO
 
 from django.core.files import File
 from django.core.files.base import ContentFile
+from django.db import models
 from PIL import Image
 
 logger = logging.getLogger(__name__)
@@ -28,6 +37,12 @@ DEFAULT_IMAGE_MAX_KB = 350
 HERO_VIDEO_MAX_MB = 8
 HERO_VIDEO_MAX_WIDTH = 1280
 
+# Sermon recordings: long, watched full screen
+DEFAULT_VIDEO_MAX_MB = 200
+DEFAULT_VIDEO_MAX_WIDTH = 1920
+
+VIDEO_FIELDS = ('video', 'background_video', 'video_file')
+
 
 def _jpeg_name(original_name: str, suffix: str = '') -> str:
     base = os.path.splitext(os.path.basename(original_name or 'upload'))[0]
@@ -95,6 +110,99 @@ def _ffmpeg_available() -> bool:
     return shutil.which('ffmpeg') is not None
 
 
+def probe_duration(path):
+    """Video duration in seconds via ffprobe, or None."""
+    if shutil.which('ffprobe') is None:
+        return None
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration', '-of', 'csv=p=0', path],
+            capture_output=True, text=True, timeout=30,
+        )
+        return float(result.stdout.strip()) or None
+    except (ValueError, subprocess.SubprocessError, OSError):
+        return None
+
+
+def _run_ffmpeg(args, *, timeout, duration=None, on_progress=None, progress_span=(0, 100)):
+    """
+    Run ffmpeg with machine-readable progress on stdout.
+    on_progress(percent) is called as encoding advances. Raises RuntimeError on failure.
+    """
+    cmd = ['ffmpeg', '-y', '-nostats', '-progress', 'pipe:1'] + args
+    started = time.monotonic()
+    low, high = progress_span
+    with tempfile.TemporaryFile(mode='w+') as stderr:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+        try:
+            for line in proc.stdout:
+                if time.monotonic() - started > timeout:
+                    proc.kill()
+                    raise RuntimeError(f'ffmpeg timed out after {timeout}s')
+                key, _, value = line.strip().partition('=')
+                if on_progress and duration and key in ('out_time_us', 'out_time_ms') and value.isdigit():
+                    # out_time_ms is microseconds too (ffmpeg naming quirk)
+                    done = min(1.0, int(value) / 1e6 / duration)
+                    on_progress(int(low + (high - low) * done))
+            proc.wait(timeout=max(1, timeout - (time.monotonic() - started)))
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            raise RuntimeError(f'ffmpeg timed out after {timeout}s')
+        if proc.returncode != 0:
+            stderr.seek(0)
+            raise RuntimeError(f'ffmpeg failed: {stderr.read()[-500:]}')
+
+
+def transcode_video(
+    in_path,
+    out_path,
+    *,
+    max_mb=HERO_VIDEO_MAX_MB,
+    max_width=HERO_VIDEO_MAX_WIDTH,
+    timeout=600,
+    on_progress=None,
+):
+    """
+    Re-encode a video file on disk to H.264 MP4 for the web, with a stronger
+    second pass when the first result is still too large.
+    """
+    duration = probe_duration(in_path)
+    _run_ffmpeg(
+        [
+            '-i', in_path,
+            '-vf', f'scale=min({max_width}\\,iw):-2',
+            '-c:v', 'libx264', '-crf', '28', '-preset', 'fast',
+            '-c:a', 'aac', '-b:a', '96k',
+            '-movflags', '+faststart',
+            '-max_muxing_queue_size', '1024',
+            out_path,
+        ],
+        timeout=timeout, duration=duration, on_progress=on_progress, progress_span=(0, 80),
+    )
+    if os.path.getsize(out_path) / (1024 * 1024) > max_mb * 1.5:
+        # Second pass — stronger compression
+        second = out_path + '.pass2.mp4'
+        try:
+            _run_ffmpeg(
+                [
+                    '-i', out_path,
+                    '-vf', 'scale=min(960\\,iw):-2',
+                    '-c:v', 'libx264', '-crf', '32', '-preset', 'fast',
+                    '-c:a', 'aac', '-b:a', '64k',
+                    '-movflags', '+faststart',
+                    second,
+                ],
+                timeout=timeout, duration=duration, on_progress=on_progress, progress_span=(80, 100),
+            )
+            os.replace(second, out_path)
+        finally:
+            if os.path.exists(second):
+                os.remove(second)
+    if on_progress:
+        on_progress(100)
+    return out_path
+
+
 def compress_video_upload(
     uploaded_file,
     *,
@@ -102,8 +210,9 @@ def compress_video_upload(
     max_width=HERO_VIDEO_MAX_WIDTH,
 ):
     """
-    Re-encode video to H.264 MP4 suitable for web hero banners.
+    Re-encode video to H.264 MP4 suitable for web hero banners, in-process.
     Requires ffmpeg on the server; returns original file if unavailable.
+    Uploads through models go to the background queue instead (core.media_jobs).
     """
     if not uploaded_file:
         return None
@@ -113,75 +222,24 @@ def compress_video_upload(
         uploaded_file.seek(0)
         return uploaded_file
 
-    uploaded_file.seek(0, os.SEEK_END)
-    size_mb = uploaded_file.tell() / (1024 * 1024)
-    uploaded_file.seek(0)
-
     suffix = os.path.splitext(getattr(uploaded_file, 'name', 'video'))[1] or '.mp4'
-    if size_mb <= max_mb and suffix.lower() in ('.mp4', '.webm'):
-        # Still normalize for web playback if large resolution
-        pass
-
     in_path = out_path = None
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_in:
             for chunk in uploaded_file.chunks():
                 tmp_in.write(chunk)
             in_path = tmp_in.name
-
         out_path = in_path + '_compressed.mp4'
-        cmd = [
-            'ffmpeg', '-y', '-i', in_path,
-            '-vf', f'scale=min({max_width}\\,iw):-2',
-            '-c:v', 'libx264', '-crf', '28', '-preset', 'fast',
-            '-c:a', 'aac', '-b:a', '96k',
-            '-movflags', '+faststart',
-            '-max_muxing_queue_size', '1024',
-            out_path,
-        ]
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=600,
-        )
-        if result.returncode != 0:
-            logger.warning('ffmpeg failed: %s', result.stderr[-500:] if result.stderr else '')
-            uploaded_file.seek(0)
-            return uploaded_file
-
-        out_size_mb = os.path.getsize(out_path) / (1024 * 1024)
-        if out_size_mb > max_mb * 1.5:
-            # Second pass — stronger compression
-            out_path2 = in_path + '_compressed2.mp4'
-            subprocess.run(
-                [
-                    'ffmpeg', '-y', '-i', out_path,
-                    '-vf', f'scale=min(960\\,iw):-2',
-                    '-c:v', 'libx264', '-crf', '32', '-preset', 'fast',
-                    '-c:a', 'aac', '-b:a', '64k',
-                    '-movflags', '+faststart',
-                    out_path2,
-                ],
-                capture_output=True,
-                timeout=600,
-            )
-            if os.path.exists(out_path2):
-                os.remove(out_path)
-                out_path = out_path2
-
-        base = os.path.splitext(os.path.basename(getattr(uploaded_file, 'name', 'video')))[0]
-        base = ''.join(c if c.isalnum() or c in '-_' else '_' for c in base)[:80]
-        out_name = f"{base}_compressed.mp4"
+        transcode_video(in_path, out_path, max_mb=max_mb, max_width=max_width)
         with open(out_path, 'rb') as f:
             data = f.read()
-        return ContentFile(data, name=out_name)
+        return ContentFile(data, name=web_video_name(getattr(uploaded_file, 'name', 'video')))
     except Exception as exc:
         logger.warning('Video compression error: %s', exc)
         uploaded_file.seek(0)
         return uploaded_file
     finally:
-        for path in (in_path, out_path, (in_path + '_compressed2.mp4') if in_path else None):
+        for path in (in_path, out_path):
             if path and os.path.exists(path):
                 try:
                     os.remove(path)
@@ -189,6 +247,76 @@ def compress_video_upload(
                     pass
 
 
+def web_video_name(original_name):
+    base = os.path.splitext(os.path.basename(original_name or 'video'))[0]
+    base = ''.join(c if c.isalnum() or c in '-_' else '_' for c in base)[:80]
+    return f"{base}_compressed.mp4"
+
+
+MediaFields = namedtuple('MediaFields', ['images', 'videos'])
+
+_media_fields = {}
+
+
+def media_fields(model):
+    """The model's image and video field names (computed once per model)."""
+    fields = _media_fields.get(model)
+    if fields is None:
+        images, videos = [], []
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.ImageField):
+                images.append(field.name)
+            elif isinstance(field, models.FileField) and field.name in VIDEO_FIELDS:
+                videos.append(field.name)
+        fields = _media_fields[model] = MediaFields(tuple(images), tuple(videos))
+    return fields
+
+
+def _file_name(value):
+    # Raw column value (a str) until the descriptor wraps it in a FieldFile
+    return getattr(value, 'name', value) or ''
+
+
+class MediaSnapshotMixin:
+    """Remember the stored names of media files as loaded from / saved to the database."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        fields = media_fields(cls)
+        loaded = dict(zip(field_names, values))
+        instance._media_snapshot = {
+            name: _file_name(loaded[name]) for name in fields.images + fields.videos if name in loaded
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        fields = media_fields(type(self))
+        update_fields = kwargs.get('update_fields')
+        snapshot = getattr(self, '_media_snapshot', {})
+        for name in fields.images + fields.videos:
+            # Deferred fields were not written
+            if name in self.__dict__ and (update_fields is None or name in update_fields):
+                snapshot[name] = _file_name(self.__dict__[name])
+        self._media_snapshot = snapshot
+
+
+def stored_file_names(instance):
+    """{field name: stored file name} of the instance's media fields ({} for a new row)."""
+    if instance._state.adding:
+        return {}
+    fields = media_fields(type(instance))
+    snapshot = getattr(instance, '_media_snapshot', None) or {}
+    missing = [name for name in fields.images + fields.videos if name not in snapshot]
+    if missing:
+        # Deferred fields, or a model without MediaSnapshotMixin: one query for all of them
+        row = type(instance)._base_manager.filter(pk=instance.pk).values(*missing).first()
+        snapshot = {**snapshot, **{name: _file_name((row or {}).get(name)) for name in missing}}
+        instance._media_snapshot = snapshot
+    return snapshot
+
+
 def is_new_file_upload(instance, field_name: str) -> bool:
     """True when the file field has a new upload (not an unchanged existing file)."""
     field = getattr(instance, field_name, None)
@@ -196,23 +324,12 @@ def is_new_file_upload(instance, field_name: str) -> bool:
         return False
     if not getattr(field, 'name', None):
         return False
-    # New rows always compress
-    if not instance.pk:
-        return True
-    try:
-        old = instance.__class__.objects.get(pk=instance.pk)
-        old_field = getattr(old, field_name, None)
-        if not old_field:
-            return True
-        return old_field.name != field.name
-    except instance.__class__.DoesNotExist:
-        return True
+    return stored_file_names(instance).get(field_name) != field.name
 
 
 def compress_model_media(instance, *, hero=False):
-    """Compress image/video fields on a model instance before save."""
+    """Compress image fields and queue new videos on a model instance before save."""
     image_kw = {}
-    video_max_mb = HERO_VIDEO_MAX_MB
     if hero:
         image_kw = {
             'max_width': HERO_IMAGE_MAX_WIDTH,
@@ -226,14 +343,8 @@ def compress_model_media(instance, *, hero=False):
             'max_kb': DEFAULT_IMAGE_MAX_KB,
         }
 
-    for field_name in ('image', 'photo', 'thumbnail', 'logo', 'banner_image',
-                       'nav_logo', 'background_image', 'founder_image', 'extra_image',
-                       'chairman_image', 'vice_chairman_image', 'board_image', 'team_image',
-                       'leadership_photo_1', 'leadership_photo_2', 'leadership_photo_3',
-                       'pastor_image', 'assistant_pastor_image', 'about_photo_1',
-                       'about_photo_2', 'about_photo_3'):
-        if not hasattr(instance, field_name):
-            continue
+    fields = media_fields(type(instance))
+    for field_name in fields.images:
         if not is_new_file_upload(instance, field_name):
             continue
         field = getattr(instance, field_name)
@@ -246,17 +357,16 @@ def compress_model_media(instance, *, hero=False):
         except Exception as exc:
             logger.warning('Image compress failed for %s.%s: %s', instance.__class__.__name__, field_name, exc)
 
-    for field_name in ('video', 'background_video', 'video_file'):
-        if not hasattr(instance, field_name):
-            continue
+    # Videos are stored as uploaded and re-encoded by the background worker;
+    # the post_save hook in core.signals creates the MediaTranscodeJob.
+    queued = []
+    for field_name in fields.videos:
         if not is_new_file_upload(instance, field_name):
             continue
-        field = getattr(instance, field_name)
-        if not field:
-            continue
-        try:
-            compressed = compress_video_upload(field, max_mb=video_max_mb)
-            if compressed:
-                setattr(instance, field_name, compressed)
-        except Exception as exc:
-            logger.warning('Video compress failed for %s.%s: %s', instance.__class__.__name__, field_name, exc)
+        if getattr(instance, field_name):
+            queued.append(field_name)
+            if hasattr(instance, 'video_status'):
+                instance.video_status = 'queued'
+        elif hasattr(instance, 'video_status'):
+            instance.video_status = ''
+    instance._queued_video_fields = queued
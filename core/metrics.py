@@ -0,0 +1,376 @@
+"""
+Per-view request metrics in Prometheus text format.
+
+MetricsMiddleware times each request and counts, for the view that served it,
+the ORM queries and their time (connection.execute_wrapper), the time spent
+rendering templates and the time spent in outbound HTTP calls (geolocation,
+web push, ...); install() wraps the Django template backend and requests'
+HTTPAdapter for the last two, and outbound calls are also counted per host.
+
+Each worker adds to in-memory counters; a background thread folds them into
+the shared cache every METRICS_FLUSH_INTERVAL seconds with atomic incr(), so
+totals cover all workers and survive restarts (Prometheus counters only go
+up, and a worker that recycles loses at most one interval). Durations are
+stored as integer microseconds.
+
+Views may declare a query budget (@query_budget(n) or METRICS_QUERY_BUDGETS);
+requests over budget are logged and counted.
+"""
+import atexit
+import functools
+import hashlib
+import logging
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+INDEX_KEY = 'metrics:index'
+
+HELP = {
+    'bethel_http_request_duration_seconds': ('histogram', 'Request latency by view'),
+    'bethel_http_responses_total': ('counter', 'Responses by view and status class'),
+    'bethel_db_queries_per_request': ('histogram', 'ORM queries per request by view'),
+    'bethel_db_query_seconds_total': ('counter', 'Time spent in ORM queries by view'),
+    'bethel_db_query_budget_exceeded_total': ('counter', 'Requests that issued more queries than their budget'),
+    'bethel_template_render_seconds_total': ('counter', 'Time spent rendering templates by view'),
+    'bethel_view_external_http_seconds_total': ('counter', 'Time spent in outbound HTTP calls by view'),
+    'bethel_external_http_requests_total': ('counter', 'Outbound HTTP calls by host and outcome'),
+    'bethel_external_http_seconds_total': ('counter', 'Time spent in outbound HTTP calls by host'),
+    'bethel_page_cache_requests_total': ('counter', 'Full-page cache lookups by outcome (core.page_cache)'),
+}
+
+_local = threading.local()
+
+
+def _cache():
+    return caches[getattr(settings, 'METRICS_CACHE_ALIAS', 'default')]
+
+
+def _us(seconds):
+    return int(seconds * 1_000_000)
+
+
+def query_budget(max_queries):
+    """Log (and count) requests to the decorated view that issue more than ``max_queries`` queries."""
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+class RequestStats:
+    """What one request spent where; attached to the serving thread while it runs."""
+    __slots__ = ('queries', 'query_time', 'template_time', 'http_time', '_template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.template_time = 0.0
+        self.http_time = 0.0
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        # connection.execute_wrapper hook
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - started
+
+
+def current():
+    return getattr(_local, 'stats', None)
+
+
+@contextmanager
+def collect():
+    """Count queries, template and outbound HTTP time of the code run inside (one request)."""
+    from django.db import connections
+
+    stats, previous = RequestStats(), current()
+    _local.stats = stats
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            yield stats
+    finally:
+        _local.stats = previous
+
+
+class Registry:
+    """Per-process counter deltas, flushed to the shared cache in the background."""
+
+    def __init__(self, flush_interval=None):
+        self.flush_interval = flush_interval or getattr(settings, 'METRICS_FLUSH_INTERVAL', 10)
+        self._deltas = {}
+        self._known = set()  # series keys already in the shared index
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def inc(self, name, labels, value=1):
+        series = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._deltas[series] = self._deltas.get(series, 0) + value
+        self._ensure_thread()
+
+    def observe(self, name, labels, value, buckets, scale=1):
+        """Histogram observation: cumulative buckets, _sum (value * scale) and _count."""
+        for bound in buckets:
+            if value <= bound:
+                self.inc(f'{name}_bucket', {**labels, 'le': _format_bound(bound)})
+        self.inc(f'{name}_bucket', {**labels, 'le': '+Inf'})
+        self.inc(f'{name}_sum', labels, int(value * scale))
+        self.inc(f'{name}_count', labels)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                deltas, self._deltas = self._deltas, {}
+            if not deltas:
+                return
+            cache = _cache()
+            if not self._known:
+                self._known = {key for key, _, _ in _read_index(cache)}
+            for series, delta in deltas.items():
+                key = _series_key(series)
+                if key not in self._known:
+                    _register(cache, key, series)
+                    self._known.add(key)
+                _incr(cache, key, delta)
+
+    def _ensure_thread(self):
+        # A forked worker inherits the object but not the thread
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Metrics flush failed')
+
+
+def _format_bound(bound):
+    return repr(float(bound))
+
+
+def _series_key(series):
+    name, labels = series
+    return 'metrics:' + hashlib.sha1(repr((name, tuple(labels))).encode('utf-8')).hexdigest()
+
+
+def _incr(cache, key, delta):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        if cache.add(key, delta, timeout=None):
+            return delta
+        return cache.incr(key, delta)
+
+
+def _register(cache, key, series):
+    # Append-only index: slot numbers come from an atomic counter, so
+    # workers registering series at the same time never overwrite each other
+    slot = _incr(cache, f'{INDEX_KEY}:size', 1)
+    cache.set(f'{INDEX_KEY}:{slot}', (key, series[0], series[1]), timeout=None)
+
+
+def _read_index(cache):
+    """[(key, name, labels)] of every registered series (duplicates removed)."""
+    size = cache.get(f'{INDEX_KEY}:size') or 0
+    entries = cache.get_many([f'{INDEX_KEY}:{slot}' for slot in range(1, size + 1)])
+    return list({entry[0]: entry for entry in entries.values()}.values())
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = Registry()
+                atexit.register(_flush_at_exit)
+    return _registry
+
+
+def _flush_at_exit():
+    if _registry is not None:
+        try:
+            _registry.flush()
+        except Exception:
+            pass
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.view_name or match._func_path
+
+
+def record_request(request, response, stats, elapsed, budget=None):
+    registry = get_registry()
+    view = view_label(request)
+    labels = {'view': view}
+    registry.observe('bethel_http_request_duration_seconds', labels, elapsed, LATENCY_BUCKETS, scale=1_000_000)
+    registry.inc('bethel_http_responses_total', {'view': view, 'status': f'{response.status_code // 100}xx'})
+    registry.observe('bethel_db_queries_per_request', labels, stats.queries, QUERY_BUCKETS)
+    for name, seconds in (
+        ('bethel_db_query_seconds_total', stats.query_time),
+        ('bethel_template_render_seconds_total', stats.template_time),
+        ('bethel_view_external_http_seconds_total', stats.http_time),
+    ):
+        if seconds:
+            registry.inc(name, labels, _us(seconds))
+    budget = getattr(settings, 'METRICS_QUERY_BUDGETS', {}).get(view, budget)
+    if budget is not None and stats.queries > budget:
+        registry.inc('bethel_db_query_budget_exceeded_total', labels)
+        logger.warning(
+            'Query budget exceeded: %s issued %d queries (budget %d) for %s',
+            view, stats.queries, budget, request.get_full_path(),
+        )
+
+
+# Instrumentation hooks (installed once from CoreConfig.ready)
+
+_installed = False
+
+
+def install():
+    global _installed
+    if _installed or not getattr(settings, 'METRICS_ENABLED', True):
+        return
+    _installed = True
+    _wrap_template_render()
+    _wrap_http_adapter()
+
+
+def _wrap_template_render():
+    from django.template.backends.django import Template
+
+    original = Template.render
+
+    @functools.wraps(original)
+    def render(self, *args, **kwargs):
+        stats = current()
+        if stats is None:
+            return original(self, *args, **kwargs)
+        # Templates rendered from inside other templates are already being timed
+        stats._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            stats._template_depth -= 1
+            if not stats._template_depth:
+                stats.template_time += time.perf_counter() - started
+
+    Template.render = render
+
+
+def _wrap_http_adapter():
+    try:
+        from requests.adapters import HTTPAdapter
+    except ImportError:
+        return
+
+    original = HTTPAdapter.send
+
+    @functools.wraps(original)
+    def send(self, request, *args, **kwargs):
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            response = original(self, request, *args, **kwargs)
+            outcome = f'{response.status_code // 100}xx'
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            host = urlsplit(request.url).hostname or 'unknown'
+            registry = get_registry()
+            registry.inc('bethel_external_http_requests_total', {'host': host, 'outcome': outcome})
+            registry.inc('bethel_external_http_seconds_total', {'host': host}, _us(elapsed))
+            stats = current()
+            if stats is not None:
+                stats.http_time += elapsed
+
+    HTTPAdapter.send = send
+
+
+# Exposition
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _base_name(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in HELP:
+            return name[:-len(suffix)]
+    return name
+
+
+def _value(name, raw):
+    # Durations are stored in microseconds
+    if name.endswith('_seconds_total') or name == 'bethel_http_request_duration_seconds_sum':
+        return f'{raw / 1_000_000:.6f}'
+    return str(raw)
+
+
+def render_text():
+    """All series in the Prometheus text exposition format (version 0.0.4)."""
+    from .page_cache import stats as page_cache_stats
+
+    get_registry().flush()
+    cache = _cache()
+    index = _read_index(cache)
+    values = cache.get_many([key for key, _, _ in index])
+    families = {}
+    for key, name, labels in index:
+        if key in values:
+            families.setdefault(_base_name(name), []).append((name, labels, values[key]))
+    families['bethel_page_cache_requests_total'] = [
+        ('bethel_page_cache_requests_total', (('outcome', outcome),), count)
+        for outcome, count in page_cache_stats().items()
+    ]
+
+    lines = []
+    for family in sorted(families):
+        kind, help_text = HELP.get(family, ('untyped', ''))
+        lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {kind}')
+        for name, labels, raw in sorted(families[family], key=_sort_key):
+            label_text = ','.join(f'{k}="{_escape(v)}"' for k, v in labels)
+            lines.append(f'{name}{{{label_text}}} {_value(name, raw)}' if label_text else f'{name} {_value(name, raw)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _sort_key(sample):
+    name, labels, _ = sample
+    plain = [(k, v) for k, v in labels if k != 'le']
+    le = dict(labels).get('le')
+    return (plain, name, float('inf') if le == '+Inf' else float(le) if le else 0.0)
@@ -65,22 +65,119 @@ class RedirectLocalAdminToDashboardMiddleware:
 
 class DatabaseIndependentMiddleware:
     """
-    Middleware to ensure database operations are handled gracefully
-    even if the primary database is unavailable.
+    Keep requests off a database that is down. The state comes from the
+    background monitor in core.db_health (request.db_available); nothing is
+    probed on the request path. While its circuit breaker is open, anonymous
+    visitors of cached pages get the stored copy and everything else gets the
+    static fallback page (503) at once. Database errors raised by views are
+    reported to the monitor.
+    """
+    # Paths that work without the database
+    EXEMPT_PREFIXES = ('/health/', '/startup-health/', '/fallback/', '/static/', '/media/', '/qr/', '/metrics')
+    RETRY_AFTER = 30
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from .db_health import get_monitor
+
+        request.db_available = get_monitor().available()
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.db_available or request.path.startswith(self.EXEMPT_PREFIXES):
+            return None
+        cached_page = getattr(view_func, 'cached_page', None)
+        # Without a session cookie the visitor is anonymous and nothing needs the session table
+        if cached_page is not None and django_settings.SESSION_COOKIE_NAME not in request.COOKIES:
+            try:
+                response = cached_page(request, **view_kwargs)
+            except Exception:
+                response = None
+            if response is not None:
+                return response
+        from .views import static_fallback
+
+        response = static_fallback(request)
+        response.status_code = 503
+        response['Retry-After'] = str(self.RETRY_AFTER)
+        return response
+
+    def process_exception(self, request, exception):
+        from django.db import InterfaceError, OperationalError
+
+        if isinstance(exception, (OperationalError, InterfaceError)):
+            from .db_health import get_monitor
+
+            get_monitor().report_failure(exception)
+        return None
+
+
+class AnalyticsTrackingMiddleware:
+    """
+    Record page views for VisitorSession/PageView without writing to the
+    database on the request path (see core.analytics_tracking).
+    Visitors are identified by a first-party cookie that expires after
+    30 minutes of inactivity, which is what a VisitorSession represents.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        import time
+
+        from .analytics_tracking import (
+            VISITOR_COOKIE, VISITOR_COOKIE_MAX_AGE, build_hit, get_buffer, should_track, visitor_id_from,
+        )
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        if not should_track(request, response):
+            return response
+        try:
+            from .analytics_models import AnalyticsSettings
+            if not AnalyticsSettings.get_settings().enable_tracking:
+                return response
+            visitor_id = visitor_id_from(request)
+            get_buffer().record(build_hit(request, visitor_id, started))
+            response.set_cookie(
+                VISITOR_COOKIE, visitor_id, max_age=VISITOR_COOKIE_MAX_AGE,
+                httponly=True, samesite='Lax', secure=request.is_secure(),
+            )
+        except Exception:
+            pass
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Per-view latency, ORM query count and time, template render time and
+    outbound HTTP time, exposed at /metrics (see core.metrics). Place it
+    first so the other middleware is included in the latency.
     """
     def __init__(self, get_response):
         self.get_response = get_response
+        self.enabled = getattr(django_settings, 'METRICS_ENABLED', True)
 
     def __call__(self, request):
-        # Add a flag to request to indicate if database is available
-        request.db_available = True
-        
+        if not self.enabled:
+            return self.get_response(request)
+        import logging
+        import time
+
+        from .metrics import collect, record_request
+
+        started = time.perf_counter()
+        with collect() as stats:
+            response = self.get_response(request)
         try:
-            # Test database connection
-            from django.db import connection
-            connection.ensure_connection()
+            record_request(request, response, stats, time.perf_counter() - started, getattr(request, '_query_budget', None))
         except Exception:
-            request.db_available = False
-        
-        response = self.get_response(request)
-        return response 
\ No newline at end of file
+            logging.getLogger(__name__).exception('Could not record request metrics')
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = getattr(view_func, 'query_budget', None)
+        return None
+
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0052_rename_core_pushsu_church__a8f2c1_idx_core_pushsu_church__294cbf_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(default='daily', max_length=50, unique=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Analytics Rollup State',
+                'verbose_name_plural': 'Analytics Rollup State',
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(db_index=True)),
+                ('dimension', models.CharField(choices=[('site', 'Whole site'), ('total', 'Church totals'), ('device', 'Device type'), ('browser', 'Browser'), ('country', 'Country'), ('location', 'Country / city'), ('referrer', 'Referrer domain'), ('hour', 'Hour of day'), ('page', 'Page path')], max_length=20)),
+                ('value', models.CharField(blank=True, help_text="Dimension value, e.g. 'mobile' or '/events/'", max_length=500)),
+                ('sessions', models.PositiveIntegerField(default=0)),
+                ('page_views', models.PositiveIntegerField(default=0)),
+                ('unique_visitors', models.PositiveIntegerField(default=0, help_text='Distinct IPs that day (totals only)')),
+                ('completed_sessions', models.PositiveIntegerField(default=0)),
+                ('duration_total', models.PositiveBigIntegerField(default=0, help_text='Summed duration of completed sessions (seconds)')),
+                ('church', models.ForeignKey(blank=True, help_text='Empty for visits without church context', null=True, on_delete=django.db.models.deletion.CASCADE, to='core.church')),
+            ],
+            options={
+                'verbose_name': 'Analytics Daily Rollup',
+                'verbose_name_plural': 'Analytics Daily Rollups',
+                'ordering': ['-day', 'dimension'],
+                'indexes': [models.Index(fields=['dimension', 'day'], name='core_rollup_dim_day_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0053_analytics_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eventheromedia',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('', 'No video'), ('queued', 'Queued for processing'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Processing failed')], default='', editable=False, help_text='Background re-encode state of the uploaded video', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='hero',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('', 'No video'), ('queued', 'Queued for processing'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Processing failed')], default='', editable=False, help_text='Background re-encode state of the uploaded video', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='heromedia',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('', 'No video'), ('queued', 'Queued for processing'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Processing failed')], default='', editable=False, help_text='Background re-encode state of the uploaded video', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='sermon',
+            name='video_status',
+            field=models.CharField(blank=True, choices=[('', 'No video'), ('queued', 'Queued for processing'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Processing failed')], default='', editable=False, help_text='Background re-encode state of the uploaded video', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='MediaTranscodeJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_label', models.CharField(help_text='Model holding the file, e.g. HeroMedia', max_length=50)),
+                ('object_id', models.CharField(max_length=64)),
+                ('field_name', models.CharField(max_length=50)),
+                ('source_name', models.CharField(help_text='Stored file the job was queued for', max_length=500)),
+                ('output_name', models.CharField(blank=True, max_length=500)),
+                ('hero', models.BooleanField(default=False, help_text='Use hero banner size limits')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed'), ('skipped', 'Skipped')], db_index=True, default='pending', max_length=20)),
+                ('progress', models.PositiveSmallIntegerField(default=0, help_text='Percent encoded')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('original_size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('output_size', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['model_label', 'object_id', 'field_name'], name='core_mediajob_target_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,140 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:44
+
+from datetime import datetime, time
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.html import strip_tags
+
+SQLITE_INDEX = (
+    "CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5("
+    " title, body, content='core_searchdocument', content_rowid='id',"
+    " tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN"
+    " INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN"
+    " INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)"
+    " VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN"
+    " INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, title, body)"
+    " VALUES ('delete', old.id, old.title, old.body);"
+    " INSERT INTO core_searchdocument_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+)
+SQLITE_DROP = (
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ai",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_ad",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_au",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+)
+POSTGRES_INDEX = (
+    "ALTER TABLE core_searchdocument ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    " setweight(to_tsvector('english', coalesce(title, '')), 'A') ||"
+    " setweight(to_tsvector('english', coalesce(body, '')), 'B')) STORED",
+    "CREATE INDEX core_searchdoc_vector_idx ON core_searchdocument USING GIN (search_vector)",
+)
+POSTGRES_DROP = (
+    "DROP INDEX IF EXISTS core_searchdoc_vector_idx",
+    "ALTER TABLE core_searchdocument DROP COLUMN IF EXISTS search_vector",
+)
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    """FTS5 table + sync triggers on SQLite, tsvector column + GIN index on Postgres."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_INDEX)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_INDEX)
+    backfill_documents(apps)
+
+
+# Frozen copy of core.search._document as of this migration, so the backfill
+# keeps working after those model fields change
+def _join(*parts):
+    return '\n'.join(strip_tags(str(p)) for p in parts if p)
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def _document(kind, obj):
+    if kind == 'sermon':
+        return obj.title, _join(obj.preacher, obj.scripture_reference, obj.description, obj.scripture_text), obj.date, obj.is_public
+    if kind == 'event':
+        return obj.title, _join(obj.description, obj.details, obj.location, obj.address), obj.start_date, obj.is_public
+    if kind == 'news':
+        return obj.title, _join(obj.excerpt, obj.content), obj.date, obj.is_public
+    if kind == 'ministry':
+        return obj.name, _join(obj.description, obj.leader_name), None, obj.is_active and obj.is_public
+    if not obj.is_approved:  # testimony
+        return None
+    return obj.title, _join(obj.content, obj.location), obj.created_at, True
+
+
+def backfill_documents(apps, batch_size=2000):
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    for label, kind in (
+        ('Sermon', 'sermon'), ('Event', 'event'), ('News', 'news'),
+        ('Ministry', 'ministry'), ('Testimony', 'testimony'),
+    ):
+        batch = []
+        for obj in apps.get_model('core', label).objects.all().iterator(chunk_size=batch_size):
+            document = _document(kind, obj)
+            if document is None:
+                continue
+            title, body, date, is_public = document
+            batch.append(SearchDocument(
+                kind=kind, object_id=obj.pk, church_id=obj.church_id, title=(title or '')[:255],
+                body=body, date=_as_datetime(date), is_public=is_public,
+            ))
+            if len(batch) >= batch_size:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        SearchDocument.objects.bulk_create(batch)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_DROP)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_DROP)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0054_video_transcode_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sermon', 'Sermon'), ('event', 'Event'), ('news', 'News'), ('ministry', 'Ministry'), ('testimony', 'Testimony')], max_length=20)),
+                ('object_id', models.UUIDField()),
+                ('title', models.CharField(max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('date', models.DateTimeField(blank=True, help_text='Sermon/news date or event start, used to break rank ties', null=True)),
+                ('is_public', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('church', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='core.church')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['church', 'kind'], name='core_searchdoc_church_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='core_searchdoc_unique_object')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
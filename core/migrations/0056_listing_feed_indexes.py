@@ -0,0 +1,37 @@
+# Generated by Django 5.1.3 on 2026-10-18 13:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0055_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['church', '-date', '-created_at'], name='core_news_church_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='news',
+            index=models.Index(fields=['-date', '-created_at'], name='core_news_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prayerrequest',
+            index=models.Index(fields=['is_approved', 'is_public', '-created_at'], name='core_prayer_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['church', '-date', '-created_at'], name='core_sermon_church_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sermon',
+            index=models.Index(fields=['-date', '-created_at'], name='core_sermon_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testimony',
+            index=models.Index(fields=['is_approved', '-created_at'], name='core_testimony_feed_idx'),
+        ),
+    ]
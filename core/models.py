@@ -1,15 +1,24 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User, Permission
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils import timezone
 import uuid
-from django.core.mail import send_mail
-from django.conf import settings
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
 from datetime import datetime, timedelta
 import requests
 from .image_utils import resize_image_field, optimize_image_for_web
+from .media_utils import MediaSnapshotMixin
+from .outbox import enqueue_email
+
+# Background video re-encode state (see core.media_jobs)
+VIDEO_STATUS_CHOICES = [
+    ('', 'No video'),
+    ('queued', 'Queued for processing'),
+    ('processing', 'Processing'),
+    ('ready', 'Ready'),
+    ('failed', 'Processing failed'),
+]
 
 # Memory optimization: Lazy imports
 def get_image_utils():
@@ -36,7 +45,7 @@ def clean_church_name(name: str) -> str:
     return text
 
 
-class Church(models.Model):
+class Church(MediaSnapshotMixin, models.Model):
     """Represents a Bethel church location"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=200)
@@ -613,6 +622,11 @@ class Event(models.Model):
             return first_media.get_image_url()
         return None
 
+    def card_image_file(self):
+        """The first Event Hero Media image file (for the {% picture %} tag)"""
+        first_media = next((media for media in self.hero_media.all() if media.image), None)
+        return first_media.image if first_media else None
+
     def maps_query(self):
         """Address string used for Google Maps search."""
         if self.address and self.address.strip():
@@ -634,7 +648,7 @@ class Event(models.Model):
         from .maps_utils import maps_url_for_address
         return maps_url_for_address(self.maps_query())
 
-class Ministry(models.Model):
+class Ministry(MediaSnapshotMixin, models.Model):
     """Church ministries with multi-tenant support"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     church = models.ForeignKey(Church, on_delete=models.CASCADE)
@@ -687,7 +701,7 @@ class Ministry(models.Model):
                 return self.image.url
         return ''
 
-class News(models.Model):
+class News(MediaSnapshotMixin, models.Model):
     """Church news with multi-tenant support"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     church = models.ForeignKey(Church, on_delete=models.CASCADE)
@@ -718,6 +732,10 @@ class News(models.Model):
     class Meta:
         verbose_name_plural = "News"
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['church', '-date', '-created_at'], name='core_news_church_feed_idx'),
+            models.Index(fields=['-date', '-created_at'], name='core_news_feed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.church.name}"
@@ -732,7 +750,7 @@ class News(models.Model):
                 return self.image.url
         return ''
 
-class Sermon(models.Model):
+class Sermon(MediaSnapshotMixin, models.Model):
     """Church sermons with multi-tenant support"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     church = models.ForeignKey(Church, on_delete=models.CASCADE)
@@ -749,6 +767,7 @@ class Sermon(models.Model):
     # Media
     audio_file = models.FileField(upload_to='sermons/audio/', blank=True, null=True, max_length=500)
     video_file = models.FileField(upload_to='sermons/video/', blank=True, null=True, max_length=500)
+    video_status = models.CharField(max_length=20, choices=VIDEO_STATUS_CHOICES, blank=True, default='', editable=False, help_text="Background re-encode state of the uploaded video")
     thumbnail = models.ImageField(upload_to='sermons/thumbnails/', blank=True, null=True, max_length=500)
     link = models.URLField(max_length=500, blank=True, null=True, help_text="External link to sermon (YouTube, Vimeo, etc.)")
     
@@ -766,6 +785,11 @@ class Sermon(models.Model):
     
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Keyset pagination of the sermon listings (core.listings)
+            models.Index(fields=['church', '-date', '-created_at'], name='core_sermon_church_feed_idx'),
+            models.Index(fields=['-date', '-created_at'], name='core_sermon_feed_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.preacher} ({self.date})"
@@ -858,7 +882,7 @@ class DonationMethod(models.Model):
         """Check if this donation method uses an external link"""
         return bool(self.external_link)
 
-class Convention(models.Model):
+class Convention(MediaSnapshotMixin, models.Model):
     """Large events/conventions hosted by churches"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     host_church = models.ForeignKey(Church, on_delete=models.CASCADE, related_name='hosted_conventions')
@@ -955,6 +979,120 @@ class PushSubscription(models.Model):
         return f"Push — {self.church.name} ({'active' if self.is_active else 'inactive'})"
 
 
+class MediaTranscodeJob(models.Model):
+    """Queued ffmpeg re-encode of an uploaded video (run by manage.py process_media_jobs)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('skipped', 'Skipped'),
+    ]
+
+    model_label = models.CharField(max_length=50, help_text="Model holding the file, e.g. HeroMedia")
+    object_id = models.CharField(max_length=64)
+    field_name = models.CharField(max_length=50)
+    source_name = models.CharField(max_length=500, help_text="Stored file the job was queued for")
+    output_name = models.CharField(max_length=500, blank=True)
+    hero = models.BooleanField(default=False, help_text="Use hero banner size limits")
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    progress = models.PositiveSmallIntegerField(default=0, help_text="Percent encoded")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    original_size = models.PositiveBigIntegerField(null=True, blank=True)
+    output_size = models.PositiveBigIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['model_label', 'object_id', 'field_name'], name='core_mediajob_target_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label}.{self.field_name} {self.object_id} ({self.status})"
+
+
+class OutboundEmail(models.Model):
+    """Queued transactional email (delivered in batches by manage.py send_outbox, see core.outbox)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    church = models.ForeignKey(
+        Church, on_delete=models.SET_NULL, null=True, blank=True, related_name='outbound_emails',
+        help_text="Church the message is sent for (per-church rate limit)",
+    )
+    subject = models.CharField(max_length=998)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True, help_text="Empty: DEFAULT_FROM_EMAIL")
+    to = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='core_outbox_due_idx'),
+            models.Index(fields=['church', 'sent_at'], name='core_outbox_church_sent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class SearchDocument(models.Model):
+    """
+    One searchable row per sermon, event, news item, ministry or approved
+    testimony, kept in sync by core.search. The full-text index itself (FTS5
+    on SQLite, a tsvector column with a GIN index on Postgres) is created by
+    migration 0055 and maintained by the database.
+    """
+    KIND_CHOICES = [
+        ('sermon', 'Sermon'),
+        ('event', 'Event'),
+        ('news', 'News'),
+        ('ministry', 'Ministry'),
+        ('testimony', 'Testimony'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.UUIDField()
+    church = models.ForeignKey(Church, on_delete=models.CASCADE, null=True, blank=True)
+    title = models.CharField(max_length=255)
+    body = models.TextField(blank=True)
+    date = models.DateTimeField(null=True, blank=True, help_text="Sermon/news date or event start, used to break rank ties")
+    is_public = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='core_searchdoc_unique_object'),
+        ]
+        indexes = [
+            models.Index(fields=['church', 'kind'], name='core_searchdoc_church_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}: {self.title}"
+
+
 def notify_global_admins_of_request(feature_request):
     """Send email to all global admins when a new global feature request is made."""
     from .models import ChurchAdmin
@@ -964,7 +1102,7 @@ def notify_global_admins_of_request(feature_request):
         return
     subject = f"[Bethel] New Global Feature Request: {feature_request.title}"
     message = f"A new global feature request has been submitted by {feature_request.requested_by.get_full_name() or feature_request.requested_by.username} for {feature_request.church.name}.\n\nTitle: {feature_request.title}\nDescription: {feature_request.description}\n\nPlease review the request in the admin panel."
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, emails, fail_silently=True)
+    enqueue_email(subject, message, emails, church=feature_request.church)
 
 def notify_requester_of_decision(feature_request):
     """Send email to the requester when their global feature request is approved or rejected."""
@@ -975,7 +1113,7 @@ def notify_requester_of_decision(feature_request):
         message = f"Congratulations! Your request to feature '{feature_request.title}' on the global site has been approved.\n\nApproval Date: {feature_request.approval_date}\nNotes: {feature_request.admin_notes}"
     else:
         message = f"Your request to feature '{feature_request.title}' on the global site was rejected.\n\nNotes: {feature_request.admin_notes}"
-    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [feature_request.requested_by.email], fail_silently=True)
+    enqueue_email(subject, message, [feature_request.requested_by.email], church=feature_request.church)
 
 class GlobalFeatureRequest(models.Model):
     """Notifications for global feature requests from local admins"""
@@ -1042,7 +1180,7 @@ class GlobalFeatureRequest(models.Model):
         elif old_status and old_status != self.status:
             notify_requester_of_decision(self)
 
-class Hero(models.Model):
+class Hero(MediaSnapshotMixin, models.Model):
     """Hero sections for churches"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     church = models.ForeignKey(Church, on_delete=models.CASCADE, null=True, blank=True)
@@ -1061,6 +1199,7 @@ class Hero(models.Model):
     )
     background_image = models.ImageField(upload_to='hero/', blank=True, null=True, max_length=500)
     background_video = models.FileField(upload_to='hero/videos/', blank=True, null=True, max_length=500)
+    video_status = models.CharField(max_length=20, choices=VIDEO_STATUS_CHOICES, blank=True, default='', editable=False, help_text="Background re-encode state of the uploaded video")
     
     # Buttons
     primary_button_text = models.CharField(max_length=50, default='Plan Your Visit')
@@ -1112,10 +1251,11 @@ class Hero(models.Model):
                 return self.background_video.url
         return ''
 
-class HeroMedia(models.Model):
+class HeroMedia(MediaSnapshotMixin, models.Model):
     hero = models.ForeignKey(Hero, on_delete=models.CASCADE, related_name='hero_media')
     image = models.ImageField(upload_to='hero/', blank=True, null=True, max_length=500)
     video = models.FileField(upload_to='hero/videos/', blank=True, null=True, max_length=500)
+    video_status = models.CharField(max_length=20, choices=VIDEO_STATUS_CHOICES, blank=True, default='', editable=False, help_text="Background re-encode state of the uploaded video")
     order = models.PositiveIntegerField(default=0)
     
     class Meta:
@@ -1301,6 +1441,9 @@ class Testimony(models.Model):
     class Meta:
         verbose_name_plural = "Testimonies"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_approved', '-created_at'], name='core_testimony_feed_idx'),
+        ]
     
     def __str__(self):
         if self.is_anonymous:
@@ -1366,7 +1509,7 @@ class LeadershipPage(models.Model):
             LeadershipPage.objects.all().delete()
         super().save(*args, **kwargs)
 
-class LocalLeadershipPage(models.Model):
+class LocalLeadershipPage(MediaSnapshotMixin, models.Model):
     """Leadership page for individual churches"""
     church = models.OneToOneField(Church, on_delete=models.CASCADE, related_name='leadership_page')
     title = models.CharField(max_length=200, default="Leadership")
@@ -1401,7 +1544,7 @@ class LocalLeadershipPage(models.Model):
             LocalLeadershipPage.objects.filter(church=self.church).delete()
         super().save(*args, **kwargs)
 
-class LocalAboutPage(models.Model):
+class LocalAboutPage(MediaSnapshotMixin, models.Model):
     """About page for individual churches"""
     church = models.OneToOneField(Church, on_delete=models.CASCADE, related_name='about_page')
     title = models.CharField(max_length=200, default="About Us")
@@ -1495,7 +1638,7 @@ class EventRegistration(models.Model):
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
 
-class EventHighlight(models.Model):
+class EventHighlight(MediaSnapshotMixin, models.Model):
     """Past event highlights and memories"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='highlights', null=True, blank=True)
@@ -1530,7 +1673,7 @@ class EventHighlight(models.Model):
     def __str__(self):
         return f"{self.title} ({self.year}) - {self.church.name}"
 
-class EventSpeaker(models.Model):
+class EventSpeaker(MediaSnapshotMixin, models.Model):
     event = models.ForeignKey('Event', on_delete=models.CASCADE, related_name='speakers')
     name = models.CharField(max_length=100)
     photo = models.ImageField(upload_to='events/speakers/', blank=True, null=True, max_length=500)
@@ -1563,10 +1706,11 @@ class EventScheduleItem(models.Model):
     def __str__(self):
         return f"{self.day}: {self.title} ({self.start_time}-{self.end_time})"
 
-class EventHeroMedia(models.Model):
+class EventHeroMedia(MediaSnapshotMixin, models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='hero_media')
     image = models.ImageField(upload_to='hero/', blank=True, null=True, max_length=500)
     video = models.FileField(upload_to='hero/videos/', blank=True, null=True, max_length=500)
+    video_status = models.CharField(max_length=20, choices=VIDEO_STATUS_CHOICES, blank=True, default='', editable=False, help_text="Background re-encode state of the uploaded video")
     order = models.PositiveIntegerField(default=0)
 
     def __str__(self):
@@ -1850,12 +1994,35 @@ class GlobalSettings(models.Model):
             raise ValueError("Only one GlobalSettings instance can exist")
         super().save(*args, **kwargs)
     
+    # (version, instance) for this process; see get_settings()
+    _cached = None
+    CACHE_VERSION_NAME = 'global_settings'
+
     @classmethod
     def get_settings(cls):
-        """Get the global settings instance, create if doesn't exist"""
+        """
+        Get the global settings instance, create if doesn't exist.
+        Cached per process and re-read once the settings version is bumped
+        (GlobalSettings/Hero/HeroMedia save or delete, see core.signals).
+        """
+        from .cache_versions import get_version
+
+        version = get_version(cls.CACHE_VERSION_NAME)
+        cached = cls._cached
+        if cached is not None and cached[0] == version:
+            return cached[1]
         settings, created = cls.objects.get_or_create()
+        cls._cached = (version, settings)
         return settings
 
+    @classmethod
+    def invalidate_cache(cls, *args, **kwargs):
+        """Drop the cached instance here and in every other worker."""
+        from .cache_versions import bump_version
+
+        cls._cached = None
+        bump_version(cls.CACHE_VERSION_NAME)
+
 class PrayerRequest(models.Model):
     """Prayer requests submitted by users"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -1897,6 +2064,9 @@ class PrayerRequest(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_approved', 'is_public', '-created_at'], name='core_prayer_feed_idx'),
+        ]
         verbose_name = 'Prayer Request'
         verbose_name_plural = 'Prayer Requests'
     
@@ -1978,12 +2148,20 @@ class ContactMessage(models.Model):
         self.save()
     
     def reply_to_message(self, reply_text, replied_by_user):
-        """Reply to the contact message"""
+        """Reply to the contact message (the email is queued with the save, see core.outbox)"""
         self.is_replied = True
         self.reply_message = reply_text
         self.replied_by = replied_by_user
         self.replied_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.save()
+            enqueue_email(
+                f"Re: {self.subject}",
+                f"Dear {self.name},\n\n{reply_text}\n\n--- Your message ---\n{self.message}",
+                [self.email],
+                church=self.church,
+                reply_to=[self.church.email] if self.church else None,
+            )
 
 # Signal to automatically set up new churches with default functionality
 @receiver(post_save, sender=Church)
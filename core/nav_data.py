@@ -0,0 +1,71 @@
+"""
+Navigation dropdown data (events and ministries) for the global site and
+each church site.
+
+Templates used to get full Event/Ministry querysets from every view just to
+list a few titles in the nav. nav_items() returns short lists of plain dicts
+instead, built once per worker and reused until an Event or Ministry is saved
+or deleted (which bumps the 'navigation' version) or the day changes (the
+event list only shows upcoming events).
+"""
+import threading
+
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .cache_versions import bump_version, get_version
+from .event_queries import upcoming_events_cutoff
+
+CACHE_VERSION_NAME = 'navigation'
+NAV_ITEM_LIMIT = 15
+
+# (version, day, church id or None) -> {'events': [...], 'ministries': [...]}
+_memo = {}
+_memo_lock = threading.Lock()
+MEMO_LIMIT = 256
+
+
+def _build(church_id):
+    from .models import Event, Ministry
+
+    events = Event.objects.filter(is_public=True, end_date__gte=upcoming_events_cutoff())
+    if church_id:
+        events = events.filter(church_id=church_id)
+        ministries = Ministry.objects.filter(church_id=church_id, is_active=True)
+    else:
+        ministries = Ministry.objects.filter(is_public=True)
+    return {
+        'events': [
+            {'id': str(pk), 'title': title}
+            for pk, title in events.order_by('start_date').values_list('id', 'title')[:NAV_ITEM_LIMIT]
+        ],
+        'ministries': [
+            {'id': str(pk), 'name': name}
+            for pk, name in ministries.order_by('name').values_list('id', 'name')[:NAV_ITEM_LIMIT]
+        ],
+    }
+
+
+def nav_items(church_id=None):
+    """Nav events/ministries for one church (or the global site when church_id is None)."""
+    key = (get_version(CACHE_VERSION_NAME), timezone.localdate(), str(church_id) if church_id else None)
+    items = _memo.get(key)
+    if items is None:
+        items = _build(church_id)
+        with _memo_lock:
+            if len(_memo) >= MEMO_LIMIT:
+                _memo.clear()
+            _memo[key] = items
+    return items
+
+
+def nav_context(church_id=None):
+    """Template context entries; evaluated only if the page renders the nav."""
+    return {
+        'all_events': SimpleLazyObject(lambda: nav_items(church_id)['events']),
+        'all_ministries': SimpleLazyObject(lambda: nav_items(church_id)['ministries']),
+    }
+
+
+def invalidate_navigation(**kwargs):
+    bump_version(CACHE_VERSION_NAME)
@@ -0,0 +1,195 @@
+"""
+Transactional email outbox.
+
+Code that used to call send_mail() on the request path calls enqueue_email()
+instead, which only inserts an OutboundEmail row, in the caller's
+transaction: a registration and its confirmation emails are committed
+together, or not at all. `manage.py send_outbox` drains the table:
+
+- due rows are claimed in batches (a conditional UPDATE per row, so several
+  workers never send the same message) and sent over one SMTP connection
+  that stays open while there is work and is closed when the queue is empty;
+- a failed message is retried with exponential backoff
+  (EMAIL_OUTBOX_RETRY_DELAY, doubled per attempt) until EMAIL_OUTBOX_MAX_ATTEMPTS,
+  except permanent (5xx) refusals; a dropped connection is reopened for the
+  rest of the batch;
+- a church sends at most EMAIL_OUTBOX_CHURCH_RATE messages per hour; the
+  rest wait until the oldest send of the window expires.
+"""
+import logging
+import smtplib
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+from django.db.models import Count, F, Min
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+RATE_WINDOW = timedelta(hours=1)
+
+# Errors that mean the connection is unusable (reopen it), not that the message was refused
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+def _outbox_model():
+    return apps.get_model('core', 'OutboundEmail')
+
+
+def enqueue_email(subject, message, recipient_list, *, from_email=None, church=None, reply_to=None):
+    """Queue a plain-text email; returns the OutboundEmail (None without recipients)."""
+    to = [address for address in recipient_list if address]
+    if not to:
+        return None
+    return _outbox_model().objects.create(
+        church=church,
+        subject=' '.join(str(subject).splitlines()),
+        body=message,
+        from_email=from_email or '',
+        to=to,
+        reply_to=[address for address in (reply_to or []) if address],
+    )
+
+
+def requeue_stale(max_age=None):
+    """Return messages left 'sending' by a crashed worker to the queue."""
+    max_age = max_age or getattr(settings, 'EMAIL_OUTBOX_SENDING_TIMEOUT', 600)
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    return _outbox_model().objects.filter(status='sending', updated_at__lt=cutoff).update(
+        status='pending', updated_at=timezone.now(),
+    )
+
+
+def _church_windows(church_ids, now):
+    """{church_id: (sent in the last RATE_WINDOW, oldest of those sends)}"""
+    rows = (
+        _outbox_model().objects
+        .filter(church_id__in=church_ids, status='sent', sent_at__gte=now - RATE_WINDOW)
+        .values('church_id').annotate(n=Count('id'), first=Min('sent_at'))
+    )
+    return {row['church_id']: (row['n'], row['first']) for row in rows}
+
+
+def claim_batch(size):
+    """Claim up to ``size`` due messages, deferring those of churches over their hourly limit."""
+    OutboundEmail = _outbox_model()
+    rate = getattr(settings, 'EMAIL_OUTBOX_CHURCH_RATE', 100)
+    while True:
+        now = timezone.now()
+        due = list(
+            OutboundEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:size]
+        )
+        windows = _church_windows({m.church_id for m in due if m.church_id}, now) if rate else {}
+        claimed, deferred = [], {}
+        for message in due:
+            if rate and message.church_id:
+                sent, first = windows.get(message.church_id, (0, now))
+                if sent >= rate:
+                    deferred.setdefault(first + RATE_WINDOW, []).append(message.pk)
+                    continue
+                windows[message.church_id] = (sent + 1, first)
+            # Only one worker wins the conditional UPDATE
+            if OutboundEmail.objects.filter(pk=message.pk, status='pending').update(status='sending', updated_at=now):
+                claimed.append(message)
+        for until, pks in deferred.items():
+            OutboundEmail.objects.filter(pk__in=pks, status='pending').update(next_attempt_at=until, updated_at=now)
+        # A batch of only rate-limited rows: look past them
+        if claimed or not deferred:
+            return claimed
+
+
+def _permanent(error):
+    """5xx replies (unknown mailbox, rejected sender/content) won't succeed on a retry."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, smtplib.SMTPResponseException) and error.smtp_code >= 500
+
+
+def _retry(message, error):
+    OutboundEmail = _outbox_model()
+    attempts = message.attempts + 1
+    fields = {'attempts': attempts, 'error': str(error)[:2000], 'updated_at': timezone.now()}
+    if _permanent(error) or attempts >= getattr(settings, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 5):
+        fields['status'] = 'failed'
+        logger.warning('Giving up on email %s to %s: %s', message.pk, message.to, error)
+    else:
+        delay = getattr(settings, 'EMAIL_OUTBOX_RETRY_DELAY', 60) * 2 ** (attempts - 1)
+        fields.update(status='pending', next_attempt_at=timezone.now() + timedelta(seconds=delay))
+    OutboundEmail.objects.filter(pk=message.pk).update(**fields)
+
+
+def deliver(messages, connection):
+    """Send claimed messages over an open connection; returns how many were sent."""
+    sent = []
+    for message in messages:
+        email = EmailMessage(
+            message.subject, message.body, message.from_email or None, message.to,
+            reply_to=message.reply_to or None, connection=connection,
+        )
+        try:
+            connection.send_messages([email])
+        except CONNECTION_ERRORS as exc:
+            _retry(message, exc)
+            connection.close()
+            try:
+                connection.open()
+            except Exception as reopen_exc:
+                logger.warning('SMTP reconnect failed: %s', reopen_exc)
+                for rest in messages[messages.index(message) + 1:]:
+                    _retry(rest, reopen_exc)
+                break
+        except Exception as exc:
+            _retry(message, exc)
+        else:
+            sent.append(message.pk)
+    if sent:
+        _outbox_model().objects.filter(pk__in=sent).update(
+            status='sent', sent_at=timezone.now(), updated_at=timezone.now(), attempts=F('attempts') + 1, error='',
+        )
+    return len(sent)
+
+
+def run_worker(*, once=False, poll=5, limit=None, batch_size=None):
+    """Drain the outbox until it is empty (once) or forever; returns (sent, handled)."""
+    batch_size = batch_size or getattr(settings, 'EMAIL_OUTBOX_BATCH_SIZE', 50)
+    connection = None
+    sent = handled = 0
+    requeue_stale()
+    try:
+        while limit is None or handled < limit:
+            batch = claim_batch(batch_size if limit is None else min(batch_size, limit - handled))
+            if not batch:
+                if connection is not None:
+                    connection.close()  # don't hold the SMTP session while idle
+                    connection = None
+                if once:
+                    break
+                close_old_connections()
+                time.sleep(poll)
+                requeue_stale()
+                continue
+            if connection is None:
+                connection = get_connection(fail_silently=False)
+                try:
+                    connection.open()
+                except Exception as exc:
+                    logger.warning('SMTP connection failed: %s', exc)
+                    for message in batch:
+                        _retry(message, exc)
+                    connection = None
+                    handled += len(batch)
+                    if once:
+                        break
+                    time.sleep(poll)
+                    continue
+            sent += deliver(batch, connection)
+            handled += len(batch)
+    finally:
+        if connection is not None:
+            connection.close()
+    return sent, handled
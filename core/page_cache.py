@@ -0,0 +1,226 @@
+"""
+Full-page cache for anonymous GET requests on public pages.
+
+Views decorated with @cache_public_page store their rendered HTML under a key
+built from the host, path, query string and the content version of the page's
+scope (one church, or the global site). Saving or deleting an Event, News,
+Sermon, Ministry, Hero, HeroMedia, Church, LocalAboutPage, Testimony, ... bumps
+the version of its church and of the global site (see core.signals), so stale
+pages are never served.
+
+Per-visitor parts are handled two ways:
+- the CSRF token is rendered as a placeholder and swapped for the visitor's
+  own token on every response;
+- location-dependent parts (the "switch church" banner) are varied on via the
+  decorator's ``vary`` callable.
+Requests with pending messages or one-time session notices bypass the cache.
+"""
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.csrf import get_token
+
+from .cache_versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+CSRF_PLACEHOLDER = '__PAGE_CACHE_CSRF_TOKEN__'
+GLOBAL_SCOPE = 'global'
+STATS_KEYS = ('hit', 'miss', 'bypass')
+
+# Session keys that show one-time notices on the next page
+ONE_TIME_SESSION_KEYS = (
+    'local_church_redirect', 'redirected_church', 'global_church_fallback', 'clear_redirect_notification',
+)
+
+_local_stats = dict.fromkeys(STATS_KEYS, 0)
+_stats_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'PAGE_CACHE_ALIAS', 'default')]
+
+
+def _version_name(scope):
+    return f'pages:{scope}'
+
+
+def invalidate_pages(*church_ids):
+    """Drop cached pages of the given churches and of the global site."""
+    scopes = {str(c) for c in church_ids if c} | {GLOBAL_SCOPE}
+    for scope in scopes:
+        bump_version(_version_name(scope))
+    # When it happened, for Last-Modified after deletes (see core.conditional)
+    try:
+        _cache().set_many({f'pagecache:changed:{scope}': time.time() for scope in scopes}, timeout=None)
+    except Exception:
+        pass
+
+
+def content_version(church_id=None):
+    """
+    Content version of one church (or of the global site): changes whenever
+    anything that invalidates its pages is saved or deleted. 0 if unknown.
+    """
+    return get_version(_version_name(str(church_id) if church_id else GLOBAL_SCOPE))
+
+
+def content_changed_at(church_id=None):
+    """Unix time of the last invalidation of a church (or the global site), or None."""
+    try:
+        return _cache().get(f'pagecache:changed:{church_id or GLOBAL_SCOPE}')
+    except Exception:
+        return None
+
+
+def _count(outcome):
+    with _stats_lock:
+        _local_stats[outcome] += 1
+    try:
+        _cache().incr(f'pagecache:stats:{outcome}')
+    except ValueError:
+        _cache().add(f'pagecache:stats:{outcome}', 1, timeout=None)
+    except Exception:
+        pass
+
+
+def stats():
+    """Hit/miss/bypass counts shared through the cache (this worker's if unavailable)."""
+    shared = _cache().get_many([f'pagecache:stats:{k}' for k in STATS_KEYS])
+    if not shared:
+        return dict(_local_stats)
+    return {k: shared.get(f'pagecache:stats:{k}', 0) for k in STATS_KEYS}
+
+
+def reset_stats():
+    _cache().delete_many([f'pagecache:stats:{k}' for k in STATS_KEYS])
+    with _stats_lock:
+        _local_stats.update(dict.fromkeys(STATS_KEYS, 0))
+
+
+def _cacheable_request(request):
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    session = getattr(request, 'session', None)
+    if session is not None and any(key in session for key in ONE_TIME_SESSION_KEYS):
+        return False
+    storage = getattr(request, '_messages', None)
+    if storage is not None and len(storage):
+        return False
+    return True
+
+
+def _page_key(request, scope, vary):
+    from .models import GlobalSettings
+
+    parts = [
+        request.scheme, request.get_host(), request.path,
+        '&'.join(sorted(request.GET.urlencode().split('&'))),
+        repr(vary),
+    ]
+    digest = hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+    return 'page:{}:{}:{}:{}'.format(
+        scope, get_version(_version_name(scope)), get_version(GlobalSettings.CACHE_VERSION_NAME), digest,
+    )
+
+
+def _with_csrf(request, response, content):
+    if CSRF_PLACEHOLDER.encode() in content:
+        content = content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+    response.content = content
+    return response
+
+
+def _hit_response(request, cached):
+    from django.http import HttpResponse
+
+    content_type, content = cached
+    response = HttpResponse(content_type=content_type)
+    response['X-Page-Cache'] = 'HIT'
+    return _with_csrf(request, response, content)
+
+
+def cache_public_page(view=None, *, vary=None, timeout=None):
+    """
+    Cache an anonymous GET view's HTML per church content version.
+    ``vary(request, **kwargs)`` returns a hashable value for per-visitor variants.
+    The decorated view gets a ``cached_page(request, **kwargs)`` attribute
+    that only looks the page up (see DatabaseIndependentMiddleware).
+    """
+    def decorator(view_func):
+        def _key_for(request, kwargs):
+            scope = str(kwargs.get('church_id') or GLOBAL_SCOPE)
+            return _page_key(request, scope, vary(request, **kwargs) if vary else None)
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not getattr(settings, 'PAGE_CACHE_ENABLED', True) or not _cacheable_request(request):
+                _count('bypass')
+                return view_func(request, *args, **kwargs)
+
+            key = _key_for(request, kwargs)
+            cached = _cache().get(key)
+            if cached is not None:
+                _count('hit')
+                return _hit_response(request, cached)
+
+            request._page_cache_filling = True
+            response = view_func(request, *args, **kwargs)
+            request._page_cache_filling = False
+            content = getattr(response, 'content', None)
+            if (
+                response.status_code == 200
+                and not getattr(response, 'streaming', False)
+                and not response.cookies
+                and content is not None
+                and not response.has_header('Cache-Control')
+            ):
+                _cache().set(
+                    key, (response['Content-Type'], content),
+                    timeout or getattr(settings, 'PAGE_CACHE_TIMEOUT', 300),
+                )
+                _count('miss')
+                response['X-Page-Cache'] = 'MISS'
+            else:
+                _count('bypass')
+            if content is not None:
+                _with_csrf(request, response, content)
+            return response
+
+        def cached_page(request, **kwargs):
+            """The stored copy of this page, or None (served while the database is down)."""
+            if not getattr(settings, 'PAGE_CACHE_ENABLED', True) or request.method not in ('GET', 'HEAD'):
+                return None
+            cached = _cache().get(_key_for(request, kwargs))
+            return _hit_response(request, cached) if cached is not None else None
+
+        wrapper.cached_page = cached_page
+        return wrapper
+
+    if view is not None:
+        return decorator(view)
+    return decorator
+
+
+def nearest_church_vary(request, church_id=None, **kwargs):
+    """Vary church pages on the visitor's nearest church (the switch banner)."""
+    from .location_utils import find_nearest_church, get_user_location
+
+    country, city, lat, lon = get_user_location(request)
+    nearest = None
+    if country:
+        try:
+            nearest = find_nearest_church(country, city, lat, lon, request=request)
+        except Exception:
+            pass
+    if nearest is None or str(nearest.id) == str(church_id):
+        return None
+    return str(nearest.id), request.session.get('user_church_id') == str(nearest.id)
@@ -0,0 +1,106 @@
+"""
+Keyset (cursor) pagination for the public listings.
+
+Instead of OFFSET/LIMIT + COUNT(*), each page starts after the last row of the
+previous one: the cursor holds that row's ordering values, and the next page
+is ``WHERE (ordering) after (cursor values) ORDER BY ordering LIMIT n + 1``.
+Every page costs the same as the first and the extra row tells whether there
+is a next page, so no count query is needed.
+
+The ordering must end in a unique field (the primary key) and its fields must
+not be NULL. Directions can be mixed, e.g. ('-date', '-created_at', 'id').
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+DEFAULT_PAGE_SIZE = 12
+MAX_PAGE_SIZE = 50
+
+
+class CursorError(ValueError):
+    """The cursor is malformed or does not fit the listing's ordering."""
+
+
+class KeysetPage:
+    """One page of a keyset-paginated listing."""
+
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def _split(ordering):
+    return [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+
+
+def encode_cursor(obj, ordering):
+    values = []
+    for name, _ in _split(ordering):
+        value = getattr(obj, 'pk' if name == 'id' else name)
+        values.append(value.isoformat() if isinstance(value, (date, datetime)) else str(value))
+    raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Cursor string -> ordering values converted by the model fields."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError, binascii.Error) as exc:
+        raise CursorError('Invalid cursor') from exc
+    fields = _split(ordering)
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise CursorError('Cursor does not match this listing')
+    # encode_cursor only writes strings; anything else was not made by us
+    if not all(isinstance(value, str) for value in values):
+        raise CursorError('Invalid cursor value')
+    try:
+        return [model._meta.get_field(name).to_python(value) for (name, _), value in zip(fields, values)]
+    except (ValidationError, TypeError, ValueError) as exc:
+        raise CursorError('Invalid cursor value') from exc
+
+
+def _after(ordering, values):
+    """Q for rows strictly after ``values`` in ``ordering``."""
+    fields = _split(ordering)
+    condition = Q()
+    for i, (name, descending) in enumerate(fields):
+        step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+        for j, (prev_name, _) in enumerate(fields[:i]):
+            step &= Q(**{prev_name: values[j]})
+        condition |= step
+    return condition
+
+
+def paginate(queryset, ordering, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Page of ``queryset`` ordered by ``ordering`` starting after ``cursor``.
+    Raises CursorError for a bad cursor.
+    """
+    page_size = max(1, min(int(page_size), MAX_PAGE_SIZE))
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        queryset = queryset.filter(_after(ordering, decode_cursor(cursor, queryset.model, ordering)))
+    rows = list(queryset[:page_size + 1])
+    items = rows[:page_size]
+    next_cursor = encode_cursor(items[-1], ordering) if len(rows) > page_size else None
+    return KeysetPage(items, next_cursor)
@@ -1,6 +1,13 @@
 """Web Push notification delivery for Bethel sites."""
+import atexit
 import json
 import logging
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
 
 from django.conf import settings
@@ -35,45 +42,176 @@ def build_absolute_url(path, request=None):
     return path
 
 
-def send_web_push(subscription, payload, ttl=86400):
-    """Send one push message. Returns True on success."""
-    if not webpush_enabled():
-        return False
-    try:
-        from pywebpush import webpush, WebPushException
-    except ImportError:
-        logger.warning('pywebpush not installed; skipping push')
-        return False
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+GONE_STATUSES = frozenset({404, 410})
+
+_local = threading.local()
+
+
+class PushReport:
+    """Outcome of one notification fan-out."""
+
+    def __init__(self, sent=0, failed=0, pruned=0, retried=0):
+        self.sent = sent
+        self.failed = failed
+        self.pruned = pruned
+        self.retried = retried
+
+    def __int__(self):
+        return self.sent
+
+    def __repr__(self):
+        return (
+            f'PushReport(sent={self.sent}, failed={self.failed}, '
+            f'pruned={self.pruned}, retried={self.retried})'
+        )
+
+
+_vapid_cache = {}
 
-    vapid_claims = get_vapid_claims()
-    subscription_info = {
+
+def _vapid_key():
+    """Parsed VAPID signer, built once per key instead of once per push."""
+    from py_vapid import Vapid
+
+    raw = settings.WEBPUSH_VAPID_PRIVATE_KEY
+    key = _vapid_cache.get(raw)
+    if key is None:
+        # generate_vapid_keys prints PEM; pywebpush itself only parses raw/DER strings
+        if raw.lstrip().startswith('-----BEGIN'):
+            key = Vapid.from_pem(raw.encode('utf-8'))
+        else:
+            key = Vapid.from_string(raw)
+        _vapid_cache.clear()
+        _vapid_cache[raw] = key
+    return key
+
+
+def _session():
+    """One keep-alive HTTP session per delivery thread."""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        import requests
+        session = requests.Session()
+        _local.session = session
+    return session
+
+
+def _retry_delay(attempt, response=None):
+    base = getattr(settings, 'WEBPUSH_RETRY_BACKOFF', 0.5)
+    cap = getattr(settings, 'WEBPUSH_RETRY_MAX_DELAY', 10)
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(cap, int(retry_after))
+    return min(cap, base * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+
+def _subscription_info(subscription):
+    return {
         'endpoint': subscription.endpoint,
         'keys': {
             'p256dh': subscription.p256dh_key,
             'auth': subscription.auth_key,
         },
     }
+
+
+def deliver_push(subscription_info, data, ttl=86400):
+    """
+    Send one encrypted push, retrying 429/5xx and network errors with backoff.
+    Returns (outcome, retries) where outcome is 'sent', 'gone' or 'failed'.
+    """
+    from pywebpush import webpush, WebPushException
+
+    max_retries = getattr(settings, 'WEBPUSH_MAX_RETRIES', 3)
+    timeout = getattr(settings, 'WEBPUSH_TIMEOUT', 10)
+    endpoint = subscription_info['endpoint'][:48]
+    for attempt in range(max_retries + 1):
+        response = None
+        try:
+            webpush(
+                subscription_info=subscription_info,
+                data=data,
+                vapid_private_key=_vapid_key(),
+                vapid_claims=get_vapid_claims(),
+                ttl=ttl,
+                timeout=timeout,
+                requests_session=_session(),
+            )
+            return 'sent', attempt
+        except WebPushException as exc:
+            response = getattr(exc, 'response', None)
+            status_code = getattr(response, 'status_code', None)
+            if status_code in GONE_STATUSES:
+                return 'gone', attempt
+            if status_code not in RETRY_STATUSES:
+                logger.info('Web push failed (%s) for %s', status_code, endpoint)
+                return 'failed', attempt
+        except Exception as exc:
+            # Connection errors/timeouts are worth another try; bad keys are not
+            if not type(exc).__module__.startswith(('requests', 'urllib3')):
+                logger.warning('Web push error: %s', exc)
+                return 'failed', attempt
+        if attempt < max_retries:
+            time.sleep(_retry_delay(attempt, response))
+    logger.info('Web push gave up after %d retries for %s', max_retries, endpoint)
+    return 'failed', max_retries
+
+
+def prune_subscriptions(subscription_ids):
+    """Deactivate dead endpoints (404/410) with a single UPDATE."""
+    if not subscription_ids:
+        return 0
+    from django.utils import timezone
+
+    from .models import PushSubscription
+    return PushSubscription.objects.filter(pk__in=subscription_ids, is_active=True).update(
+        is_active=False, updated_at=timezone.now(),
+    )
+
+
+def fan_out(subscriptions, payload, ttl=86400, prune=prune_subscriptions):
+    """Deliver ``payload`` to every subscription through a bounded thread pool."""
+    report = PushReport()
+    targets = [(sub.pk, _subscription_info(sub)) for sub in subscriptions]
+    if not targets:
+        return report
+    data = json.dumps(payload)
+    workers = max(1, min(getattr(settings, 'WEBPUSH_MAX_WORKERS', 16), len(targets)))
+    gone = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='webpush') as pool:
+        futures = {pool.submit(deliver_push, info, data, ttl): pk for pk, info in targets}
+        for future in as_completed(futures):
+            try:
+                outcome, retries = future.result()
+            except Exception:
+                logger.exception('Web push delivery crashed')
+                outcome, retries = 'failed', 0
+            report.retried += retries
+            if outcome == 'sent':
+                report.sent += 1
+            elif outcome == 'gone':
+                gone.append(futures[future])
+            else:
+                report.failed += 1
+    if gone:
+        report.pruned = prune(gone) if prune else len(gone)
+    return report
+
+
+def send_web_push(subscription, payload, ttl=86400):
+    """Send one push message. Returns True on success."""
+    if not webpush_enabled():
+        return False
     try:
-        webpush(
-            subscription_info=subscription_info,
-            data=json.dumps(payload),
-            vapid_private_key=settings.WEBPUSH_VAPID_PRIVATE_KEY,
-            vapid_claims=vapid_claims,
-            ttl=ttl,
-        )
-        return True
-    except Exception as exc:
-        exc_name = type(exc).__name__
-        if exc_name == 'WebPushException':
-            status = getattr(exc, 'response', None)
-            status_code = getattr(status, 'status_code', None) if status else None
-            if status_code in (404, 410):
-                subscription.is_active = False
-                subscription.save(update_fields=['is_active', 'updated_at'])
-            logger.info('Web push failed (%s) for %s', status_code, subscription.endpoint[:48])
-        else:
-            logger.warning('Web push error: %s', exc)
+        import pywebpush  # noqa: F401
+    except ImportError:
+        logger.warning('pywebpush not installed; skipping push')
         return False
+    outcome, _ = deliver_push(_subscription_info(subscription), json.dumps(payload), ttl)
+    if outcome == 'gone':
+        prune_subscriptions([subscription.pk])
+    return outcome == 'sent'
 
 
 def notify_church_subscribers(
@@ -86,9 +224,14 @@ def notify_church_subscribers(
     notification_type='general',
     request=None,
 ):
-    """Send push to all active subscriptions for a church."""
+    """Send push to all active subscriptions for a church; returns a PushReport."""
     if not webpush_enabled():
-        return 0
+        return PushReport()
+    try:
+        import pywebpush  # noqa: F401
+    except ImportError:
+        logger.warning('pywebpush not installed; skipping push')
+        return PushReport()
 
     from .models import PushSubscription
 
@@ -112,11 +255,9 @@ def notify_church_subscribers(
         'icon': build_absolute_url('/static/img/bethel_logo.png', request=request),
     }
 
-    sent = 0
-    for sub in qs.iterator():
-        if send_web_push(sub, payload):
-            sent += 1
-    return sent
+    report = fan_out(list(qs.only('id', 'endpoint', 'p256dh_key', 'auth_key')), payload)
+    logger.info('Push %s for %s: %r', tag, church, report)
+    return report
 
 
 def notify_new_event(event, request=None):
@@ -172,3 +313,70 @@ def notify_new_sermon(sermon, request=None):
         notification_type='sermon',
         request=request,
     )
+
+
+# Background queue ------------------------------------------------------
+# Signals only enqueue (after the transaction commits); one daemon thread per
+# worker process loads the object and runs the fan-out.
+
+NOTIFIERS = {
+    'Event': 'notify_new_event',
+    'News': 'notify_new_news',
+    'Sermon': 'notify_new_sermon',
+}
+
+_jobs = queue.Queue()
+_worker = None
+_worker_pid = None
+_worker_lock = threading.Lock()
+
+
+def _run_jobs():
+    from django.db import close_old_connections
+
+    while True:
+        label, pk = _jobs.get()
+        try:
+            notify_saved_object(label, pk)
+        except Exception:
+            logger.exception('Push job %s %s failed', label, pk)
+        finally:
+            close_old_connections()
+            _jobs.task_done()
+
+
+def notify_saved_object(label, pk):
+    """Load a freshly created Event/News/Sermon and notify its church's subscribers."""
+    from django.apps import apps
+
+    model = apps.get_model('core', label)
+    instance = model.objects.select_related('church').filter(pk=pk).first()
+    if instance is None:
+        return None
+    return globals()[NOTIFIERS[label]](instance)
+
+
+def queue_notification(label, pk):
+    """Schedule a push fan-out without blocking the current request."""
+    global _worker, _worker_pid
+    if not webpush_enabled():
+        return
+    if not getattr(settings, 'WEBPUSH_ASYNC', True):
+        notify_saved_object(label, pk)
+        return
+    with _worker_lock:
+        if _worker is None or _worker_pid != os.getpid() or not _worker.is_alive():
+            _worker_pid = os.getpid()
+            _worker = threading.Thread(target=_run_jobs, name='webpush-queue', daemon=True)
+            _worker.start()
+    _jobs.put((label, pk))
+
+
+def _drain_at_exit():
+    # Give queued fan-outs a moment when gunicorn recycles the worker
+    deadline = time.monotonic() + getattr(settings, 'WEBPUSH_EXIT_GRACE', 10)
+    while _jobs.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+
+atexit.register(_drain_at_exit)
@@ -0,0 +1,110 @@
+"""
+QR code files for event pages.
+
+A QR code is generated once per (data, style, format) and stored in the
+default storage as ``qr/<digest>.<ext>``, where the digest hashes all three;
+pages link to ``/qr/<digest>.<ext>`` instead of inlining a base64 PNG. The
+name changes when the encoded URL or the style changes, so the files can be
+served with a one-year immutable Cache-Control and are never regenerated
+for the same URL. Pages use PNG (a tenth of the size of qrcode's SVG output,
+which draws every module as its own subpath); SVG is available for print.
+Event pages encode the canonical public URL of the page (on
+CANONICAL_PUBLIC_DOMAIN), not whatever host the visitor used.
+"""
+import hashlib
+import io
+import logging
+import re
+import threading
+from collections import OrderedDict
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+logger = logging.getLogger(__name__)
+
+QR_ROOT = 'qr'
+QR_COLOR = '#1e3a8a'
+QR_BOX_SIZE = 8
+QR_BORDER = 2
+STYLE_VERSION = 1  # bump when the rendering below changes
+
+CONTENT_TYPES = {'svg': 'image/svg+xml', 'png': 'image/png'}
+DIGEST_RE = re.compile(r'^[0-9a-f]{24}$')
+
+
+class _EventSvgImage(qrcode.image.svg.SvgPathFillImage):
+    QR_PATH_STYLE = {**qrcode.image.svg.SvgPathFillImage.QR_PATH_STYLE, 'fill': QR_COLOR}
+
+
+def canonical_url(path):
+    domain = getattr(settings, 'CANONICAL_PUBLIC_DOMAIN', '').strip() or 'bethelprayerministryinternational.com'
+    return f'https://{domain.rstrip("/")}{path}'
+
+
+def digest(data, fmt):
+    style = f'{STYLE_VERSION}:{QR_COLOR}:{QR_BOX_SIZE}:{QR_BORDER}'
+    return hashlib.sha1(f'{style}|{fmt}|{data}'.encode('utf-8')).hexdigest()[:24]
+
+
+def storage_name(key, fmt):
+    return f'{QR_ROOT}/{key}.{fmt}'
+
+
+def render(data, fmt='png'):
+    """QR code bytes for ``data`` in the event page style."""
+    qr = qrcode.QRCode(box_size=QR_BOX_SIZE, border=QR_BORDER)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buffer = io.BytesIO()
+    if fmt == 'svg':
+        qr.make_image(image_factory=_EventSvgImage).save(buffer)
+    else:
+        qr.make_image(fill_color=QR_COLOR, back_color='white').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+# Per-process set of files known to exist: digest -> True
+_known = OrderedDict()
+_known_lock = threading.Lock()
+_KNOWN_SIZE = 4096
+
+
+def _remember(key):
+    with _known_lock:
+        _known[key] = True
+        _known.move_to_end(key)
+        while len(_known) > _KNOWN_SIZE:
+            _known.popitem(last=False)
+
+
+def ensure(data, fmt='png'):
+    """Digest of the stored QR code for ``data``, generating the file the first time."""
+    key = digest(data, fmt)
+    with _known_lock:
+        if key in _known:
+            return key
+    name = storage_name(key, fmt)
+    try:
+        if not default_storage.exists(name):
+            default_storage.save(name, ContentFile(render(data, fmt)))
+    except Exception:
+        logger.exception('Could not store QR code %s', name)
+        return None
+    _remember(key)
+    return key
+
+
+def qr_url(data, fmt='png'):
+    """URL of the QR code image for ``data`` (None if it could not be stored)."""
+    key = ensure(data, fmt)
+    return reverse('qr_code', args=[key, fmt]) if key else None
+
+
+def event_qr_url(path, fmt='png'):
+    """QR code URL for an event page at ``path`` (encoded with the canonical domain)."""
+    return qr_url(canonical_url(path), fmt)
@@ -0,0 +1,276 @@
+"""
+Responsive image renditions for uploaded ImageFields.
+
+Each source image is resized to several widths and encoded as JPEG, WebP and
+(when Pillow has an AVIF encoder) AVIF. Renditions are stored under
+``renditions/<content hash>/`` so identical uploads share files and URLs can
+be cached forever. A small JSON index per source name records the hash, the
+source size and dimensions, and the generated files.
+
+Renditions are made lazily on a background thread the first time the
+``{% picture %}`` tag sees an image (the original is served until then), or in
+batch with ``manage.py generate_renditions``.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pillow_avif  # noqa: F401  (registers the AVIF plugin on older Pillow)
+except ImportError:
+    pass
+
+RENDITION_ROOT = 'renditions'
+RENDITION_WIDTHS = (320, 640, 960, 1280, 1920)
+
+# (format, extension, MIME type, save options), best first
+_FORMATS = (
+    ('AVIF', 'avif', 'image/avif', {'quality': 55, 'speed': 6}),
+    ('WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+    ('JPEG', 'jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+
+def available_formats():
+    """Formats this Pillow build can encode, best first (JPEG always last)."""
+    Image.init()
+    return [fmt for fmt in _FORMATS if fmt[0] in Image.SAVE]
+
+
+def _source_name(image):
+    """Storage name of a FieldFile, or None for empty/external images."""
+    name = getattr(image, 'name', None) or ''
+    if not name or name.startswith('http'):
+        return None
+    return name
+
+
+def _index_name(name):
+    key = hashlib.sha1(name.encode('utf-8')).hexdigest()
+    return f'{RENDITION_ROOT}/index/{key[:2]}/{key}.json'
+
+
+def _content_hash(storage, name):
+    digest = hashlib.sha256()
+    with storage.open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def _target_widths(width):
+    widths = [w for w in RENDITION_WIDTHS if w < width]
+    widths.append(min(width, RENDITION_WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _encode(img, fmt, options):
+    if fmt == 'JPEG' and img.mode != 'RGB':
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode in ('RGBA', 'LA'):
+            background.paste(img, mask=img.split()[-1])
+        else:
+            background.paste(img.convert('RGB'))
+        img = background
+    buffer = BytesIO()
+    img.save(buffer, format=fmt, **options)
+    return buffer.getvalue()
+
+
+def generate_renditions(name, storage=None, force=False):
+    """
+    Build every rendition of the stored image ``name`` and write its index.
+    Returns the manifest dict, or None when the source can't be read.
+    """
+    storage = storage or default_storage
+    try:
+        size = storage.size(name)
+        content_hash = _content_hash(storage, name)
+        with storage.open(name, 'rb') as f:
+            img = Image.open(f)
+            img.load()
+    except Exception as exc:
+        logger.warning('Cannot build renditions for %s: %s', name, exc)
+        return None
+
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ('RGB', 'RGBA'):
+        img = img.convert('RGBA' if 'A' in img.getbands() or img.mode == 'P' else 'RGB')
+    width, height = img.size
+    base = f'{RENDITION_ROOT}/{content_hash[:2]}/{content_hash}'
+    sources = {}
+    for fmt, ext, mime, options in available_formats():
+        entries = []
+        for target in _target_widths(width):
+            path = f'{base}/{target}w.{ext}'
+            if force or not storage.exists(path):
+                resized = img if target == width else img.resize(
+                    (target, max(1, round(height * target / width))), Image.Resampling.LANCZOS,
+                )
+                try:
+                    data = _encode(resized, fmt, options)
+                except Exception as exc:
+                    logger.warning('%s encode failed for %s: %s', fmt, name, exc)
+                    entries = []
+                    break
+                if storage.exists(path):
+                    storage.delete(path)
+                storage.save(path, ContentFile(data))
+            entries.append([target, path])
+        if entries:
+            sources[mime] = entries
+
+    manifest = {'hash': content_hash, 'size': size, 'width': width, 'height': height, 'sources': sources}
+    index = _index_name(name)
+    if storage.exists(index):
+        storage.delete(index)
+    storage.save(index, ContentFile(json.dumps(manifest).encode('utf-8')))
+    _remember(name, manifest)
+    return manifest
+
+
+def load_manifest(name, storage=None):
+    """The stored manifest for ``name`` if it matches the current file, else None."""
+    storage = storage or default_storage
+    index = _index_name(name)
+    try:
+        if not storage.exists(index):
+            return None
+        with storage.open(index, 'rb') as f:
+            manifest = json.loads(f.read().decode('utf-8'))
+        if manifest.get('size') != storage.size(name):
+            return None
+    except Exception:
+        return None
+    return manifest
+
+
+# Per-process manifest cache: source name -> manifest
+_manifests = OrderedDict()
+_manifests_lock = threading.Lock()
+_MANIFEST_CACHE_SIZE = 4096
+
+# Sources that could not be processed: name -> monotonic time of the next try
+_failed = OrderedDict()
+
+_executor = None
+_pending = set()
+
+
+def _remember(name, manifest):
+    with _manifests_lock:
+        _failed.pop(name, None)
+        _manifests[name] = manifest
+        _manifests.move_to_end(name)
+        while len(_manifests) > _MANIFEST_CACHE_SIZE:
+            _manifests.popitem(last=False)
+
+
+def _remember_failure(name):
+    retry_after = getattr(settings, 'IMAGE_RENDITIONS_RETRY_AFTER', 600)
+    with _manifests_lock:
+        _failed[name] = time.monotonic() + retry_after
+        _failed.move_to_end(name)
+        while len(_failed) > _MANIFEST_CACHE_SIZE:
+            _failed.popitem(last=False)
+
+
+def _waiting(name):
+    """True while ``name`` is being generated or failed recently (caller holds the lock)."""
+    if name in _pending:
+        return True
+    retry_at = _failed.get(name)
+    if retry_at is None:
+        return False
+    if retry_at > time.monotonic():
+        return True
+    del _failed[name]
+    return False
+
+
+def _generate_in_background(name):
+    global _executor
+    with _manifests_lock:
+        if _waiting(name):
+            return
+        _pending.add(name)
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='renditions')
+
+    def run():
+        manifest = None
+        try:
+            manifest = generate_renditions(name)
+        finally:
+            if manifest is None:
+                _remember_failure(name)
+            with _manifests_lock:
+                _pending.discard(name)
+
+    _executor.submit(run)
+
+
+def get_manifest(image):
+    """
+    Manifest for an ImageField value, or None while renditions aren't ready.
+    Missing renditions are scheduled (IMAGE_RENDITIONS_LAZY) on first request.
+    """
+    name = _source_name(image)
+    if name is None:
+        return None
+    with _manifests_lock:
+        manifest = _manifests.get(name)
+        # Missing or unreadable sources aren't looked up again until their retry time
+        waiting = manifest is None and _waiting(name)
+    if manifest is not None or waiting:
+        return manifest
+    manifest = load_manifest(name)
+    if manifest is not None:
+        _remember(name, manifest)
+        return manifest
+    if getattr(settings, 'IMAGE_RENDITIONS_LAZY', True):
+        _generate_in_background(name)
+    return None
+
+
+def srcset(entries, storage=None, url=None):
+    """``srcset`` value for manifest entries; ``url`` can rewrite each URL (e.g. make it absolute)."""
+    storage = storage or default_storage
+    url = url or (lambda value: value)
+    return ', '.join(f'{url(storage.url(path))} {width}w' for width, path in entries)
+
+
+def rendition_url(image, width):
+    """URL of the smallest JPEG rendition at least ``width`` wide (falls back to the original)."""
+    manifest = get_manifest(image)
+    if manifest:
+        entries = manifest['sources'].get('image/jpeg') or []
+        for entry_width, path in entries:
+            if entry_width >= width:
+                return default_storage.url(path)
+        if entries:
+            return default_storage.url(entries[-1][1])
+    return image.url if _source_name(image) else str(image or '')
+
+
+def iter_image_fields():
+    """(model, field name) for every ImageField on the core models."""
+    from django.apps import apps
+    from django.db.models import ImageField
+
+    for model in apps.get_app_config('core').get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, ImageField):
+                yield model, field.name
@@ -0,0 +1,319 @@
+"""
+Full-text search over sermons, events, news, ministries and approved
+testimonies.
+
+Each indexed object has one SearchDocument row (title + body text). The
+database keeps the inverted index over those rows: an external-content FTS5
+table maintained by triggers on SQLite, a generated tsvector column with a GIN
+index on Postgres (both created by migration 0055). Other databases fall back
+to icontains over SearchDocument.
+
+Documents are refreshed on save/delete of the source object (core.signals);
+``manage.py rebuild_search_index`` rebuilds everything.
+
+Queries match every word, the last few letters being optional (prefix
+matching: "pray" finds "prayer"), ranked by relevance with title matches
+weighted above body matches.
+"""
+import logging
+import re
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape, strip_tags
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+# Model name -> SearchDocument.kind
+INDEXED_MODELS = {
+    'Sermon': 'sermon',
+    'Event': 'event',
+    'News': 'news',
+    'Ministry': 'ministry',
+    'Testimony': 'testimony',
+}
+
+MAX_TERMS = 8
+MAX_RESULTS = 200
+FTS_TABLE = 'core_searchdocument_fts'
+_SNIPPET_START, _SNIPPET_END = '\x02', '\x03'
+
+
+# -- documents ---------------------------------------------------------------
+
+def _join(*parts):
+    return '\n'.join(strip_tags(str(p)) for p in parts if p)
+
+
+def _as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return timezone.make_aware(datetime.combine(value, time.min))
+
+
+def _document(kind, obj):
+    """Field values of the SearchDocument for obj, or None if it should not be listed."""
+    if kind == 'sermon':
+        return {
+            'title': obj.title,
+            'body': _join(obj.preacher, obj.scripture_reference, obj.description, obj.scripture_text),
+            'date': obj.date,
+            'is_public': obj.is_public,
+        }
+    if kind == 'event':
+        return {
+            'title': obj.title,
+            'body': _join(obj.description, obj.details, obj.location, obj.address),
+            'date': obj.start_date,
+            'is_public': obj.is_public,
+        }
+    if kind == 'news':
+        return {
+            'title': obj.title,
+            'body': _join(obj.excerpt, obj.content),
+            'date': obj.date,
+            'is_public': obj.is_public,
+        }
+    if kind == 'ministry':
+        return {
+            'title': obj.name,
+            'body': _join(obj.description, obj.leader_name),
+            'date': None,
+            'is_public': obj.is_active and obj.is_public,
+        }
+    if kind == 'testimony':
+        if not obj.is_approved:
+            return None
+        return {
+            'title': obj.title,
+            'body': _join(obj.content, obj.location),
+            'date': obj.created_at,
+            'is_public': True,
+        }
+    raise ValueError(f'Unknown search kind: {kind}')
+
+
+def _document_fields(kind, obj):
+    fields = _document(kind, obj)
+    if fields is not None:
+        fields['title'] = (fields['title'] or '')[:255]
+        fields['date'] = _as_datetime(fields['date'])
+        fields['church_id'] = obj.church_id
+    return fields
+
+
+def index_instance(instance):
+    """Create, refresh or drop the search document of a saved object."""
+    from .models import SearchDocument
+
+    kind = INDEXED_MODELS[type(instance).__name__]
+    fields = _document_fields(kind, instance)
+    if fields is None:
+        SearchDocument.objects.filter(kind=kind, object_id=instance.pk).delete()
+        return
+    SearchDocument.objects.update_or_create(kind=kind, object_id=instance.pk, defaults=fields)
+
+
+def remove_instance(instance):
+    from .models import SearchDocument
+
+    SearchDocument.objects.filter(kind=INDEXED_MODELS[type(instance).__name__], object_id=instance.pk).delete()
+
+
+def rebuild_index(app_registry=None, batch_size=2000):
+    """
+    Rebuild every search document. ``app_registry`` lets migrations pass their
+    historical models. Returns the number of documents written.
+    """
+    if app_registry is None:
+        from django.apps import apps as app_registry
+    SearchDocument = app_registry.get_model('core', 'SearchDocument')
+
+    total = 0
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for label, kind in INDEXED_MODELS.items():
+            model = app_registry.get_model('core', label)
+            batch = []
+            for obj in model.objects.all().iterator(chunk_size=batch_size):
+                fields = _document_fields(kind, obj)
+                if fields is None:
+                    continue
+                batch.append(SearchDocument(kind=kind, object_id=obj.pk, **fields))
+                if len(batch) >= batch_size:
+                    SearchDocument.objects.bulk_create(batch)
+                    total += len(batch)
+                    batch = []
+            SearchDocument.objects.bulk_create(batch)
+            total += len(batch)
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+
+# -- queries -----------------------------------------------------------------
+
+def query_terms(query):
+    """Lower-cased words of a user query (punctuation and operators dropped)."""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def _filters(church_id, kinds, public_only):
+    where, params = [], []
+    if church_id:
+        where.append('d.church_id = %s')
+        params.append(str(church_id).replace('-', '') if connection.vendor == 'sqlite' else str(church_id))
+    else:
+        where.append('(d.church_id IS NULL OR (c.is_active AND c.is_approved))')
+    if kinds:
+        where.append('d.kind IN ({})'.format(', '.join(['%s'] * len(kinds))))
+        params.extend(kinds)
+    if public_only:
+        where.append('d.is_public')
+    return where, params
+
+
+def _sqlite_search(terms, where, params, limit, offset):
+    match = ' '.join(f'"{term}"*' for term in terms)
+    sql = (
+        f'SELECT d.kind, d.object_id, d.church_id, d.title, d.date, '
+        f"snippet({FTS_TABLE}, 1, %s, %s, '…', 16), bm25({FTS_TABLE}, 10.0, 1.0) AS rank "
+        f'FROM {FTS_TABLE} JOIN core_searchdocument d ON d.id = {FTS_TABLE}.rowid '
+        f'LEFT JOIN core_church c ON c.id = d.church_id '
+        f'WHERE {FTS_TABLE} MATCH %s AND {" AND ".join(where)} '
+        f'ORDER BY rank, d.date DESC LIMIT %s OFFSET %s'
+    )
+    return sql, [_SNIPPET_START, _SNIPPET_END, match, *params, limit, offset]
+
+
+def _postgres_search(terms, where, params, limit, offset):
+    tsquery = ' & '.join(f'{term}:*' for term in terms)
+    sql = (
+        "SELECT d.kind, d.object_id, d.church_id, d.title, d.date, "
+        "ts_headline('english', d.body, q, %s), ts_rank_cd(d.search_vector, q) AS rank "
+        "FROM core_searchdocument d CROSS JOIN to_tsquery('english', %s) q "
+        "LEFT JOIN core_church c ON c.id = d.church_id "
+        f"WHERE d.search_vector @@ q AND {' AND '.join(where)} "
+        "ORDER BY rank DESC, d.date DESC NULLS LAST LIMIT %s OFFSET %s"
+    )
+    options = f'StartSel={_SNIPPET_START},StopSel={_SNIPPET_END},MaxWords=30,MinWords=10'
+    return sql, [options, tsquery, *params, limit, offset]
+
+
+def _fallback_search(terms, church_id, kinds, public_only, limit, offset):
+    from django.db.models import Q
+
+    from .models import SearchDocument
+
+    docs = SearchDocument.objects.all()
+    for term in terms:
+        docs = docs.filter(Q(title__icontains=term) | Q(body__icontains=term))
+    if church_id:
+        docs = docs.filter(church_id=church_id)
+    else:
+        docs = docs.filter(Q(church__isnull=True) | Q(church__is_active=True, church__is_approved=True))
+    if kinds:
+        docs = docs.filter(kind__in=kinds)
+    if public_only:
+        docs = docs.filter(is_public=True)
+    rows = docs.order_by('-date').values_list('kind', 'object_id', 'church_id', 'title', 'date', 'body')
+    return [(*row[:5], row[5][:200], 0.0) for row in rows[offset:offset + limit]]
+
+
+def _url(kind, object_id, church_id, title):
+    if kind == 'event':
+        if church_id:
+            return reverse('church_event_detail', args=[church_id, object_id])
+        return reverse('event_detail', args=[object_id])
+    if kind == 'news':
+        return reverse('news_detail', args=[object_id])
+    if kind == 'ministry':
+        if church_id:
+            return reverse('church_ministry_detail', args=[church_id, object_id])
+        return reverse('ministry_detail', args=[object_id])
+    if kind == 'sermon':
+        base = reverse('church_sermons', args=[church_id]) if church_id else reverse('sermon')
+        return f"{base}?{urlencode({'keyword': title})}"
+    return reverse('testimonies')
+
+
+def _highlight(snippet):
+    return mark_safe(escape(snippet or '').replace(_SNIPPET_START, '<mark>').replace(_SNIPPET_END, '</mark>'))
+
+
+def _as_uuid_str(value):
+    value = str(value)
+    if len(value) == 32:
+        return f'{value[:8]}-{value[8:12]}-{value[12:16]}-{value[16:20]}-{value[20:]}'
+    return value
+
+
+def search(query, church_id=None, kinds=None, public_only=True, limit=20, offset=0):
+    """
+    Ranked matches for ``query`` as dicts (kind, id, church_id, title, date,
+    snippet, url, rank), best first. Scoped to one church when church_id is
+    given; otherwise across active churches and church-less testimonies.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    limit = max(1, min(int(limit), MAX_RESULTS))
+    offset = max(0, int(offset))
+    kinds = [k for k in (kinds or []) if k in INDEXED_MODELS.values()]
+
+    if connection.vendor in ('sqlite', 'postgresql'):
+        where, params = _filters(church_id, kinds, public_only)
+        build = _sqlite_search if connection.vendor == 'sqlite' else _postgres_search
+        sql, sql_params = build(terms, where, params, limit, offset)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, sql_params)
+            rows = cursor.fetchall()
+    else:
+        rows = _fallback_search(terms, church_id, kinds, public_only, limit, offset)
+
+    results = []
+    for kind, object_id, doc_church_id, title, date, snippet, rank in rows:
+        object_id = _as_uuid_str(object_id)
+        doc_church_id = _as_uuid_str(doc_church_id) if doc_church_id else None
+        if isinstance(date, str):
+            date = parse_datetime(date)
+        if date is not None and timezone.is_naive(date):
+            date = timezone.make_aware(date, dt_timezone.utc)
+        results.append({
+            'kind': kind,
+            'id': object_id,
+            'church_id': doc_church_id,
+            'title': title,
+            'date': date,
+            'snippet': _highlight(snippet),
+            'url': _url(kind, object_id, doc_church_id, title),
+            'rank': rank,
+        })
+    return results
+
+
+def filter_queryset(queryset, query, church_id=None, limit=MAX_RESULTS):
+    """
+    Restrict a Sermon/Event/News/Ministry/Testimony queryset to the best
+    ``limit`` full-text matches of ``query``, best match first.
+    Returns (queryset, truncated); truncated means more objects matched.
+    """
+    from django.db.models import Case, IntegerField, When
+
+    kind = INDEXED_MODELS[queryset.model.__name__]
+    hits = search(query, church_id=church_id, kinds=[kind], public_only=False, limit=limit)
+    ids = [hit['id'] for hit in hits]
+    if not ids:
+        return queryset.none(), False
+    # Only a full page can hide more matches; one more row tells
+    truncated = len(ids) >= limit and bool(
+        search(query, church_id=church_id, kinds=[kind], public_only=False, limit=1, offset=len(ids))
+    )
+    order = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(ids)], output_field=IntegerField())
+    return queryset.filter(pk__in=ids).order_by(order), truncated
@@ -1,5 +1,6 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Event, Ministry, News, NewsletterSignup
+from .models import Church, Event, Ministry, News, NewsletterSignup, Sermon
 
 class EventSerializer(serializers.ModelSerializer):
     class Meta:
@@ -19,4 +20,140 @@ class NewsSerializer(serializers.ModelSerializer):
 class NewsletterSignupSerializer(serializers.ModelSerializer):
     class Meta:
         model = NewsletterSignup
-        fields = '__all__' 
\ No newline at end of file
+        fields = '__all__' 
+
+# Public API v1 (core.views_api)
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that only outputs the fields passed as ``fields``
+    (the ?fields=a,b sparse fieldset of the v1 API).
+
+    ``Meta.sources`` maps serializer fields to the model fields they read when
+    that differs from the field name, so the view can defer everything else.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+    @classmethod
+    def model_fields(cls, fields):
+        """Model fields (``only()`` lookups) needed to serialize ``fields``."""
+        sources = getattr(cls.Meta, 'sources', {})
+        return {lookup for name in fields for lookup in sources.get(name, (name,))}
+
+
+class _AbsoluteUrlMixin:
+    def _absolute(self, url):
+        request = self.context.get('request')
+        if not url:
+            return None
+        if request is None or url.startswith('http'):
+            return url
+        return request.build_absolute_uri(url)
+
+
+class ChurchV1Serializer(_AbsoluteUrlMixin, DynamicFieldsModelSerializer):
+    logo = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Church
+        fields = [
+            'id', 'name', 'slug', 'address', 'city', 'state_province', 'country', 'latitude', 'longitude',
+            'phone', 'email', 'website', 'pastor_name', 'service_times', 'is_featured', 'logo', 'url', 'updated_at',
+        ]
+        sources = {'url': ('id',)}
+
+    def get_logo(self, obj):
+        return self._absolute(obj.get_logo_url())
+
+    def get_url(self, obj):
+        return self._absolute(reverse('church_home', args=[obj.id]))
+
+
+class EventV1Serializer(_AbsoluteUrlMixin, DynamicFieldsModelSerializer):
+    church_name = serializers.CharField(source='church.name', read_only=True)
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Event
+        fields = [
+            'id', 'church', 'church_name', 'title', 'description', 'start_date', 'end_date', 'location', 'address',
+            'event_type', 'requires_registration', 'registration_url', 'is_featured', 'url', 'updated_at',
+        ]
+        sources = {'church_name': ('church', 'church__name'), 'url': ('id',)}
+
+    def get_url(self, obj):
+        return self._absolute(reverse('event_detail', args=[obj.id]))
+
+
+class MinistryV1Serializer(_AbsoluteUrlMixin, DynamicFieldsModelSerializer):
+    church_name = serializers.CharField(source='church.name', read_only=True)
+    image = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Ministry
+        fields = [
+            'id', 'church', 'church_name', 'name', 'description', 'ministry_type', 'leader_name', 'contact_email',
+            'image', 'is_featured', 'url', 'updated_at',
+        ]
+        sources = {'church_name': ('church', 'church__name'), 'url': ('id',)}
+
+    def get_image(self, obj):
+        return self._absolute(obj.get_image_url())
+
+    def get_url(self, obj):
+        return self._absolute(reverse('ministry_detail', args=[obj.id]))
+
+
+class NewsV1Serializer(_AbsoluteUrlMixin, DynamicFieldsModelSerializer):
+    church_name = serializers.CharField(source='church.name', read_only=True)
+    image = serializers.SerializerMethodField()
+    url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = News
+        fields = [
+            'id', 'church', 'church_name', 'title', 'excerpt', 'content', 'date', 'image', 'is_featured', 'url',
+            'updated_at',
+        ]
+        sources = {'church_name': ('church', 'church__name'), 'url': ('id',)}
+
+    def get_image(self, obj):
+        return self._absolute(obj.get_image_url())
+
+    def get_url(self, obj):
+        return self._absolute(reverse('news_detail', args=[obj.id]))
+
+
+class SermonV1Serializer(_AbsoluteUrlMixin, DynamicFieldsModelSerializer):
+    church_name = serializers.CharField(source='church.name', read_only=True)
+    thumbnail = serializers.SerializerMethodField()
+    audio = serializers.SerializerMethodField()
+    video = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Sermon
+        fields = [
+            'id', 'church', 'church_name', 'title', 'preacher', 'description', 'date', 'scripture_reference',
+            'link', 'duration', 'language', 'thumbnail', 'audio', 'video', 'is_featured', 'updated_at',
+        ]
+        sources = {
+            'church_name': ('church', 'church__name'),
+            'audio': ('audio_file',),
+            'video': ('video_file',),
+        }
+
+    def get_thumbnail(self, obj):
+        return self._absolute(obj.get_thumbnail_url())
+
+    def get_audio(self, obj):
+        return self._absolute(obj.get_audio_url())
+
+    def get_video(self, obj):
+        return self._absolute(obj.get_video_url())
@@ -1,4 +1,4 @@
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
 from .media_utils import compress_model_media
@@ -26,37 +26,175 @@ def _connect_media_compression():
         pre_save.connect(
             make_handler(label in HERO_MEDIA_MODELS),
             sender=model,
+            weak=False,
             dispatch_uid=f'compress_media_{label}',
         )
 
 
+def _connect_video_transcode():
+    from django.apps import apps
+
+    from .media_jobs import VIDEO_MODELS, enqueue_transcode
+
+    def handler(sender, instance, **kwargs):
+        # compress_model_media marked new uploads in pre_save
+        for field_name in getattr(instance, '_queued_video_fields', ()):
+            enqueue_transcode(instance, field_name)
+        instance._queued_video_fields = []
+
+    for label in VIDEO_MODELS:
+        post_save.connect(
+            handler,
+            sender=apps.get_model('core', label),
+            weak=False,
+            dispatch_uid=f'video_transcode_{label.lower()}',
+        )
+
+
 def _connect_push_notifications():
     from django.apps import apps
+    from django.db import transaction
+
+    from .push_notifications import NOTIFIERS, queue_notification
+
+    def make_handler(label):
+        def handler(sender, instance, created, **kwargs):
+            # Fan-out runs on the push queue once the row is committed
+            if created:
+                pk = instance.pk
+                transaction.on_commit(lambda: queue_notification(label, pk))
+        return handler
+
+    for label in NOTIFIERS:
+        post_save.connect(
+            make_handler(label),
+            sender=apps.get_model('core', label),
+            weak=False,
+            dispatch_uid=f'push_notify_{label.lower()}',
+        )
+
+
+def _connect_church_registry():
+    from django.apps import apps
+
+    from .church_registry import invalidate_church_registry
+
+    Church = apps.get_model('core', 'Church')
+    post_save.connect(invalidate_church_registry, sender=Church, dispatch_uid='church_registry_save')
+    post_delete.connect(invalidate_church_registry, sender=Church, dispatch_uid='church_registry_delete')
+
+
+def _connect_settings_cache():
+    from django.apps import apps
+
+    AnalyticsSettings = apps.get_model('core', 'AnalyticsSettings')
+    post_save.connect(AnalyticsSettings.invalidate_cache, sender=AnalyticsSettings, dispatch_uid='analytics_settings_save')
+    post_delete.connect(AnalyticsSettings.invalidate_cache, sender=AnalyticsSettings, dispatch_uid='analytics_settings_delete')
+
+    GlobalSettings = apps.get_model('core', 'GlobalSettings')
+    # global_hero is read through the cached settings instance
+    for label in ('GlobalSettings', 'Hero', 'HeroMedia'):
+        model = apps.get_model('core', label)
+        post_save.connect(
+            GlobalSettings.invalidate_cache, sender=model, dispatch_uid=f'settings_cache_save_{label}',
+        )
+        post_delete.connect(
+            GlobalSettings.invalidate_cache, sender=model, dispatch_uid=f'settings_cache_delete_{label}',
+        )
+
+
+def _connect_calendar_cache():
+    from django.apps import apps
+
+    from .calendar_utils import invalidate_event_calendars
 
     Event = apps.get_model('core', 'Event')
-    News = apps.get_model('core', 'News')
-    Sermon = apps.get_model('core', 'Sermon')
 
-    def on_event_saved(sender, instance, created, **kwargs):
-        if created:
-            from .push_notifications import notify_new_event
-            notify_new_event(instance)
+    def remember_church(sender, instance, **kwargs):
+        # An edit can move the event to another church; both calendars change
+        instance._calendar_previous_church_id = (
+            Event.objects.filter(pk=instance.pk).values_list('church_id', flat=True).first()
+            if instance.pk and not instance._state.adding else None
+        )
+
+    def on_event_changed(sender, instance, **kwargs):
+        invalidate_event_calendars(
+            instance.church_id, getattr(instance, '_calendar_previous_church_id', None),
+        )
+
+    pre_save.connect(remember_church, sender=Event, weak=False, dispatch_uid='calendar_cache_pre_save')
+    post_save.connect(on_event_changed, sender=Event, weak=False, dispatch_uid='calendar_cache_save')
+    post_delete.connect(on_event_changed, sender=Event, weak=False, dispatch_uid='calendar_cache_delete')
+
+
+def _connect_navigation_cache():
+    from django.apps import apps
+
+    from .nav_data import invalidate_navigation
+
+    for label in ('Event', 'Ministry'):
+        model = apps.get_model('core', label)
+        post_save.connect(invalidate_navigation, sender=model, dispatch_uid=f'nav_cache_save_{label.lower()}')
+        post_delete.connect(invalidate_navigation, sender=model, dispatch_uid=f'nav_cache_delete_{label.lower()}')
+
+
+def _connect_page_cache():
+    from django.apps import apps
+
+    from .page_cache import invalidate_pages
+
+    def church_of(instance):
+        label = instance._meta.model_name
+        if label == 'church':
+            return instance.pk
+        if label == 'heromedia':
+            return getattr(instance.hero, 'church_id', None) if instance.hero_id else None
+        if label == 'eventheromedia':
+            return getattr(instance.event, 'church_id', None) if instance.event_id else None
+        return getattr(instance, 'church_id', None)
+
+    def handler(sender, instance, **kwargs):
+        try:
+            church_id = church_of(instance)
+        except Exception:
+            church_id = None  # parent already deleted in a cascade
+        invalidate_pages(church_id)
+
+    for label in (
+        'Event', 'News', 'Sermon', 'Ministry', 'Hero', 'HeroMedia', 'Church',
+        'EventHeroMedia', 'LiveStreamSettings', 'LocalAboutPage', 'LocalLeadershipPage',
+        'Testimony',
+    ):
+        model = apps.get_model('core', label)
+        post_save.connect(handler, sender=model, weak=False, dispatch_uid=f'page_cache_save_{label.lower()}')
+        post_delete.connect(handler, sender=model, weak=False, dispatch_uid=f'page_cache_delete_{label.lower()}')
+
+
+def _connect_search_index():
+    from django.apps import apps
+
+    from .search import INDEXED_MODELS, index_instance, remove_instance
 
-    def on_news_saved(sender, instance, created, **kwargs):
-        if created:
-            from .push_notifications import notify_new_news
-            notify_new_news(instance)
+    def on_save(sender, instance, raw=False, **kwargs):
+        if not raw:
+            index_instance(instance)
 
-    def on_sermon_saved(sender, instance, created, **kwargs):
-        if created:
-            from .push_notifications import notify_new_sermon
-            notify_new_sermon(instance)
+    def on_delete(sender, instance, **kwargs):
+        remove_instance(instance)
 
-    post_save.connect(on_event_saved, sender=Event, dispatch_uid='push_notify_event')
-    post_save.connect(on_news_saved, sender=News, dispatch_uid='push_notify_news')
-    post_save.connect(on_sermon_saved, sender=Sermon, dispatch_uid='push_notify_sermon')
+    for label in INDEXED_MODELS:
+        model = apps.get_model('core', label)
+        post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f'search_index_save_{label.lower()}')
+        post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f'search_index_delete_{label.lower()}')
 
 
 def connect_signals():
     _connect_media_compression()
+    _connect_video_transcode()
     _connect_push_notifications()
+    _connect_church_registry()
+    _connect_settings_cache()
+    _connect_calendar_cache()
+    _connect_navigation_cache()
+    _connect_page_cache()
+    _connect_search_index()
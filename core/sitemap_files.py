@@ -0,0 +1,157 @@
+"""
+Precomputed sitemap files.
+
+build() writes under SITEMAP_ROOT:
+- sitemap.xml: the sitemap index, one entry per section page;
+- sitemap-<section>-<page>.xml.gz: gzipped sitemaps of at most
+  SITEMAP_PAGE_SIZE URLs each (50,000 is the protocol limit);
+- manifest.json: per section, the fingerprint it was built from and its files
+  with their lastmod (the newest lastmod of their URLs).
+
+A section is only regenerated when its fingerprint (row count and newest
+update of what it lists, see core.sitemaps.BaseSitemap) changed, so editing a
+news article rewrites the news files and leaves the rest alone. The views
+serve the bytes from disk; /sitemap.xml first runs a build when the site's
+content version moved since the last one (a few aggregate queries when
+nothing relevant changed).
+"""
+import gzip
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+
+from .page_cache import content_version
+from .sitemaps import SITEMAPS
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = 'sitemap.xml'
+MANIFEST_NAME = 'manifest.json'
+FILE_NAME_RE = re.compile(r'^sitemap-[a-z_]+-\d+\.xml\.gz$')
+
+_build_lock = threading.Lock()
+
+
+def root():
+    return Path(getattr(settings, 'SITEMAP_ROOT', Path(settings.BASE_DIR) / 'sitemaps'))
+
+
+def _site():
+    """(protocol, domain) the URLs are written with: SITE_DOMAIN, else the Sites framework domain."""
+    domain = getattr(settings, 'SITE_DOMAIN', '').strip()
+    if not domain:
+        from django.contrib.sites.models import Site
+
+        domain = Site.objects.get_current().domain
+    return getattr(settings, 'SITEMAP_PROTOCOL', 'https'), domain
+
+
+def load_manifest():
+    try:
+        with open(root() / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'sections': {}}
+
+
+def _write(path, data):
+    """Replace ``path`` atomically so readers never see a partial file."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _build_section(name, sitemap, protocol, domain):
+    site = SimpleNamespace(domain=domain, name=domain)
+    files = []
+    if not sitemap.paginator.count:
+        return files
+    for page in sitemap.paginator.page_range:
+        sitemap.latest_lastmod = None
+        urls = sitemap.get_urls(page=page, site=site, protocol=protocol)
+        xml = render_to_string('sitemap.xml', {'urlset': urls}).encode('utf-8')
+        filename = f'sitemap-{name}-{page}.xml.gz'
+        _write(root() / filename, gzip.compress(xml, mtime=0))
+        lastmod = getattr(sitemap, 'latest_lastmod', None)
+        files.append({'file': filename, 'urls': len(urls), 'lastmod': lastmod.isoformat() if lastmod else None})
+    return files
+
+
+def build(force=False):
+    """
+    Regenerate the sections whose content changed (all of them with
+    ``force``) and rewrite the index. Returns the names of rebuilt sections.
+    """
+    with _build_lock:
+        root().mkdir(parents=True, exist_ok=True)
+        version = content_version()
+        protocol, domain = _site()
+        manifest = load_manifest()
+        sections, rebuilt = {}, []
+        for name, sitemap_class in SITEMAPS.items():
+            sitemap = sitemap_class()
+            sitemap.limit = getattr(settings, 'SITEMAP_PAGE_SIZE', sitemap.limit)
+            fingerprint = f'{protocol}://{domain}|{sitemap.limit}|{sitemap.fingerprint()}'
+            previous = manifest['sections'].get(name)
+            if (
+                not force and previous and previous['fingerprint'] == fingerprint
+                and all((root() / f['file']).exists() for f in previous['files'])
+            ):
+                sections[name] = previous
+                continue
+            files = _build_section(name, sitemap, protocol, domain)
+            kept = {f['file'] for f in files}
+            for old in (previous or {}).get('files', []):
+                if old['file'] not in kept:
+                    (root() / old['file']).unlink(missing_ok=True)
+            sections[name] = {'fingerprint': fingerprint, 'files': files}
+            rebuilt.append(name)
+
+        if rebuilt or not (root() / INDEX_NAME).exists():
+            items = [
+                SitemapIndexItem(
+                    f"{protocol}://{domain}{reverse('sitemap_file', args=[f['file']])}",
+                    parse_datetime(f['lastmod']) if f['lastmod'] else None,
+                )
+                for section in sections.values() for f in section['files']
+            ]
+            _write(root() / INDEX_NAME, render_to_string('sitemap_index.xml', {'sitemaps': items}).encode('utf-8'))
+        _write(
+            root() / MANIFEST_NAME,
+            json.dumps({'content_version': version, 'sections': sections}, indent=1).encode('utf-8'),
+        )
+        if rebuilt:
+            logger.info('Sitemap sections rebuilt: %s', ', '.join(rebuilt))
+        return rebuilt
+
+
+def ensure_current():
+    """Build when the site's content changed since the last build (or nothing was built yet)."""
+    version = content_version()
+    if not version or load_manifest().get('content_version') != version or not (root() / INDEX_NAME).exists():
+        build()
+
+
+def last_modified(filename):
+    """lastmod of a section file, or of the newest one for the index."""
+    files = [f for section in load_manifest()['sections'].values() for f in section['files']]
+    if filename != INDEX_NAME:
+        files = [f for f in files if f['file'] == filename]
+    stamps = [parse_datetime(f['lastmod']) for f in files if f['lastmod']]
+    return max(stamps, default=None)
@@ -2,13 +2,53 @@
 Sitemaps for SEO: static pages, churches, events, ministries, news.
 When a new church is created (and approved), it is included automatically.
 """
+import hashlib
+
 from django.contrib.sitemaps import Sitemap
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.query import QuerySet
 from django.urls import reverse
 from django.utils import timezone
-from .models import Church, Event, Ministry, News
-
-
-class StaticViewSitemap(Sitemap):
+from .models import Church, Event, Ministry, News, Sermon
+
+
+class BaseSitemap(Sitemap):
+    """Sitemap section that can tell cheaply whether its URLs changed (see core.sitemap_files)."""
+    fingerprint_field = 'updated_at'
+
+    def fingerprint_queryset(self):
+        items = self.items()
+        return items if isinstance(items, QuerySet) else None
+
+    def fingerprint(self):
+        """Row count and newest update of what the section lists, as a string."""
+        queryset = self.fingerprint_queryset()
+        if queryset is None:
+            return hashlib.sha1(repr(list(self.items())).encode('utf-8')).hexdigest()
+        stats = queryset.order_by().aggregate(n=Count('pk'), m=Max(self.fingerprint_field))
+        return f"{stats['n']}:{stats['m'].isoformat() if stats['m'] else ''}"
+
+
+def _churches_with_latest_content():
+    """
+    Active, approved churches annotated with ``latest_content``: the newest
+    updated_at of the church and of its events, news, sermons and ministries.
+    """
+    newest = [
+        Coalesce(
+            Subquery(model.objects.filter(church=OuterRef('pk')).order_by('-updated_at').values('updated_at')[:1]),
+            F('updated_at'),
+        )
+        for model in (Event, News, Sermon, Ministry)
+    ]
+    return (
+        Church.objects.filter(is_active=True, is_approved=True)
+        .annotate(latest_content=Greatest('updated_at', *newest))
+    )
+
+
+class StaticViewSitemap(BaseSitemap):
     """Static pages that don't change often."""
     changefreq = 'weekly'
     priority = 0.8
@@ -54,11 +94,14 @@ def _slug(s):
     """Turn a name into a URL slug (e.g. 'New York' -> 'new-york')."""
     return (s or '').lower().replace(' ', '-').strip('-')
 
-class ChurchLocationSitemap(Sitemap):
+class ChurchLocationSitemap(BaseSitemap):
     """Country and country+city URLs for SEO: /churches/germany/, /churches/germany/hamburg/."""
     changefreq = 'weekly'
     priority = 0.85
 
+    def fingerprint_queryset(self):
+        return Church.objects.filter(is_active=True, is_approved=True)
+
     def items(self):
         churches = Church.objects.filter(is_active=True, is_approved=True).values_list('country', 'city').distinct()
         seen_countries = set()
@@ -83,59 +126,54 @@ class ChurchLocationSitemap(Sitemap):
         return reverse('church_detail_by_location', kwargs={'country_slug': cslug, 'city_slug': ccity})
 
 
-class ChurchSitemap(Sitemap):
+class ChurchSitemap(BaseSitemap):
     """All active, approved churches. New churches appear here automatically when approved."""
     changefreq = 'weekly'
     priority = 0.9
+    fingerprint_field = 'latest_content'
 
     def items(self):
-        return Church.objects.filter(is_active=True, is_approved=True).order_by('name')
+        return _churches_with_latest_content().only('id', 'updated_at').order_by('name')
 
     def location(self, church):
         return reverse('church_detail', kwargs={'church_id': church.id})
 
     def lastmod(self, church):
-        return church.updated_at
+        return church.latest_content
 
 
-class ChurchPagesSitemap(Sitemap):
+class ChurchPagesSitemap(BaseSitemap):
     """Church hub and subpages: church/<id>/, church/<id>/events/, about/, etc."""
     changefreq = 'weekly'
     priority = 0.85
+    fingerprint_field = 'latest_content'
+    page_names = (
+        'church_home', 'church_events', 'church_ministries', 'church_sermons', 'church_news',
+        'church_about', 'church_calendar', 'church_leadership', 'church_watch', 'church_donation',
+    )
+
+    def fingerprint_queryset(self):
+        return _churches_with_latest_content()
 
     def items(self):
-        churches = Church.objects.filter(is_active=True, is_approved=True)
-        entries = []
-        for church in churches:
-            entries.append((church, 'church_home'))
-            entries.append((church, 'church_events'))
-            entries.append((church, 'church_ministries'))
-            entries.append((church, 'church_sermons'))
-            entries.append((church, 'church_news'))
-            entries.append((church, 'church_about'))
-            entries.append((church, 'church_calendar'))
-            entries.append((church, 'church_leadership'))
-            entries.append((church, 'church_watch'))
-            entries.append((church, 'church_donation'))
-        return entries
+        churches = _churches_with_latest_content().only('id', 'updated_at').order_by('name')
+        return [(church, view_name) for church in churches for view_name in self.page_names]
 
     def location(self, item):
         church, view_name = item
-        if view_name == 'church_donation':
-            return reverse('church_donation', kwargs={'church_id': church.id})
         return reverse(view_name, kwargs={'church_id': church.id})
 
     def lastmod(self, item):
-        return item[0].updated_at
+        return item[0].latest_content
 
 
-class EventSitemap(Sitemap):
+class EventSitemap(BaseSitemap):
     """Global event detail pages (events/<uuid>/)."""
     changefreq = 'weekly'
     priority = 0.8
 
     def items(self):
-        return Event.objects.filter(is_public=True).select_related('church').order_by('-start_date')
+        return Event.objects.filter(is_public=True).only('id', 'updated_at').order_by('-start_date', 'id')
 
     def location(self, event):
         return reverse('event_detail', kwargs={'event_id': event.id})
@@ -144,13 +182,13 @@ class EventSitemap(Sitemap):
         return event.updated_at
 
 
-class ChurchEventSitemap(Sitemap):
+class ChurchEventSitemap(BaseSitemap):
     """Church-specific event pages (church/<id>/events/<event_id>/)."""
     changefreq = 'weekly'
     priority = 0.75
 
     def items(self):
-        return Event.objects.filter(is_public=True, church__is_active=True, church__is_approved=True).select_related('church').order_by('-start_date')
+        return Event.objects.filter(is_public=True, church__is_active=True, church__is_approved=True).only('id', 'church_id', 'updated_at').order_by('-start_date', 'id')
 
     def location(self, event):
         return reverse('church_event_detail', kwargs={'church_id': event.church_id, 'event_id': event.id})
@@ -159,13 +197,13 @@ class ChurchEventSitemap(Sitemap):
         return event.updated_at
 
 
-class MinistrySitemap(Sitemap):
+class MinistrySitemap(BaseSitemap):
     """Global ministry detail pages (ministries/<uuid>/)."""
     changefreq = 'monthly'
     priority = 0.75
 
     def items(self):
-        return Ministry.objects.all().select_related('church').filter(church__is_active=True, church__is_approved=True).order_by('name')
+        return Ministry.objects.filter(church__is_active=True, church__is_approved=True).only('id', 'updated_at').order_by('name', 'id')
 
     def location(self, ministry):
         return reverse('ministry_detail', kwargs={'ministry_id': ministry.id})
@@ -174,13 +212,13 @@ class MinistrySitemap(Sitemap):
         return ministry.updated_at
 
 
-class ChurchMinistrySitemap(Sitemap):
+class ChurchMinistrySitemap(BaseSitemap):
     """Church-specific ministry pages (church/<id>/ministries/<id>/)."""
     changefreq = 'monthly'
     priority = 0.7
 
     def items(self):
-        return Ministry.objects.filter(church__is_active=True, church__is_approved=True).select_related('church').order_by('name')
+        return Ministry.objects.filter(church__is_active=True, church__is_approved=True).only('id', 'church_id', 'updated_at').order_by('name', 'id')
 
     def location(self, ministry):
         return reverse('church_ministry_detail', kwargs={'church_id': ministry.church_id, 'ministry_id': ministry.id})
@@ -189,16 +227,30 @@ class ChurchMinistrySitemap(Sitemap):
         return ministry.updated_at
 
 
-class NewsSitemap(Sitemap):
+class NewsSitemap(BaseSitemap):
     """News detail pages (news/<uuid>/)."""
     changefreq = 'weekly'
     priority = 0.75
 
     def items(self):
-        return News.objects.filter(is_public=True).select_related('church').filter(church__is_active=True, church__is_approved=True).order_by('-date')
+        return News.objects.filter(is_public=True, church__is_active=True, church__is_approved=True).only('id', 'updated_at').order_by('-date', 'id')
 
     def location(self, news):
         return reverse('news_detail', kwargs={'news_id': news.id})
 
     def lastmod(self, news):
         return news.updated_at
+
+
+# Section name -> sitemap class (/sitemap.xml index, core.sitemap_files)
+SITEMAPS = {
+    'static': StaticViewSitemap,
+    'churches': ChurchSitemap,
+    'church_locations': ChurchLocationSitemap,
+    'church_pages': ChurchPagesSitemap,
+    'events': EventSitemap,
+    'church_events': ChurchEventSitemap,
+    'ministries': MinistrySitemap,
+    'church_ministries': ChurchMinistrySitemap,
+    'news': NewsSitemap,
+}
@@ -0,0 +1,357 @@
+"""
+Synthetic data at production scale, for reproducing scaling problems locally.
+
+generate() writes churches, then their events, sermons, news and ministries
+(with search documents), then analytics visitor sessions and page views
+spread over the last `days` days. Everything is inserted with bulk_create in
+chunks. A chunk draws from its own random.Random seeded with (seed, kind,
+chunk number), so a seed always produces the same rows (apart from their
+UUIDs), whether the chunks run in this process or in a pool of `workers`
+processes. Workers build their rows in parallel; on SQLite, which allows a
+single writer, they take turns for the inserts. Timestamps are relative to `anchor` (the start of the run, to the
+hour).
+
+bulk_create sends no signals, so generate() re-aggregates the analytics
+rollups of the days it wrote (the rows are backdated, behind the rollup
+watermark) and drops the cached registry, navigation, calendars and pages
+itself.
+Generated rows are recognised by their slug / session_id prefix; delete()
+removes them again.
+"""
+import datetime
+import logging
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager, nullcontext
+
+from django.db import connection, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'synthetic-'
+CHUNK_SIZE = 5000
+
+PRESETS = {
+    'small': {
+        'churches': 100, 'events': 20, 'sermons': 20, 'news': 10, 'ministries': 5,
+        'sessions': 20_000, 'views_per_session': 3, 'days': 90,
+    },
+    'medium': {
+        'churches': 2_000, 'events': 20, 'sermons': 20, 'news': 10, 'ministries': 5,
+        'sessions': 200_000, 'views_per_session': 3, 'days': 180,
+    },
+    'large': {
+        'churches': 20_000, 'events': 15, 'sermons': 15, 'news': 5, 'ministries': 5,
+        'sessions': 1_000_000, 'views_per_session': 3, 'days': 365,
+    },
+}
+
+PLACES = [
+    ('Ghana', 'Accra', 5.6037, -0.1870), ('Ghana', 'Kumasi', 6.6885, -1.6244), ('Ghana', 'Takoradi', 4.8845, -1.7554),
+    ('Germany', 'Bremen', 53.0793, 8.8017), ('Germany', 'Hamburg', 53.5511, 9.9937), ('Germany', 'Berlin', 52.5200, 13.4050),
+    ('United Kingdom', 'London', 51.5074, -0.1278), ('United Kingdom', 'Manchester', 53.4808, -2.2426),
+    ('United States', 'New York', 40.7128, -74.0060), ('United States', 'Houston', 29.7604, -95.3698),
+    ('Canada', 'Toronto', 43.6532, -79.3832), ('Netherlands', 'Amsterdam', 52.3676, 4.9041),
+    ('Italy', 'Rome', 41.9028, 12.4964), ('Nigeria', 'Lagos', 6.5244, 3.3792), ('Kenya', 'Nairobi', -1.2921, 36.8219),
+]
+WORDS = (
+    'grace faith hope love prayer worship praise glory kingdom spirit mercy light peace joy truth '
+    'fellowship revival healing blessing covenant promise harvest shepherd victory salvation'
+).split()
+PREACHERS = ('Pastor Kwame Mensah', 'Pastor Sarah Johnson', 'Pastor Grace Okechukwu', 'Pastor Hans Mueller', 'Rev. Daniel Asante')
+BOOKS = ('Genesis', 'Psalms', 'Isaiah', 'Matthew', 'John', 'Acts', 'Romans', 'Ephesians', 'Hebrews', 'James')
+DEVICES = (('mobile', 0.6), ('desktop', 0.32), ('tablet', 0.08))
+BROWSERS = (('Chrome', 'Windows 10'), ('Safari', 'iOS'), ('Chrome', 'Android'), ('Firefox', 'Linux'), ('Edge', 'Windows 11'))
+REFERRERS = ('', '', '', 'https://www.google.com/', 'https://www.facebook.com/', 'https://www.youtube.com/')
+GLOBAL_PAGES = (('/', 'smart_home'), ('/churches/', 'church_list'), ('/events/', 'events'), ('/events/calendar/', 'calendar'), ('/watch/', 'watch'))
+CHURCH_PAGES = (('', 'church_home'), ('events/', 'church_events'), ('sermons/', 'church_sermons'), ('about/', 'church_about'))
+
+# Set in each worker (and in the parent when running without a pool)
+_context = {}
+
+
+def resolve(preset='small', **overrides):
+    """The preset's sizes with any non-None overrides applied."""
+    if preset not in PRESETS:
+        raise ValueError(f'Unknown preset {preset!r}; choose from {", ".join(PRESETS)}')
+    return {**PRESETS[preset], **{key: value for key, value in overrides.items() if value is not None}}
+
+
+def place(index):
+    return PLACES[index % len(PLACES)]
+
+
+def _words(rng, n):
+    return ' '.join(rng.choice(WORDS) for _ in range(n))
+
+
+def _weighted(rng, pairs):
+    return rng.choices([value for value, _ in pairs], weights=[weight for _, weight in pairs])[0]
+
+
+@contextmanager
+def _explicit_timestamps(model, *names):
+    # auto_now / auto_now_add would overwrite the backdated values in bulk_create
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _writing():
+    lock = _context.get('write_lock')
+    return lock if lock is not None else nullcontext()
+
+
+def _chunks(total, size):
+    return [(number, start, min(start + size, total)) for number, start in enumerate(range(0, total, size))]
+
+
+# Chunk writers (run in workers)
+
+def _write_churches(chunk):
+    from .models import Church
+
+    number, start, stop = chunk
+    rng = random.Random(f"{_context['seed']}:church:{number}")
+    anchor, days = _context['anchor'], _context['days']
+    churches = []
+    for index in range(start, stop):
+        country, city, lat, lon = place(index)
+        created = anchor - datetime.timedelta(days=rng.randint(days, days * 3), minutes=rng.randint(0, 1439))
+        churches.append(Church(
+            name=f'Bethel Prayer Ministry - {city} {index}', slug=f"{_context['prefix']}{index}",
+            address=f'{rng.randint(1, 400)} {rng.choice(WORDS).title()} Street', city=city, country=country,
+            latitude=round(lat + rng.uniform(-0.3, 0.3), 6), longitude=round(lon + rng.uniform(-0.3, 0.3), 6),
+            email=f"church{index}@example.com", phone=f'+{rng.randint(1, 99)} {rng.randint(100000, 999999)}',
+            pastor_name=rng.choice(PREACHERS), description=_words(rng, 30),
+            is_active=rng.random() < 0.97, is_approved=rng.random() < 0.95, is_featured=rng.random() < 0.02,
+            created_at=created, updated_at=created,
+        ))
+    with _writing(), _explicit_timestamps(Church, 'created_at', 'updated_at'):
+        Church.objects.bulk_create(churches, batch_size=1000)
+    return len(churches)
+
+
+def _write_content(chunk):
+    from . import search
+    from .models import Event, Ministry, News, SearchDocument, Sermon
+
+    number, start, stop = chunk
+    rng = random.Random(f"{_context['seed']}:content:{number}")
+    anchor, days, sizes = _context['anchor'], _context['days'], _context['sizes']
+    event_types = [value for value, _ in Event._meta.get_field('event_type').choices]
+    ministry_types = [value for value, _ in Ministry._meta.get_field('ministry_type').choices]
+    rows = {Event: [], Sermon: [], News: [], Ministry: []}
+    for index in range(start, stop):
+        church_id = _context['church_ids'][index]
+        city = place(index)[1]
+        for _ in range(sizes['events']):
+            starts = anchor + datetime.timedelta(days=rng.randint(-days, 120), hours=rng.randint(7, 20))
+            rows[Event].append(Event(
+                church_id=church_id, title=f'{rng.choice(WORDS).title()} {rng.choice(("Service", "Night", "Conference", "Outreach"))}',
+                description=_words(rng, 25), location=city, event_type=rng.choice(event_types),
+                start_date=starts, end_date=starts + datetime.timedelta(hours=rng.choice((1, 2, 3, 26))),
+                is_public=rng.random() < 0.95, is_featured=rng.random() < 0.05,
+            ))
+        for _ in range(sizes['sermons']):
+            rows[Sermon].append(Sermon(
+                church_id=church_id, title=f'{rng.choice(WORDS).title()} and {rng.choice(WORDS).title()}',
+                preacher=rng.choice(PREACHERS), description=_words(rng, 40),
+                scripture_reference=f'{rng.choice(BOOKS)} {rng.randint(1, 28)}:{rng.randint(1, 30)}',
+                date=(anchor - datetime.timedelta(days=rng.randint(0, days * 2))).date(),
+                is_public=rng.random() < 0.95,
+            ))
+        for _ in range(sizes['news']):
+            rows[News].append(News(
+                church_id=church_id, title=_words(rng, 5).capitalize(), content=_words(rng, 80),
+                excerpt=_words(rng, 15), date=(anchor - datetime.timedelta(days=rng.randint(0, days))).date(),
+                is_public=rng.random() < 0.95,
+            ))
+        for _ in range(sizes['ministries']):
+            rows[Ministry].append(Ministry(
+                church_id=church_id, name=f'{rng.choice(WORDS).title()} Ministry', description=_words(rng, 20),
+                ministry_type=rng.choice(ministry_types), leader_name=rng.choice(PREACHERS),
+            ))
+    documents = []
+    for model, objs in rows.items():
+        kind = search.INDEXED_MODELS[model.__name__]
+        for obj in objs:
+            fields = search._document_fields(kind, obj)
+            if fields is not None:
+                documents.append(SearchDocument(kind=kind, object_id=obj.pk, **fields))
+    with _writing():
+        for model, objs in rows.items():
+            model.objects.bulk_create(objs, batch_size=1000)
+        SearchDocument.objects.bulk_create(documents, batch_size=1000)
+    return sum(len(objs) for objs in rows.values())
+
+
+def _write_sessions(chunk):
+    from .analytics_models import PageView, VisitorSession
+
+    number, start, stop = chunk
+    rng = random.Random(f"{_context['seed']}:session:{number}")
+    anchor, days, church_ids = _context['anchor'], _context['days'], _context['church_ids']
+    average = _context['sizes']['views_per_session']
+    sessions, views = [], []
+    for i in range(start, stop):
+        index = rng.randrange(len(church_ids)) if church_ids and rng.random() < 0.7 else None
+        country, city = place(index)[:2] if index is not None else rng.choice(PLACES)[:2]
+        church_id = church_ids[index] if index is not None else None
+        device = _weighted(rng, DEVICES)
+        browser, os_name = rng.choice(BROWSERS)
+        referrer = rng.choice(REFERRERS)
+        started = anchor - datetime.timedelta(days=rng.randint(0, days - 1), seconds=rng.randint(0, 86399))
+        count = rng.randint(1, average * 2 - 1)
+        session = VisitorSession(
+            session_id=f"{_context['prefix']}{i}", ip_address=f'{rng.randint(11, 220)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.0',
+            user_agent=f'Mozilla/5.0 ({os_name}) {browser}/120.0', country=country, city=city,
+            device_type=device, browser=browser, browser_version='120.0', os=os_name,
+            referrer=referrer, referrer_domain=referrer.split('/')[2] if referrer else '',
+            church_id=church_id, page_views_count=count, started_at=started,
+        )
+        offset = 0
+        for _ in range(count):
+            if church_id is not None and rng.random() < 0.8:
+                suffix, view_name = rng.choice(CHURCH_PAGES)
+                path = f'/church/{church_id}/{suffix}'
+            else:
+                path, view_name = rng.choice(GLOBAL_PAGES)
+            views.append(PageView(
+                session=session, url=f'https://bethelprayerministryinternational.com{path}', path=path,
+                view_name=view_name, church_id=church_id if path.startswith('/church/') else None,
+                load_time=rng.randint(80, 2500), viewed_at=started + datetime.timedelta(seconds=offset),
+            ))
+            offset += rng.randint(5, 300)
+        session.duration = offset
+        session.last_activity = session.ended_at = started + datetime.timedelta(seconds=offset)
+        sessions.append(session)
+    with _writing(), _explicit_timestamps(VisitorSession, 'started_at', 'last_activity'), \
+            _explicit_timestamps(PageView, 'viewed_at'):
+        VisitorSession.objects.bulk_create(sessions, batch_size=1000)
+        PageView.objects.bulk_create(views, batch_size=1000)
+    return len(sessions) + len(views)
+
+
+# Driver
+
+def _init_worker(context):
+    import django
+    from django.apps import apps
+
+    if not apps.ready:  # spawned (not forked) worker
+        django.setup()
+    _context.clear()
+    _context.update(context)
+
+
+def _run(label, writer, chunks, context, workers, progress):
+    t0 = time.perf_counter()
+    done = 0
+    if workers > 1 and len(chunks) > 1:
+        # Forked workers must not share the parent's database connections
+        connections.close_all()
+        if connection.vendor == 'sqlite':
+            context = {**context, 'write_lock': multiprocessing.Lock()}
+        with multiprocessing.Pool(min(workers, len(chunks)), initializer=_init_worker, initargs=(context,)) as pool:
+            for rows in pool.imap_unordered(writer, chunks):
+                done += rows
+                progress(f'{label}: {done} rows')
+    else:
+        _init_worker(context)
+        for chunk in chunks:
+            done += writer(chunk)
+            progress(f'{label}: {done} rows')
+    return done, time.perf_counter() - t0
+
+
+def church_ids(prefix=PREFIX):
+    """Ids of generated churches, in generation order."""
+    from .models import Church
+
+    rows = Church.objects.filter(slug__startswith=prefix).values_list('slug', 'id')
+    by_index = {}
+    for slug, pk in rows:
+        suffix = slug[len(prefix):]
+        if suffix.isdigit():
+            by_index[int(suffix)] = pk
+    return [by_index[index] for index in sorted(by_index)]
+
+
+def generate(sizes, *, seed=42, workers=1, prefix=PREFIX, anchor=None, chunk_size=CHUNK_SIZE, rollup=True, progress=None):
+    """Write the rows described by ``sizes`` (see PRESETS); returns {phase: (rows, seconds)}."""
+    from .analytics_rollup import rollup_days
+    from .models import Church
+
+    progress = progress or (lambda message: logger.info(message))
+    if Church.objects.filter(slug__startswith=prefix).exists():
+        raise ValueError(f'Churches with slug prefix {prefix!r} already exist; delete them first')
+    anchor = anchor or timezone.now().replace(minute=0, second=0, microsecond=0)
+    context = {'seed': seed, 'prefix': prefix, 'anchor': anchor, 'days': sizes['days'], 'sizes': sizes}
+
+    report = {}
+    church_chunk = max(1, chunk_size // 5)
+    report['churches'] = _run('churches', _write_churches, _chunks(sizes['churches'], church_chunk), context, workers, progress)
+    context['church_ids'] = church_ids(prefix)
+
+    per_church = sizes['events'] + sizes['sermons'] + sizes['news'] + sizes['ministries']
+    content_chunk = max(1, chunk_size // max(per_church, 1))
+    if per_church:
+        report['content'] = _run('content', _write_content, _chunks(sizes['churches'], content_chunk), context, workers, progress)
+
+    session_chunk = max(1, chunk_size // max(sizes['views_per_session'], 1))
+    report['analytics'] = _run('analytics', _write_sessions, _chunks(sizes['sessions'], session_chunk), context, workers, progress)
+
+    if rollup and sizes['sessions']:
+        t0 = time.perf_counter()
+        first = timezone.localdate(anchor - datetime.timedelta(days=sizes['days']))
+        written = rollup_days(_days_between(first, timezone.localdate(anchor)))
+        report['rollup'] = (written, time.perf_counter() - t0)
+    invalidate_caches(context['church_ids'])
+    return report
+
+
+def _days_between(first, last):
+    return [first + datetime.timedelta(days=n) for n in range((last - first).days + 1)]
+
+
+def invalidate_caches(ids):
+    """Drop cached data that bulk-created (or bulk-deleted) churches and content would leave stale."""
+    from .calendar_utils import invalidate_event_calendars
+    from .church_registry import invalidate_church_registry
+    from .nav_data import invalidate_navigation
+    from .page_cache import invalidate_pages
+
+    invalidate_church_registry()
+    invalidate_navigation()
+    invalidate_event_calendars(*ids)
+    invalidate_pages(*ids)
+
+
+def delete(prefix=PREFIX):
+    """Remove generated churches (with their content) and analytics sessions; returns rows deleted."""
+    from django.db.models import Max, Min
+
+    from .analytics_models import VisitorSession
+    from .analytics_rollup import rollup_days
+    from .models import Church
+
+    ids = church_ids(prefix)
+    total = 0
+    for start in range(0, len(ids), 500):
+        total += Church.objects.filter(pk__in=ids[start:start + 500]).delete()[0]
+    sessions = VisitorSession.objects.filter(session_id__startswith=prefix)
+    span = sessions.aggregate(first=Min('started_at'), last=Max('last_activity'))
+    total += sessions.delete()[0]
+    if span['first'] is not None:
+        rollup_days(_days_between(timezone.localdate(span['first']), timezone.localdate(span['last'])))
+    invalidate_caches(ids)
+    return total
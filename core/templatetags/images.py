@@ -0,0 +1,76 @@
+"""
+Responsive image tags backed by core.renditions.
+
+    {% load images %}
+    {% picture sermon.thumbnail alt=sermon.title sizes="(min-width: 768px) 33vw, 100vw" class="w-full h-32 object-cover" %}
+
+renders a <picture> with AVIF/WebP <source>s and a JPEG <img srcset>. Until
+renditions exist (or for external URLs) it renders a plain <img>. With
+``absolute=True`` every URL is made absolute from the request in the context.
+"""
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from core.renditions import get_manifest, rendition_url, srcset as build_srcset
+
+register = template.Library()
+
+DEFAULT_SIZES = '100vw'
+
+
+def _attrs(attrs):
+    return format_html_join('', ' {}="{}"', ((k.replace('_', '-'), v) for k, v in attrs.items() if v not in (None, False)))
+
+
+def _url_builder(context, absolute):
+    request = context.get('request') if absolute else None
+    if request is None:
+        return lambda url: url
+    return request.build_absolute_uri
+
+
+@register.simple_tag(takes_context=True)
+def picture(context, image, alt='', sizes=DEFAULT_SIZES, loading='lazy', absolute=False, **attrs):
+    """<picture> markup for an ImageField value (``class`` and other attributes go on the <img>)."""
+    if not image:
+        return ''
+    url = _url_builder(context, absolute)
+    attrs.setdefault('decoding', 'async')
+    manifest = get_manifest(image)
+    if not manifest or 'image/jpeg' not in manifest['sources']:
+        src = image.url if hasattr(image, 'url') and not str(image).startswith('http') else str(image)
+        return format_html('<img src="{}" alt="{}" loading="{}"{}>', url(src), alt, loading, _attrs(attrs))
+
+    sources = manifest['sources']
+    jpeg = sources['image/jpeg']
+    fallback = next((path for width, path in jpeg if width >= 640), jpeg[-1][1])
+    parts = [
+        format_html('<source type="{}" srcset="{}" sizes="{}">', mime, build_srcset(entries, url=url), sizes)
+        for mime, entries in sources.items()
+        if mime != 'image/jpeg'
+    ]
+    img = format_html(
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" loading="{}"{}>',
+        url(default_storage.url(fallback)),
+        build_srcset(jpeg, url=url), sizes, manifest['width'], manifest['height'], alt, loading, _attrs(attrs),
+    )
+    return format_html('<picture>{}{}</picture>', mark_safe(''.join(parts)), img)
+
+
+@register.simple_tag
+def srcset(image):
+    """JPEG ``srcset`` value for an ImageField value ('' until renditions exist)."""
+    manifest = get_manifest(image) if image else None
+    if not manifest:
+        return ''
+    return build_srcset(manifest['sources'].get('image/jpeg') or [])
+
+
+@register.simple_tag
+def image_url(image, width=640):
+    """URL of a rendition at least ``width`` pixels wide, or of the original."""
+    if not image:
+        return ''
+    return rendition_url(image, width)
@@ -1,3 +1,155 @@
-from django.test import TestCase
+import socket
+import unittest
 
-# Create your tests here.
+from django.template import Context, Template
+from django.test import RequestFactory, TestCase, override_settings
+
+from .models import Church, LocalAboutPage, LocalLeadershipPage, OutboundEmail, Testimony
+from .outbox import enqueue_email, run_worker
+from .page_cache import content_version
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:  # pragma: no cover
+    Controller = None
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    """Accepts every message except for REJECT_ADDRESS, which gets a 550."""
+    REJECT_ADDRESS = 'nobody@example.com'
+
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address == self.REJECT_ADDRESS:
+            return '550 5.1.1 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append(envelope)
+        return '250 Message accepted'
+
+
+@unittest.skipUnless(Controller, 'aiosmtpd is not installed')
+class OutboxWorkerTests(TestCase):
+    """run_worker against a local SMTP server (aiosmtpd)."""
+
+    def setUp(self):
+        self.handler = RecordingHandler()
+        self.controller = Controller(self.handler, hostname='127.0.0.1', port=_free_port())
+        self.controller.start()
+        self.addCleanup(self.controller.stop)
+        smtp = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=self.controller.port,
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+            EMAIL_HOST_USER='',
+            EMAIL_HOST_PASSWORD='',
+            DEFAULT_FROM_EMAIL='noreply@example.com',
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+        self.church = Church.objects.create(name='Bremen', slug='bremen', city='Bremen', country='Germany')
+
+    def test_batch_is_sent_over_one_session(self):
+        for i in range(5):
+            enqueue_email(f'Hello {i}', 'Body', [f'user{i}@example.com'], church=self.church)
+
+        sent, handled = run_worker(once=True)
+
+        self.assertEqual((sent, handled), (5, 5))
+        self.assertEqual(len(self.handler.messages), 5)
+        self.assertEqual(self.handler.sessions, 1)
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 5)
+
+    @override_settings(EMAIL_OUTBOX_CHURCH_RATE=2)
+    def test_church_rate_limit_defers_extra_mail(self):
+        for i in range(4):
+            enqueue_email(f'Hello {i}', 'Body', [f'user{i}@example.com'], church=self.church)
+
+        sent, _ = run_worker(once=True)
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(len(self.handler.messages), 2)
+        deferred = OutboundEmail.objects.filter(status='pending')
+        self.assertEqual(deferred.count(), 2)
+        first_sent = OutboundEmail.objects.filter(status='sent').order_by('sent_at').first()
+        for message in deferred:
+            self.assertGreater(message.next_attempt_at, first_sent.sent_at)
+
+    def test_permanent_refusal_is_failed(self):
+        rejected = enqueue_email('Hello', 'Body', [RecordingHandler.REJECT_ADDRESS], church=self.church)
+        accepted = enqueue_email('Hello', 'Body', ['user@example.com'], church=self.church)
+
+        sent, handled = run_worker(once=True)
+
+        self.assertEqual((sent, handled), (1, 2))
+        rejected.refresh_from_db()
+        accepted.refresh_from_db()
+        self.assertEqual(rejected.status, 'failed')
+        self.assertEqual(rejected.attempts, 1)
+        self.assertIn('550', rejected.error)
+        self.assertEqual(accepted.status, 'sent')
+
+
+class PageCacheInvalidationTests(TestCase):
+    """Saving content shown on cached pages bumps the page content version."""
+
+    def setUp(self):
+        self.church = Church.objects.create(
+            name='Bremen', slug='bremen', city='Bremen', country='Germany', is_approved=True, is_active=True,
+        )
+
+    def assertBumps(self, save, church_id=None):
+        before = content_version(church_id)
+        save()
+        self.assertNotEqual(content_version(church_id), before)
+
+    def test_about_and_leadership_pages_bump_their_church(self):
+        about = LocalAboutPage.objects.create(church=self.church)
+        leadership = LocalLeadershipPage.objects.create(church=self.church)
+        about.intro = 'New intro'
+        leadership.intro = 'New team'
+        self.assertBumps(about.save, self.church.id)
+        self.assertBumps(leadership.save, self.church.id)
+
+    def test_testimony_bumps_global_pages(self):
+        testimony = Testimony(
+            church=self.church, author_name='A', author_email='a@example.com', title='Healed', content='Thanks',
+        )
+        self.assertBumps(testimony.save)
+        testimony.is_approved = True
+        self.assertBumps(testimony.save)
+        self.assertBumps(testimony.delete)
+
+
+@override_settings(ALLOWED_HOSTS=['bethel.example'])
+class PictureTagTests(TestCase):
+    """{% picture %} URLs, relative by default and absolute on request."""
+
+    def render(self, snippet, church):
+        request = RequestFactory().get('/churches/', HTTP_HOST='bethel.example')
+        return Template('{% load images %}' + snippet).render(Context({'request': request, 'church': church}))
+
+    def test_absolute_urls_use_the_request_host(self):
+        church = Church(name='Bremen', banner_image='churches/banners/missing.jpg')
+        relative = self.render('{% picture church.banner_image alt=church.name %}', church)
+        absolute = self.render('{% picture church.banner_image absolute=True alt=church.name %}', church)
+        self.assertIn('src="/media/churches/banners/missing.jpg"', relative)
+        self.assertIn('src="http://bethel.example/media/churches/banners/missing.jpg"', absolute)
@@ -1,8 +1,7 @@
 from django.urls import path
-from django.contrib.sitemaps.views import sitemap
 
 from .views import (
-    home, smart_home, robots_txt, events, event_detail, ministries, ministry_detail, newsletter_signup, calendar_view,
+    home, smart_home, robots_txt, events, event_detail, ministries, ministry_detail, newsletter_signup, calendar_view, calendar_feed, qr_code,
     EventListView, MinistryListView, NewsListView, NewsletterSignupCreateView, event_ics,
     about, donation, shop, watch, visit, sermon, church_list, church_list_by_country, church_detail, church_detail_by_location, church_donation,
     church_home, church_events, church_event_detail, church_ministries, church_ministry_detail,
@@ -36,37 +35,22 @@ from .views import (
     analytics_dashboard,
 )
 from .views_push import push_notifications_js, push_vapid_public_key, push_subscribe, push_unsubscribe
-from .sitemaps import (
-    StaticViewSitemap,
-    ChurchSitemap,
-    ChurchLocationSitemap,
-    ChurchPagesSitemap,
-    EventSitemap,
-    ChurchEventSitemap,
-    MinistrySitemap,
-    ChurchMinistrySitemap,
-    NewsSitemap,
-)
-
-_sitemaps = {
-    'static': StaticViewSitemap,
-    'churches': ChurchSitemap,
-    'church_locations': ChurchLocationSitemap,
-    'church_pages': ChurchPagesSitemap,
-    'events': EventSitemap,
-    'church_events': ChurchEventSitemap,
-    'ministries': MinistrySitemap,
-    'church_ministries': ChurchMinistrySitemap,
-    'news': NewsSitemap,
-}
+from .views_search import search, search_api
+from .views_feed import listing_feed
+from . import views_api
+from .views_sitemap import sitemap_file, sitemap_index
+from .views_metrics import metrics
 
 urlpatterns = [
     path('robots.txt', robots_txt),
-    path('sitemap.xml', sitemap, {'sitemaps': _sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', sitemap_index, name='sitemap'),
+    path('sitemaps/<str:filename>', sitemap_file, name='sitemap_file'),
+    path('qr/<str:digest>.<str:fmt>', qr_code, name='qr_code'),
     path('', smart_home, name='smart_home'),  # New smart home that redirects to nearest church
     path('global/', home, name='home'),  # Global site moved to /global/
     path('events/', events, name='events'),
     path('events/calendar/', calendar_view, name='calendar'),
+    path('events/calendar.ics', calendar_feed, name='calendar_feed'),
     path('events/<uuid:event_id>/', event_detail, name='event_detail'),
     path('events/<uuid:event_id>/register/', event_detail, name='event_registration'),
     path('events/<uuid:event_id>/add-to-calendar/', event_ics, name='event_ics'),
@@ -89,8 +73,10 @@ urlpatterns = [
     path('church/<uuid:church_id>/sermons/', church_sermons, name='church_sermons'),
     path('church/<uuid:church_id>/watch/', church_watch, name='church_watch'),
     path('church/<uuid:church_id>/news/', church_news, name='church_news'),
+    path('church/<uuid:church_id>/search/', search, name='church_search'),
     path('church/<uuid:church_id>/about/', church_about, name='church_about'),
     path('church/<uuid:church_id>/calendar/', church_calendar, name='church_calendar'),
+    path('church/<uuid:church_id>/calendar.ics', calendar_feed, name='church_calendar_feed'),
     path('church/<uuid:church_id>/leadership/', church_leadership, name='church_leadership'),
     # Local Admin Dashboard (custom login with optional MFA)
     path('local-admin/login/', local_admin_login, name='local_admin_login'),
@@ -185,11 +171,19 @@ urlpatterns = [
     path('watch/', watch, name='watch'),
     path('visit/', visit, name='visit'),
     path('sermon/', sermon, name='sermon'),
+    path('search/', search, name='search'),
     # API endpoints
     path('api/events/', EventListView.as_view(), name='event-list'),
     path('api/ministries/', MinistryListView.as_view(), name='ministry-list'),
     path('api/news/', NewsListView.as_view(), name='news-list'),
     path('api/newsletter-signup/', NewsletterSignupCreateView.as_view(), name='newsletter-signup-api'),
+    path('api/search/', search_api, name='search_api'),
+    path('api/v1/churches/', views_api.ChurchListView.as_view(), name='api_v1_churches'),
+    path('api/v1/events/', views_api.EventListView.as_view(), name='api_v1_events'),
+    path('api/v1/ministries/', views_api.MinistryListView.as_view(), name='api_v1_ministries'),
+    path('api/v1/news/', views_api.NewsListView.as_view(), name='api_v1_news'),
+    path('api/v1/sermons/', views_api.SermonListView.as_view(), name='api_v1_sermons'),
+    path('api/feed/<slug:name>/', listing_feed, name='listing_feed'),
     path('events/highlight/<uuid:highlight_id>/', event_highlight_detail, name='event_highlight_detail'),
     path('events/<uuid:event_id>/speakers/', event_speakers, name='event_speakers'),
     path('events/highlights/', all_event_highlights, name='all_event_highlights'),
@@ -201,6 +195,7 @@ urlpatterns = [
     path('health/', health_check, name='health_check'),
     path('startup-health/', startup_health_check, name='startup_health_check'),
     path('fallback/', static_fallback, name='static_fallback'),
+    path('metrics', metrics, name='metrics'),
     path('clear-redirect-notification/', clear_redirect_notification, name='clear_redirect_notification'),
     path('api/set-my-church/', save_my_church, name='save_my_church'),
     path('api/push/notifications.js', push_notifications_js, name='push_notifications_js'),
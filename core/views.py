@@ -11,14 +11,13 @@ from .models import Event, Ministry, News, NewsletterSignup, Hero, Sermon, Churc
 from .serializers import EventSerializer, MinistrySerializer, NewsSerializer, NewsletterSignupSerializer
 from datetime import datetime, timedelta, time
 from django.utils import timezone
-from calendar import monthcalendar, month_name
+from calendar import month_name
 import calendar
 import pytz
 from django.db import models
-from django.db.models import Q
 import requests
 import json
-from django.views.decorators.http import require_POST
+from django.views.decorators.http import require_GET, require_POST
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import admin
 from django import forms as django_forms
@@ -39,7 +38,6 @@ import qrcode
 import io
 import base64
 from django_otp.plugins.otp_totp.models import TOTPDevice
-from django.core.mail import send_mail
 import math
 from .event_queries import upcoming_events_cutoff
 
@@ -50,12 +48,11 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.apps import apps
 import time as time_module
-from django.db import connection
+from django.db import connection, transaction
 from django.db.utils import OperationalError
 import threading
 import queue
-from django.db.models import Count, Avg, Q
-from django.db.models.functions import TruncDate, TruncHour
+from django.db.models import Sum
 from collections import defaultdict
 import json
 
@@ -71,6 +68,17 @@ from .location_utils import (
     churches_for_location_json,
     needs_browser_location,
 )
+from .church_registry import get_church_registry
+from .calendar_utils import month_calendar
+from .nav_data import nav_context
+from .page_cache import cache_public_page, nearest_church_vary
+from .conditional import church_scope, conditional_page, object_church_scope
+from . import listings, search
+from .pagination import DEFAULT_PAGE_SIZE
+from .qr_codes import event_qr_url
+from .outbox import enqueue_email
+from .db_health import get_monitor
+from .metrics import query_budget
 
 def robots_txt(request):
     """Serve robots.txt allowing crawlers and pointing to sitemap (used in core/urls.py for all deployments)."""
@@ -207,6 +215,7 @@ def smart_home(request):
         # Fallback to global home if anything goes wrong
         return redirect('home')
 
+@cache_public_page
 def home(request):
     # Check if user wants to go to global site (by presence of the parameter)
     go_global = 'global' in request.GET
@@ -312,13 +321,9 @@ def home(request):
             print(f"DEBUG: Error finding nearest church: {e}")
     
     try:
-        all_events = Event.objects.filter(is_public=True)[:10]
-        all_ministries = Ministry.objects.filter(is_public=True)[:10]
         recent_testimonies = Testimony.objects.filter(is_approved=True).order_by('-created_at')[:3]
     except Exception as e:
         print(f"DEBUG: Error getting additional data: {e}")
-        all_events = []
-        all_ministries = []
         recent_testimonies = []
     
     # SEO: og:image from hero or first hero media
@@ -338,8 +343,6 @@ def home(request):
         'ministries': public_ministries,
         'sermons': latest_sermons,
         'news': latest_news,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'user_country': country,
         'user_city': city,
         'nearest_church': nearest_church,
@@ -353,14 +356,12 @@ def home(request):
 
 def events(request):
     # Show all public events (no approval required)
-    all_events = Event.objects.filter(is_public=True).prefetch_related('hero_media')
+    event_list = Event.objects.filter(is_public=True).prefetch_related('hero_media')
     featured_events = Event.objects.filter(is_public=True, is_featured=True).prefetch_related('hero_media')[:3]
-    all_ministries = Ministry.objects.filter(is_public=True)
     past_highlights = EventHighlight.objects.filter(is_public=True).order_by('-year')[:6]
     context = {
-        'all_events': all_events,
+        'event_list': event_list,
         'featured_events': featured_events,
-        'all_ministries': all_ministries,
         'past_highlights': past_highlights,
         'meta_description': 'Upcoming events at Bethel Prayer Ministry International. Find church events, conferences, and gatherings near you.',
         'og_title': 'Events – Bethel Prayer Ministry International',
@@ -380,11 +381,33 @@ def _big_event_hero_context(event):
     }
 
 
+def _queue_registration_emails(event, registration):
+    """Notify the church of a registration and confirm it to the registrant (see core.outbox)."""
+    enqueue_email(
+        f'New Event Registration: {event.title}',
+        f'New registration for {event.title}:\n\nName: {registration.first_name} {registration.last_name}\nEmail: {registration.email}\nPhone: {registration.phone}',
+        [event.church.email],
+        church=event.church,
+        reply_to=[registration.email],
+    )
+    enqueue_email(
+        f'Thank you for registering for {event.title}',
+        (
+            f"Dear {registration.first_name},\n\nThank you for registering for {event.title} at {event.church.name}. We have received your registration.\n\n"
+            f"Event Details:\nTitle: {event.title}\nDate: {event.start_date.strftime('%Y-%m-%d %H:%M')}\nLocation: {event.location or event.address}\n\n"
+            f"If you have any questions, reply to this email.\n\nBlessings,\n{event.church.name}"
+        ),
+        [registration.email],
+        church=event.church,
+        reply_to=[event.church.email],
+    )
+
+
+@conditional_page(object_church_scope('Event', 'event_id'))
+@cache_public_page
 def event_detail(request, event_id):
     # Get individual event detail
     event = get_object_or_404(Event.objects.prefetch_related('hero_media'), id=event_id)
-    all_events = Event.objects.filter(is_public=True)  # For navigation dropdown
-    all_ministries = Ministry.objects.filter(is_public=True)  # For navigation dropdown
     
     # Handle registration form
     registration_success = False
@@ -394,28 +417,10 @@ def event_detail(request, event_id):
             registration = form.save(commit=False)
             registration.event = event
             registration.church = event.church
-            registration.save()
-            # Send notification email to church
-            church_email = event.church.email or 'CHURCH_EMAIL_HERE'  # Set this to your church email
-            send_mail(
-                subject=f'New Event Registration: {event.title}',
-                message=f'New registration for {event.title}:\n\nName: {registration.first_name} {registration.last_name}\nEmail: {registration.email}\nPhone: {registration.phone}',
-                from_email=None,  # Uses DEFAULT_FROM_EMAIL
-                recipient_list=[church_email],
-                fail_silently=True,
-            )
-            # Send confirmation email to user
-            send_mail(
-                subject=f'Thank you for registering for {event.title}',
-                message=(
-                    f"Dear {registration.first_name},\n\nThank you for registering for {event.title} at {event.church.name}. We have received your registration.\n\n"
-                    f"Event Details:\nTitle: {event.title}\nDate: {event.start_date.strftime('%Y-%m-%d %H:%M')}\nLocation: {event.location or event.address}\n\n"
-                    f"If you have any questions, reply to this email.\n\nBlessings,\n{event.church.name}"
-                ),
-                from_email=None,  # Uses DEFAULT_FROM_EMAIL
-                recipient_list=[registration.email],
-                fail_silently=True,
-            )
+            # Registration and its emails are committed together; send_outbox delivers them
+            with transaction.atomic():
+                registration.save()
+                _queue_registration_emails(event, registration)
             registration_success = True
             form = EventRegistrationForm()  # Reset form
     else:
@@ -432,17 +437,8 @@ def event_detail(request, event_id):
     if event.requires_registration:
         registration_count = event.registrations.filter(payment_status='paid').count()
     
-    # Generate QR code if enabled
-    qr_code_base64 = None
-    if getattr(event, 'show_qr_code', False):
-        qr_url = request.build_absolute_uri()
-        qr = qrcode.QRCode(box_size=8, border=2)
-        qr.add_data(qr_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="#1e3a8a", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        qr_code_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    # QR code (if enabled): stored once per canonical page URL, served from a long-cached URL
+    qr_code_url = event_qr_url(request.path) if getattr(event, 'show_qr_code', False) else None
     
     # SEO for event detail
     meta_desc = (event.description or event.title or '')[:160]
@@ -457,13 +453,11 @@ def event_detail(request, event_id):
         og_image = request.build_absolute_uri(event.banner_image.url)
     context = {
         'event': event,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'registration_form': form,
         'registration_success': registration_success,
         'past_highlights': past_highlights,
         'registration_count': registration_count,
-        'qr_code_base64': qr_code_base64,
+        'qr_code_url': qr_code_url,
         'meta_description': meta_desc[:160],
         'og_title': f"{event.title} – Bethel Events",
         'og_description': meta_desc[:160],
@@ -490,12 +484,10 @@ def newsletter_signup(request):
 
 def ministries(request):
     # Get all public ministries for the ministries page
-    all_ministries = Ministry.objects.filter(is_public=True)
-    all_events = Event.objects.filter(is_public=True)  # For navigation dropdown
+    ministry_list = Ministry.objects.filter(is_public=True)
     
     context = {
-        'all_ministries': all_ministries,
-        'all_events': all_events,
+        'ministry_list': ministry_list,
         'meta_description': 'Explore ministries at Bethel Prayer Ministry International. Get involved in worship, youth, outreach, and more.',
         'og_title': 'Ministries – Bethel Prayer Ministry International',
     }
@@ -503,8 +495,6 @@ def ministries(request):
 
 def ministry_detail(request, ministry_id):
     ministry = get_object_or_404(Ministry, id=ministry_id)
-    all_ministries = Ministry.objects.filter(is_public=True)  # For navigation dropdown
-    all_events = Event.objects.filter(is_public=True)  # For navigation dropdown
     join_success = False
     if request.method == 'POST':
         join_success = True
@@ -516,8 +506,6 @@ def ministry_detail(request, ministry_id):
         og_image = request.build_absolute_uri(ministry.image.url)
     context = {
         'ministry': ministry,
-        'all_ministries': all_ministries,
-        'all_events': all_events,
         'join_success': join_success,
         'meta_description': meta_desc[:160],
         'og_title': f"{ministry.name} – Bethel Ministries",
@@ -527,22 +515,15 @@ def ministry_detail(request, ministry_id):
     return render(request, 'core/ministry_detail.html', context)
 
 def about(request):
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
     about_page = None
     if AboutPage.objects.exists():
         about_page = AboutPage.objects.first()
     context = {
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'about_page': about_page,
     }
     return render(request, 'core/about.html', context)
 
 def donation(request):
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
-    
     # Get churches that have active donation methods
     churches_with_donations = Church.objects.filter(
         is_approved=True, 
@@ -551,21 +532,12 @@ def donation(request):
     ).distinct().prefetch_related('donationmethod_set')
     
     context = {
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'churches_with_donations': churches_with_donations,
     }
     return render(request, 'core/donation.html', context)
 
 def shop(request):
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
-    
-    context = {
-        'all_events': all_events,
-        'all_ministries': all_ministries,
-    }
-    return render(request, 'core/shop.html', context)
+    return render(request, 'core/shop.html')
 
 def watch(request):
     """Watch page - displays sermons and live streams"""
@@ -574,40 +546,25 @@ def watch(request):
     preacher = request.GET.get('preacher', '').strip()
     date_filter = request.GET.get('date', '').strip()
     
-    # Start with all public sermons
-    sermons = Sermon.objects.filter(is_public=True)
+    # Public sermons, filtered by preacher and date (invalid dates are ignored)
+    all_sermons = listings.sermons(preacher=preacher, date=listings.parse_date(date_filter))
     
-    # Apply keyword filter (search in title and description)
+    # Keyword matches (full-text, at most search.MAX_RESULTS) keep relevance order;
+    # otherwise one keyset page, newest first
+    search_truncated = False
     if keyword:
-        sermons = sermons.filter(
-            models.Q(title__icontains=keyword) |
-            models.Q(description__icontains=keyword) |
-            models.Q(scripture_reference__icontains=keyword)
-        )
-    
-    # Apply preacher filter
-    if preacher:
-        sermons = sermons.filter(preacher__icontains=preacher)
-    
-    # Apply date filter
-    if date_filter:
-        try:
-            # Convert date string to date object
-            from datetime import datetime
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            sermons = sermons.filter(date=filter_date)
-        except ValueError:
-            # If date format is invalid, ignore the filter
-            pass
-    
-    # Order by date (newest first)
-    sermons = sermons.order_by('-date')
+        all_sermons, search_truncated = search.filter_queryset(all_sermons, keyword)
+        sermons = all_sermons
+        listing = None
+    else:
+        sermons = listings.page_for_request(request, all_sermons, listings.SERMON_ORDERING)
+        listing = listings.listing_context(request, 'sermons', sermons, card='watch', preacher=preacher, date=date_filter)
     
     # Get featured sermons (for hero section)
-    featured_sermons = sermons.filter(is_featured=True)[:3]
+    featured_sermons = all_sermons.filter(is_featured=True)[:3]
     
     # Get recent sermons
-    recent_sermons = sermons[:6]
+    recent_sermons = all_sermons[:6]
     
     # Get all preachers for filter dropdown
     preachers = Sermon.objects.filter(is_public=True).values_list('preacher', flat=True).distinct()
@@ -641,6 +598,8 @@ def watch(request):
         'keyword': keyword,
         'preacher': preacher,
         'date_filter': date_filter,
+        'listing': listing,
+        'search_truncated': search_truncated,
     }
     return render(request, 'core/watch.html', context)
 
@@ -654,11 +613,7 @@ def church_watch(request, church_id):
 
     sermons = Sermon.objects.filter(church=church, is_public=True)
     if keyword:
-        sermons = sermons.filter(
-            models.Q(title__icontains=keyword) |
-            models.Q(description__icontains=keyword) |
-            models.Q(scripture_reference__icontains=keyword)
-        )
+        sermons, _ = search.filter_queryset(sermons, keyword, church_id=church.id)
     if preacher:
         sermons = sermons.filter(preacher__icontains=preacher)
     if date_filter:
@@ -668,7 +623,8 @@ def church_watch(request, church_id):
             sermons = sermons.filter(date=filter_date)
         except ValueError:
             pass
-    sermons = sermons.order_by('-date')
+    if not keyword:
+        sermons = sermons.order_by('-date')
     featured_sermons = sermons.filter(is_featured=True)[:3]
     preachers = Sermon.objects.filter(church=church, is_public=True).values_list('preacher', flat=True).distinct()
 
@@ -682,8 +638,6 @@ def church_watch(request, church_id):
         else "No upcoming services"
     )
 
-    all_events = Event.objects.filter(church=church, is_public=True)
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
 
     context = {
         'church': church,
@@ -698,89 +652,64 @@ def church_watch(request, church_id):
         'keyword': keyword,
         'preacher': preacher,
         'date_filter': date_filter,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'is_church_site': True,
     }
     return render(request, 'core/church_watch.html', context)
 
 
 def visit(request):
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
-    
-    context = {
-        'all_events': all_events,
-        'all_ministries': all_ministries,
-    }
-    return render(request, 'core/visit.html', context)
+    return render(request, 'core/visit.html')
 
 def sermon(request):
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
-    
     # Get filter parameters
     keyword = request.GET.get('keyword', '').strip()
     preacher = request.GET.get('preacher', '').strip()
     date_filter = request.GET.get('date', '').strip()
     
-    # Start with all public sermons
-    sermons = Sermon.objects.filter(is_public=True)
+    # Public sermons, filtered by preacher and date (invalid dates are ignored)
+    all_sermons = listings.sermons(preacher=preacher, date=listings.parse_date(date_filter))
     
-    # Apply keyword filter (search in title and description)
+    # Keyword matches (full-text, at most search.MAX_RESULTS) keep relevance order;
+    # otherwise one keyset page, newest first
+    search_truncated = False
     if keyword:
-        sermons = sermons.filter(
-            models.Q(title__icontains=keyword) |
-            models.Q(description__icontains=keyword) |
-            models.Q(scripture_reference__icontains=keyword)
-        )
-    
-    # Apply preacher filter
-    if preacher:
-        sermons = sermons.filter(preacher__icontains=preacher)
-    
-    # Apply date filter
-    if date_filter:
-        try:
-            # Convert date string to date object
-            from datetime import datetime
-            filter_date = datetime.strptime(date_filter, '%Y-%m-%d').date()
-            sermons = sermons.filter(date=filter_date)
-        except ValueError:
-            # If date format is invalid, ignore the filter
-            pass
-    
-    # Order by date (newest first)
-    sermons = sermons.order_by('-date')
+        all_sermons, search_truncated = search.filter_queryset(all_sermons, keyword)
+        sermons = all_sermons
+        listing = None
+    else:
+        sermons = listings.page_for_request(request, all_sermons, listings.SERMON_ORDERING)
+        listing = listings.listing_context(request, 'sermons', sermons, preacher=preacher, date=date_filter)
     
     context = {
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'sermons': sermons,
         'keyword': keyword,  # Pass back to template to preserve form values
         'preacher': preacher,
         'date_filter': date_filter,
         'meta_description': 'Watch and listen to sermons from Bethel Prayer Ministry International. Browse by preacher, date, and topic.',
         'og_title': 'Sermons – Bethel Prayer Ministry International',
+        'listing': listing,
+        'search_truncated': search_truncated,
     }
     return render(request, 'core/sermon.html', context)
 
+# Legacy list endpoints, kept for existing clients: use /api/v1/ (core.views_api)
 class EventListView(generics.ListAPIView):
-    queryset = Event.objects.all()
+    queryset = Event.objects.filter(is_public=True, church__is_approved=True, church__is_active=True).order_by('start_date', 'id')
     serializer_class = EventSerializer
 
 class MinistryListView(generics.ListAPIView):
-    queryset = Ministry.objects.all()
+    queryset = Ministry.objects.filter(is_public=True, is_active=True, church__is_approved=True, church__is_active=True).order_by('name', 'id')
     serializer_class = MinistrySerializer
 
 class NewsListView(generics.ListAPIView):
-    queryset = News.objects.all()
+    queryset = News.objects.filter(is_public=True, church__is_approved=True, church__is_active=True).order_by('-date', '-created_at', 'id')
     serializer_class = NewsSerializer
 
 class NewsletterSignupCreateView(generics.CreateAPIView):
     queryset = NewsletterSignup.objects.all()
     serializer_class = NewsletterSignupSerializer
 
+@query_budget(10)
 def calendar_view(request):
     # Get current year and month
     now = timezone.now()
@@ -794,42 +723,18 @@ def calendar_view(request):
         year = now.year
         month = now.month
     
-    # Get all public events for the current month
-    events = Event.objects.filter(
-        is_public=True,
-        start_date__year=year,
-        start_date__month=month
-    ).order_by('start_date')
-    
-    # Create calendar data
-    cal = monthcalendar(year, month)
+    # Month grid with all public events overlapping the month (one query, cached)
+    calendar_data = month_calendar(year, month)
     
     # Get month name
     month_name_str = calendar.month_name[month]
     
-    # Prepare calendar data with events
-    calendar_data = []
-    for week in cal:
-        week_data = []
-        for day in week:
-            if day == 0:
-                week_data.append({'day': '', 'events': []})
-            else:
-                day_events = events.filter(start_date__day=day)
-                week_data.append({
-                    'day': day,
-                    'events': day_events
-                })
-        calendar_data.append(week_data)
-    
     # Navigation data
     prev_month = month - 1 if month > 1 else 12
     prev_year = year if month > 1 else year - 1
     next_month = month + 1 if month < 12 else 1
     next_year = year if month < 12 else year + 1
     
-    all_events = Event.objects.filter(is_public=True)  # For navigation dropdown
-    all_ministries = Ministry.objects.filter(is_public=True)  # For navigation dropdown
     
     context = {
         'calendar_data': calendar_data,
@@ -840,12 +745,11 @@ def calendar_view(request):
         'prev_year': prev_year,
         'next_month': next_month,
         'next_year': next_year,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'now': now,  # Pass current date for template comparison
     }
     return render(request, 'core/calendar.html', context)
 
+@conditional_page(object_church_scope('Event', 'event_id'), anonymous_only=False)
 def event_ics(request, event_id):
     from .calendar_utils import build_event_ics
 
@@ -856,6 +760,63 @@ def event_ics(request, event_id):
     response['Content-Disposition'] = f'attachment; filename="{safe_name or "event"}.ics"'
     return response
 
+def calendar_feed(request, church_id=None):
+    """Subscribable iCalendar feed (webcal://) of one church's public events, or of all churches'."""
+    from django.http import StreamingHttpResponse
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from django.utils.http import http_date, quote_etag
+
+    from .calendar_utils import calendar_feed as build_calendar_feed
+
+    if church_id:
+        church = get_church_registry().get(church_id)
+        if church is None:
+            raise Http404('Church not found')
+        name = f'{church.name} Events'
+    else:
+        name = 'Bethel Prayer Ministry International Events'
+    version, built_at, body = build_calendar_feed(church_id, name)
+    etag = quote_etag(f'{church_id or "all"}-{version}')
+    response = get_conditional_response(request, etag=etag, last_modified=built_at)
+    if response is None:
+        content_type = 'text/calendar; charset=utf-8'
+        if isinstance(body, bytes):
+            response = HttpResponse(body, content_type=content_type)
+        else:
+            response = StreamingHttpResponse(body, content_type=content_type)
+        response['Content-Disposition'] = 'inline; filename="calendar.ics"'
+    elif not isinstance(body, bytes):
+        body.close()
+    response['ETag'] = etag
+    if built_at:
+        response['Last-Modified'] = http_date(built_at)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'CALENDAR_FEED_MAX_AGE', 900))
+    return response
+
+
+@require_GET
+def qr_code(request, digest, fmt):
+    """/qr/<digest>.<svg|png>: a stored QR code; the name is content-addressed, so it is cached for a year."""
+    from django.core.files.storage import default_storage
+    from django.utils.cache import get_conditional_response, patch_cache_control
+    from django.utils.http import quote_etag
+
+    from .qr_codes import CONTENT_TYPES, DIGEST_RE, storage_name
+
+    if fmt not in CONTENT_TYPES or not DIGEST_RE.match(digest):
+        raise Http404('No such QR code')
+    etag = quote_etag(digest)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            with default_storage.open(storage_name(digest, fmt), 'rb') as f:
+                response = HttpResponse(f.read(), content_type=CONTENT_TYPES[fmt])
+        except (FileNotFoundError, OSError):
+            raise Http404('No such QR code')
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
+
 def haversine_distance(lat1, lon1, lat2, lon2):
     """Calculate the great-circle distance between two points on the Earth (in km)"""
     R = 6371  # Earth radius in kilometers
@@ -874,40 +835,38 @@ def church_list(request):
     country_filter = request.GET.get('country', '')
     city_filter = request.GET.get('city', '')
     
-    # Start with all approved churches
-    churches = Church.objects.filter(is_approved=True, is_active=True)
-    
+    # Start with all approved churches (process-wide registry, no query)
+    registry = get_church_registry()
+    churches = registry.churches
+
+    def _contains(value, needle):
+        return needle.lower() in (value or '').lower()
+
     # Apply search filter
     if search_query:
-        churches = churches.filter(
-            models.Q(name__icontains=search_query) |
-            models.Q(city__icontains=search_query) |
-            models.Q(country__icontains=search_query) |
-            models.Q(pastor_name__icontains=search_query)
-        )
+        churches = [
+            c for c in churches
+            if _contains(c.name, search_query) or _contains(c.city, search_query)
+            or _contains(c.country, search_query) or _contains(c.pastor_name, search_query)
+        ]
     
     # Apply country filter
     if country_filter:
-        churches = churches.filter(country__icontains=country_filter)
+        churches = [c for c in churches if _contains(c.country, country_filter)]
     
     # Apply city filter
     if city_filter:
-        churches = churches.filter(city__icontains=city_filter)
+        churches = [c for c in churches if _contains(c.city, city_filter)]
     
     user_country, user_city, user_lat, user_lon = get_user_location(request)
 
     church_distances_dict = {}
     if user_lat is not None and user_lon is not None:
-        church_distances = []
-        for church in churches:
-            if church.latitude and church.longitude:
-                dist = haversine_distance(user_lat, user_lon, church.latitude, church.longitude)
-                church_distances.append((dist, church))
-                church_distances_dict[church.id] = round(dist, 1)
-            else:
-                church_distances.append((float('inf'), church))
-        church_distances.sort(key=lambda x: x[0])
-        churches = [c for d, c in church_distances]
+        distances = registry.distance_map(user_lat, user_lon)
+        church_distances_dict = {
+            c.id: round(distances[c.id], 1) for c in churches if c.id in distances
+        }
+        churches = sorted(churches, key=lambda c: distances.get(c.id, float('inf')))
     # Otherwise, fallback to country/city match
     elif user_country:
         def country_city_score(church):
@@ -921,21 +880,8 @@ def church_list(request):
     # Otherwise, keep default ordering
     
     # Get unique countries and cities for filter dropdowns
-    countries = Church.objects.filter(is_approved=True, is_active=True).values_list('country', flat=True).distinct().order_by('country')
-    cities = Church.objects.filter(is_approved=True, is_active=True).values_list('city', flat=True).distinct().order_by('city')
-    
-    # Attach absolute image URLs so card images load reliably (relative /media/ can fail depending on host/proxy)
-    if not isinstance(churches, list):
-        churches = list(churches)
-    for church in churches:
-        logo_url = church.get_logo_url()
-        church.logo_url_absolute = request.build_absolute_uri(logo_url) if logo_url else ''
-        banner_url = church.get_banner_url()
-        church.banner_url_absolute = request.build_absolute_uri(banner_url) if banner_url else ''
-    
-    # Navigation data
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
+    countries = sorted({c.country for c in registry.churches})
+    cities = sorted({c.city for c in registry.churches})
     
     context = {
         'churches': churches,
@@ -944,12 +890,10 @@ def church_list(request):
         'city_filter': city_filter,
         'countries': countries,
         'cities': cities,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'church_distances': church_distances_dict,
         'show_logout_success': request.GET.get('logged_out') == '1',
         'choose_church': request.GET.get('choose_church') == '1',
-        'all_churches_for_picker': list(Church.objects.filter(is_approved=True, is_active=True).order_by('country', 'city')),
+        'all_churches_for_picker': sorted(registry.churches, key=lambda c: (c.country, c.city)),
     }
     return render(request, 'core/church_list.html', context)
 
@@ -993,15 +937,7 @@ def church_list_by_country(request, country_slug):
     countries = Church.objects.filter(is_approved=True, is_active=True).values_list('country', flat=True).distinct().order_by('country')
     cities = Church.objects.filter(is_approved=True, is_active=True).values_list('city', flat=True).distinct().order_by('city')
 
-    for church in churches:
-        logo_url = church.get_logo_url()
-        church.logo_url_absolute = request.build_absolute_uri(logo_url) if logo_url else ''
-        banner_url = church.get_banner_url()
-        church.banner_url_absolute = request.build_absolute_uri(banner_url) if banner_url else ''
-
     display_country = try_names[0] if try_names else country_name
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
 
     context = {
         'churches': churches,
@@ -1017,6 +953,7 @@ def church_list_by_country(request, country_slug):
     return render(request, 'core/church_list.html', context)
 
 
+@query_budget(25)
 def church_detail_by_location(request, country_slug, city_slug):
     """
     Resolve /churches/<country_slug>/<city_slug>/ (e.g. /churches/ghana/accra/,
@@ -1080,13 +1017,7 @@ def church_detail_by_location(request, country_slug, city_slug):
         is_public=True,
         end_date__gte=upcoming_events_cutoff(),
     ).prefetch_related('hero_media').order_by('start_date')[:3]
-    all_events = Event.objects.filter(
-        church=church,
-        is_public=True,
-        end_date__gte=upcoming_events_cutoff(),
-    )
     ministries = Ministry.objects.filter(church=church, is_active=True)[:6]
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
     news = News.objects.filter(church=church, is_public=True)[:3]
     sermons = Sermon.objects.filter(church=church, is_featured=True, is_public=True)[:3]
     country, city, user_lat, user_lon = get_user_location(request)
@@ -1104,11 +1035,10 @@ def church_detail_by_location(request, country_slug, city_slug):
         'hero': hero,
         'heroes': heroes,
         'events': events,
-        'all_events': all_events,
         'ministries': ministries,
-        'all_ministries': all_ministries,
         'news': news,
         'sermons': sermons,
+        **nav_context(church.id),  # URL has no church_id for the context processor
         'is_church_site': True,
         'user_country': country,
         'user_city': city,
@@ -1137,9 +1067,6 @@ def church_detail(request, church_id):
     news = News.objects.filter(church=church, is_public=True).order_by('-date')[:3]
     sermons = Sermon.objects.filter(church=church, is_public=True).order_by('-date')[:3]
     
-    # Navigation data
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
 
     # SEO: meta description and Open Graph (crawlable, indexable)
     location = f"{church.city}, {church.country}"
@@ -1160,8 +1087,7 @@ def church_detail(request, church_id):
         'ministries': ministries,
         'news': news,
         'sermons': sermons,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
+        **nav_context(),  # global nav on this page, not the church's
         'meta_description': meta_desc,
         'og_title': f"{church.name} - Bethel Church",
         'og_description': meta_desc,
@@ -1176,19 +1102,18 @@ def church_donation(request, church_id):
     # Get active donation methods for this church
     donation_methods = DonationMethod.objects.filter(church=church, is_active=True)
     
-    # Navigation data
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
     
     context = {
         'church': church,
         'donation_methods': donation_methods,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
+        **nav_context(),  # global nav on this page, not the church's
     }
     return render(request, 'core/church_donation.html', context)
 
 # Church-specific website views (mirror main site functionality)
+@conditional_page(church_scope, vary=nearest_church_vary)
+@cache_public_page(vary=nearest_church_vary)
+@query_budget(25)
 def church_home(request, church_id):
     """Church-specific home page with all functionality"""
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
@@ -1203,13 +1128,7 @@ def church_home(request, church_id):
         is_public=True,
         end_date__gte=upcoming_events_cutoff(),
     ).prefetch_related('hero_media').order_by('start_date')[:3]
-    all_events = Event.objects.filter(
-        church=church,
-        is_public=True,
-        end_date__gte=upcoming_events_cutoff(),
-    )
     ministries = Ministry.objects.filter(church=church, is_active=True)[:6]
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
     news = News.objects.filter(church=church, is_public=True)[:3]
     sermons = Sermon.objects.filter(church=church, is_featured=True, is_public=True)[:3]
     
@@ -1232,9 +1151,7 @@ def church_home(request, church_id):
         'hero': hero,
         'heroes': heroes,
         'events': events,
-        'all_events': all_events,
         'ministries': ministries,
-        'all_ministries': all_ministries,
         'news': news,
         'sermons': sermons,
         'is_church_site': True,  # Flag to indicate this is a church-specific page
@@ -1250,12 +1167,12 @@ def church_home(request, church_id):
     }
     return render(request, 'core/church_home.html', context)
 
+@cache_public_page
 def church_events(request, church_id):
     """Church-specific events page"""
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
-    all_events = Event.objects.filter(church=church, is_public=True).prefetch_related('hero_media')
+    event_list = Event.objects.filter(church=church, is_public=True).prefetch_related('hero_media')
     featured_events = Event.objects.filter(church=church, is_featured=True, is_public=True).prefetch_related('hero_media')[:3]
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
     
     # Get user location for location detection banner
     country, city, user_lat, user_lon = get_user_location(request)
@@ -1268,9 +1185,8 @@ def church_events(request, church_id):
     
     context = {
         'church': church,
-        'all_events': all_events,
+        'event_list': event_list,
         'featured_events': featured_events,
-        'all_ministries': all_ministries,
         'is_church_site': True,
         'user_country': country,
         'user_city': city,
@@ -1283,8 +1199,6 @@ def church_event_detail(request, church_id, event_id):
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
     event = get_object_or_404(Event.objects.prefetch_related('hero_media'), id=event_id, church=church, is_public=True)
     
-    all_events = Event.objects.filter(church=church, is_public=True)
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
     
     # Handle registration form
     registration_success = False
@@ -1294,28 +1208,10 @@ def church_event_detail(request, church_id, event_id):
             registration = form.save(commit=False)
             registration.event = event
             registration.church = church
-            registration.save()
-            # Send notification email to church
-            church_email = event.church.email or 'CHURCH_EMAIL_HERE'  # Set this to your church email
-            send_mail(
-                subject=f'New Event Registration: {event.title}',
-                message=f'New registration for {event.title}:\n\nName: {registration.first_name} {registration.last_name}\nEmail: {registration.email}\nPhone: {registration.phone}',
-                from_email=None,  # Uses DEFAULT_FROM_EMAIL
-                recipient_list=[church_email],
-                fail_silently=True,
-            )
-            # Send confirmation email to user
-            send_mail(
-                subject=f'Thank you for registering for {event.title}',
-                message=(
-                    f"Dear {registration.first_name},\n\nThank you for registering for {event.title} at {event.church.name}. We have received your registration.\n\n"
-                    f"Event Details:\nTitle: {event.title}\nDate: {event.start_date.strftime('%Y-%m-%d %H:%M')}\nLocation: {event.location or event.address}\n\n"
-                    f"If you have any questions, reply to this email.\n\nBlessings,\n{event.church.name}"
-                ),
-                from_email=None,  # Uses DEFAULT_FROM_EMAIL
-                recipient_list=[registration.email],
-                fail_silently=True,
-            )
+            # Registration and its emails are committed together; send_outbox delivers them
+            with transaction.atomic():
+                registration.save()
+                _queue_registration_emails(event, registration)
             registration_success = True
             form = EventRegistrationForm()  # Reset form
     else:
@@ -1332,16 +1228,8 @@ def church_event_detail(request, church_id, event_id):
     if event.requires_registration:
         registration_count = event.registrations.filter(payment_status='paid').count()
     
-    qr_code_base64 = None
-    if getattr(event, 'show_qr_code', False):
-        qr_url = request.build_absolute_uri()
-        qr = qrcode.QRCode(box_size=8, border=2)
-        qr.add_data(qr_url)
-        qr.make(fit=True)
-        img = qr.make_image(fill_color="#1e3a8a", back_color="white")
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        qr_code_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    # QR code (if enabled): stored once per canonical page URL, served from a long-cached URL
+    qr_code_url = event_qr_url(request.path) if getattr(event, 'show_qr_code', False) else None
     
     # Get user location for location detection banner
     country, city, user_lat, user_lon = get_user_location(request)
@@ -1355,14 +1243,12 @@ def church_event_detail(request, church_id, event_id):
     context = {
         'church': church,
         'event': event,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'is_church_site': True,
         'registration_form': form,
         'registration_success': registration_success,
         'past_highlights': past_highlights,
         'registration_count': registration_count,
-        'qr_code_base64': qr_code_base64,
+        'qr_code_url': qr_code_url,
         'user_country': country,
         'user_city': city,
         'nearest_church': nearest_church,
@@ -1381,13 +1267,10 @@ def church_ministries(request, church_id):
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
     
     ministries = Ministry.objects.filter(church=church, is_active=True)
-    all_events = Event.objects.filter(church=church, is_public=True)
     
     context = {
         'church': church,
         'ministries': ministries,
-        'all_ministries': ministries,
-        'all_events': all_events,
         'is_church_site': True,
     }
     return render(request, 'core/church_ministries.html', context)
@@ -1410,20 +1293,17 @@ def church_ministry_detail(request, church_id, ministry_id):
     else:
         form = MinistryJoinRequestForm()
 
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
-    all_events = Event.objects.filter(church=church, is_public=True)
 
     context = {
         'church': church,
         'ministry': ministry,
-        'all_ministries': all_ministries,
-        'all_events': all_events,
         'is_church_site': True,
         'join_form': form,
         'join_success': join_success,
     }
     return render(request, 'core/church_ministry_detail.html', context)
 
+@cache_public_page
 def church_sermons(request, church_id):
     """Church-specific sermons page"""
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
@@ -1433,58 +1313,49 @@ def church_sermons(request, church_id):
     preacher = request.GET.get('preacher', '')
     date_filter = request.GET.get('date', '')
     
-    # Start with all sermons for this church
-    sermons = Sermon.objects.filter(church=church, is_public=True)
+    # This church's public sermons, filtered by preacher and date
+    sermons = listings.sermons(church.id, preacher, listings.parse_date(date_filter))
     
-    # Apply filters
+    # Keyword matches keep relevance order; otherwise one keyset page, newest first
+    listing = None
+    search_truncated = False
     if keyword:
-        sermons = sermons.filter(
-            Q(title__icontains=keyword) | 
-            Q(description__icontains=keyword) |
-            Q(preacher__icontains=keyword)
+        sermons, search_truncated = search.filter_queryset(sermons, keyword, church_id=church.id)
+    else:
+        sermons = listings.page_for_request(request, sermons, listings.SERMON_ORDERING)
+        listing = listings.listing_context(
+            request, 'sermons', sermons, church=str(church.id), preacher=preacher, date=date_filter,
         )
     
-    if preacher:
-        sermons = sermons.filter(preacher__icontains=preacher)
-    
-    if date_filter:
-        sermons = sermons.filter(date=date_filter)
-    
-    # Order by date (newest first)
-    sermons = sermons.order_by('-date')
-    
-    all_events = Event.objects.filter(church=church, is_public=True)
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
     
     context = {
         'church': church,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'sermons': sermons,
         'keyword': keyword,
         'preacher': preacher,
         'date_filter': date_filter,
         'is_church_site': True,
+        'listing': listing,
+        'search_truncated': search_truncated,
     }
     return render(request, 'core/church_sermons.html', context)
 
+@cache_public_page
 def church_news(request, church_id):
     """Church-specific news page"""
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
     
-    all_events = Event.objects.filter(church=church, is_public=True)
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
-    news = News.objects.filter(church=church, is_public=True).order_by('-date')
+    news = listings.page_for_request(request, listings.news(church.id), listings.NEWS_ORDERING)
     
     context = {
         'church': church,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'news': news,
         'is_church_site': True,
+        'listing': listings.listing_context(request, 'news', news, church=str(church.id)),
     }
     return render(request, 'core/church_news.html', context)
 
+@cache_public_page
 def church_about(request, church_id):
     """Church-specific about page"""
     church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True)
@@ -1496,15 +1367,11 @@ def church_about(request, church_id):
     from .models import LocalLeadershipPage
     leadership_page, _ = LocalLeadershipPage.objects.get_or_create(church=church)
     
-    all_events = Event.objects.filter(church=church, is_public=True)
-    all_ministries = Ministry.objects.filter(church=church, is_active=True)
     
     context = {
         'church': church,
         'about_page': about_page,
         'leadership_page': leadership_page,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'is_church_site': True,
     }
     return render(request, 'core/church_about.html', context)
@@ -1525,35 +1392,12 @@ def church_calendar(request, church_id):
         year = now.year
         month = now.month
     
-    # Get church-specific events for the current month
-    events = Event.objects.filter(
-        church=church,
-        is_public=True,
-        start_date__year=year,
-        start_date__month=month
-    ).order_by('start_date')
-    
-    # Create calendar data
-    cal = monthcalendar(year, month)
+    # Month grid with this church's events overlapping the month (one query, cached)
+    calendar_data = month_calendar(year, month, church_id=church.id)
     
     # Get month name
     month_name_str = calendar.month_name[month]
     
-    # Prepare calendar data with events
-    calendar_data = []
-    for week in cal:
-        week_data = []
-        for day in week:
-            if day == 0:
-                week_data.append({'day': '', 'events': []})
-            else:
-                day_events = events.filter(start_date__day=day)
-                week_data.append({
-                    'day': day,
-                    'events': day_events
-                })
-        calendar_data.append(week_data)
-    
     # Navigation data
     prev_month = month - 1 if month > 1 else 12
     prev_year = year if month > 1 else year - 1
@@ -1570,8 +1414,6 @@ def church_calendar(request, church_id):
         'prev_year': prev_year,
         'next_month': next_month,
         'next_year': next_year,
-        'all_events': Event.objects.filter(church=church, is_public=True),
-        'all_ministries': Ministry.objects.filter(church=church, is_active=True),
         'is_church_site': True,
     }
     return render(request, 'core/church_calendar.html', context)
@@ -3439,14 +3281,10 @@ def cookies(request):
     return render(request, 'core/cookies.html')
 
 def leadership(request):
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
     leadership_page = None
     if LeadershipPage.objects.exists():
         leadership_page = LeadershipPage.objects.first()
     context = {
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'leadership_page': leadership_page,
     }
     return render(request, 'core/leadership.html', context)
@@ -3476,12 +3314,13 @@ def testimonies(request):
     else:
         form = TestimonyForm()
     
-    # Get approved testimonies
-    approved_testimonies = Testimony.objects.filter(is_approved=True).order_by('-created_at')
+    # Get approved testimonies, one keyset page at a time
+    approved_testimonies = listings.page_for_request(request, listings.testimonies(), listings.TESTIMONY_ORDERING)
     
     context = {
         'testimonies': approved_testimonies,
         'form': form,
+        'listing': listings.listing_context(request, 'testimonies', approved_testimonies),
     }
     return render(request, 'core/testimonies.html', context)
 
@@ -3546,27 +3385,23 @@ def prayer_request(request):
     else:
         form = PrayerRequestForm()
     
-    # Get approved prayer requests
-    prayer_requests = PrayerRequest.objects.filter(
-        is_approved=True, 
-        is_public=True
-    ).order_by('-created_at')
-    
-    # Filter by category if requested
+    # Get approved prayer requests (optionally one category), one keyset page at a time
     category_filter = request.GET.get('category', '')
-    if category_filter:
-        prayer_requests = prayer_requests.filter(category=category_filter)
+    prayer_requests = listings.page_for_request(
+        request, listings.prayer_requests(category_filter), listings.PRAYER_REQUEST_ORDERING,
+    )
     
     # Get answered prayers
     answered_prayers = PrayerRequest.objects.filter(
         is_approved=True,
         is_public=True,
         is_answered=True
-    ).order_by('-answered_date')
+    ).order_by('-answered_date')[:DEFAULT_PAGE_SIZE]
     
     context = {
         'form': form,
         'prayer_requests': prayer_requests,
+        'listing': listings.listing_context(request, 'prayer-requests', prayer_requests, category=category_filter),
         'answered_prayers': answered_prayers,
         'category_filter': category_filter,
         'submit_success': submit_success,
@@ -3738,13 +3573,11 @@ def all_event_highlights(request):
     highlights = EventHighlight.objects.all().order_by('-year')
     return render(request, 'core/all_event_highlights.html', {'highlights': highlights})
 
+@conditional_page(object_church_scope('News', 'news_id'))
 def news_detail(request, news_id):
     """Display individual news article detail"""
     news = get_object_or_404(News, id=news_id, is_public=True)
     
-    # Get navigation data
-    all_events = Event.objects.filter(is_public=True)
-    all_ministries = Ministry.objects.filter(is_public=True)
     
     # Get related news from the same church
     related_news = News.objects.filter(
@@ -3762,8 +3595,6 @@ def news_detail(request, news_id):
     
     context = {
         'news': news,
-        'all_events': all_events,
-        'all_ministries': all_ministries,
         'related_news': related_news,
         'church': news.church,
         'meta_description': meta_desc[:160],
@@ -3983,50 +3814,20 @@ def upload_test_endpoint(request):
         }, status=500)
 
 def health_check(request):
-    """Health check endpoint to diagnose database and application status"""
-    from django.http import JsonResponse
-    from django.db import connection
-    
+    """Health check endpoint: database state from the background monitor (core.db_health)"""
+    database = get_monitor().snapshot()
     health_status = {
-        'status': 'healthy',
+        'status': 'healthy' if database['available'] else 'unhealthy',
         'timestamp': timezone.now().isoformat(),
         'database': {
-            'connected': False,
-            'error': None
+            'connected': database['available'],
+            'error': database['last_error'],
+            'circuit': database['circuit'],
+            'consecutive_failures': database['consecutive_failures'],
+            'last_checked': database['last_checked'],
+            'latency_ms': database['latency_ms'],
         },
-        'models': {
-            'churches': 0,
-            'events': 0,
-            'ministries': 0
-        }
     }
-    
-    # Test database connection
-    try:
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            health_status['database']['connected'] = True
-            
-            # Test model queries
-            try:
-                health_status['models']['churches'] = Church.objects.count()
-            except Exception as e:
-                health_status['models']['churches'] = f"Error: {str(e)}"
-            
-            try:
-                health_status['models']['events'] = Event.objects.count()
-            except Exception as e:
-                health_status['models']['events'] = f"Error: {str(e)}"
-            
-            try:
-                health_status['models']['ministries'] = Ministry.objects.count()
-            except Exception as e:
-                health_status['models']['ministries'] = f"Error: {str(e)}"
-                
-    except Exception as e:
-        health_status['status'] = 'unhealthy'
-        health_status['database']['error'] = str(e)
-    
     return JsonResponse(health_status)
 
 def retry_database_operation(operation, max_retries=3, delay=1):
@@ -4127,65 +3928,32 @@ def startup_health_check(request):
         'database_independent_mode': os.environ.get('DATABASE_INDEPENDENT_MODE', '0') == '1',
         'services': {
             'application': 'running',
-            'database': 'unknown',  # Will be checked separately
+            'database': 'unknown',
             'storage': 'configured',
         },
         'message': 'Application is starting up'
     }
     
-    # Check database status in background (non-blocking)
-    try:
-        db_available, db_error = get_database_status()
-        health_status['services']['database'] = 'available' if db_available else 'unavailable'
-        if not db_available:
-            health_status['message'] = f'Database unavailable: {db_error}'
-    except Exception as e:
-        health_status['services']['database'] = 'error'
-        health_status['message'] = f'Database check failed: {str(e)}'
+    # Reported from the background monitor, never probed here
+    database = get_monitor().snapshot()
+    if database['circuit'] == 'unknown':
+        pass  # first probe still running
+    elif database['available']:
+        health_status['services']['database'] = 'available'
+    else:
+        health_status['services']['database'] = 'unavailable'
+        health_status['message'] = f"Database unavailable: {database['last_error']}"
     
     return JsonResponse(health_status)
 
 def is_database_available():
-    """Check if database is available without blocking"""
-    try:
-        from django.db import connection
-        with connection.cursor() as cursor:
-            cursor.execute("SELECT 1")
-            return True
-    except Exception:
-        return False
+    """Check if database is available without blocking (see core.db_health)"""
+    return get_monitor().available()
 
 def get_database_status():
-    """Get database status with timeout"""
-    import threading
-    import queue
-    
-    result_queue = queue.Queue()
-    
-    def check_db():
-        try:
-            from django.db import connection
-            with connection.cursor() as cursor:
-                cursor.execute("SELECT 1")
-                result_queue.put(('success', None))
-        except Exception as e:
-            result_queue.put(('error', str(e)))
-    
-    # Start database check in a separate thread
-    thread = threading.Thread(target=check_db)
-    thread.daemon = True
-    thread.start()
-    
-    # Wait for result with timeout
-    try:
-        thread.join(timeout=5)  # 5 second timeout
-        if thread.is_alive():
-            return False, "Database check timed out"
-        
-        status, error = result_queue.get_nowait()
-        return status == 'success', error
-    except queue.Empty:
-        return False, "Database check failed"
+    """(available, last error) from the background database monitor; never blocks"""
+    monitor = get_monitor()
+    return monitor.available(), monitor.last_error
 
 @require_POST
 def save_my_church(request):
@@ -4249,97 +4017,93 @@ def analytics_dashboard(request):
     if not (request.user.is_staff or is_church_admin):
         return redirect('admin:login')
     
-    from .analytics_models import VisitorSession, PageView, AnalyticsSettings
+    from .analytics_models import AnalyticsDailyRollup, AnalyticsSettings
+    from .analytics_rollup import rollup_watermark
     
-    # Get date range (last 30 days by default)
+    # Get date range (last 30 days by default, or ?start=YYYY-MM-DD&end=YYYY-MM-DD)
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
+    try:
+        if request.GET.get('start'):
+            start_date = timezone.make_aware(datetime.strptime(request.GET['start'], '%Y-%m-%d'))
+        if request.GET.get('end'):
+            end_date = timezone.make_aware(datetime.strptime(request.GET['end'], '%Y-%m-%d'))
+    except ValueError:
+        pass
     
     # Get analytics settings
     settings = AnalyticsSettings.get_settings()
     
-    # Basic stats
-    total_sessions = VisitorSession.objects.filter(started_at__gte=start_date).count()
-    total_page_views = PageView.objects.filter(viewed_at__gte=start_date).count()
-    unique_visitors = VisitorSession.objects.filter(started_at__gte=start_date).values('ip_address').distinct().count()
+    # Everything below is summed from daily rollups (manage.py rollup_analytics),
+    # never from raw VisitorSession/PageView rows.
+    rollups = AnalyticsDailyRollup.objects.filter(
+        day__gte=timezone.localtime(start_date).date(),
+        day__lte=timezone.localtime(end_date).date(),
+    )
     
-    # Average session duration
-    completed_sessions = VisitorSession.objects.filter(
-        started_at__gte=start_date,
-        ended_at__isnull=False
+    def top_values(dimension, key, metric='sessions', label='count', limit=10):
+        rows = rollups.filter(dimension=dimension).values('value').annotate(
+            total=Sum(metric)
+        ).order_by('-total')
+        if limit:
+            rows = rows[:limit]
+        return [{key: row['value'], label: row['total']} for row in rows]
+    
+    # Basic stats (unique visitors = distinct IPs per day, summed over the range)
+    site = rollups.filter(dimension='site').aggregate(
+        sessions=Sum('sessions'),
+        page_views=Sum('page_views'),
+        unique_visitors=Sum('unique_visitors'),
+        completed=Sum('completed_sessions'),
+        duration=Sum('duration_total'),
     )
-    avg_duration = completed_sessions.aggregate(avg_duration=Avg('duration'))['avg_duration'] or 0
-    
-    # Device breakdown
-    device_stats = VisitorSession.objects.filter(started_at__gte=start_date).values('device_type').annotate(
-        count=Count('id')
-    ).order_by('-count')
-    
-    # Browser breakdown
-    browser_stats = VisitorSession.objects.filter(
-        started_at__gte=start_date,
-        browser__isnull=False
-    ).exclude(browser='').values('browser').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
-    
-    # Top countries
-    country_stats = VisitorSession.objects.filter(
-        started_at__gte=start_date,
-        country__isnull=False
-    ).exclude(country='').values('country').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
-    
-    # Top pages
-    page_stats = PageView.objects.filter(viewed_at__gte=start_date).values('path').annotate(
-        views=Count('id')
-    ).order_by('-views')[:10]
+    total_sessions = site['sessions'] or 0
+    total_page_views = site['page_views'] or 0
+    unique_visitors = site['unique_visitors'] or 0
+    
+    # Average session duration
+    avg_duration = (site['duration'] or 0) / site['completed'] if site['completed'] else 0
+    
+    # Device, browser, country, page and referrer breakdowns
+    device_stats = top_values('device', 'device_type', limit=None)
+    browser_stats = top_values('browser', 'browser')
+    country_stats = top_values('country', 'country')
+    page_stats = top_values('page', 'path', metric='page_views', label='views')
+    referrer_stats = top_values('referrer', 'referrer_domain')
     
     # Daily visitors chart data
-    daily_visitors = VisitorSession.objects.filter(
-        started_at__gte=start_date
-    ).annotate(
-        date=TruncDate('started_at')
-    ).values('date').annotate(
-        visitors=Count('id')
-    ).order_by('date')
+    daily_visitors = [
+        {'date': row['day'], 'visitors': row['sessions']}
+        for row in rollups.filter(dimension='site').values('day', 'sessions').order_by('day')
+    ]
     
     # Hourly activity
-    hourly_activity = VisitorSession.objects.filter(
-        started_at__gte=start_date
-    ).annotate(
-        hour=TruncHour('started_at')
-    ).values('hour').annotate(
-        sessions=Count('id')
-    ).order_by('hour')
-    
-    # Top referrers
-    referrer_stats = VisitorSession.objects.filter(
-        started_at__gte=start_date,
-        referrer_domain__isnull=False
-    ).exclude(referrer_domain='').values('referrer_domain').annotate(
-        count=Count('id')
-    ).order_by('-count')[:10]
+    hourly_activity = [
+        {
+            'hour': timezone.make_aware(datetime.combine(row['day'], time(int(row['value'])))),
+            'sessions': row['sessions'],
+        }
+        for row in rollups.filter(dimension='hour').values('day', 'value').annotate(
+            sessions=Sum('sessions')
+        ).order_by('day', 'value')
+    ]
     
     # Church-specific stats (if applicable)
     church_stats = None
     if request.user.is_superuser:
-        church_stats = VisitorSession.objects.filter(
-            started_at__gte=start_date,
+        church_stats = rollups.filter(
+            dimension='total',
             church__isnull=False
         ).values('church__name').annotate(
-            sessions=Count('id'),
-            page_views=Count('page_views_count')
+            sessions=Sum('sessions'),
+            page_views=Sum('page_views')
         ).order_by('-sessions')[:10]
     
-    # Get visitor sessions for map (with coordinates)
-    visitor_sessions = VisitorSession.objects.filter(
-        started_at__gte=start_date,
-        country__isnull=False
-    ).exclude(country='').values('country', 'city').annotate(
-        count=Count('id')
-    ).order_by('-count')[:20]
+    # Get visitor locations for map
+    visitor_sessions = []
+    for row in top_values('location', 'location', limit=20):
+        country, _, city = row['location'].partition('|')
+        visitor_sessions.append({'country': country, 'city': city, 'count': row['count']})
     
     # Add sample coordinates for countries (you can enhance this with a proper geocoding service)
     country_coordinates = {
@@ -4384,6 +4148,7 @@ def analytics_dashboard(request):
         'start_date': start_date,
         'end_date': end_date,
         'settings': settings,
+        'rollup_watermark': rollup_watermark(),
     }
     
     return render(request, 'core/analytics_dashboard.html', context)
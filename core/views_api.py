@@ -0,0 +1,258 @@
+"""
+Public REST API, version 1 (/api/v1/).
+
+Read-only list endpoints for churches, events, ministries, news and sermons,
+meant to be polled by the PWA and by third-party church apps:
+
+- keyset pagination: ?limit=20&cursor=<next_cursor>, no COUNT(*) and every
+  page costs the same (see core.pagination);
+- filters: ?church=<uuid>, ?date_from=/?date_to=YYYY-MM-DD (events, news,
+  sermons), ?featured=true, ?updated_since=<ISO datetime>; staff may also
+  pass ?is_public=false|all, everyone else only sees public items;
+- sparse fieldsets: ?fields=id,title,date (only those columns are loaded);
+- ETag / If-None-Match and Last-Modified / If-Modified-Since (see
+  core.conditional): an unchanged poll is answered with 304 before the
+  list query runs.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from rest_framework import generics
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
+from rest_framework.utils.urls import replace_query_param
+
+from . import conditional
+from .listings import parse_date
+from .models import Church, Event, Ministry, News, Sermon
+from .pagination import CursorError, paginate
+from .serializers import (
+    ChurchV1Serializer, EventV1Serializer, MinistryV1Serializer, NewsV1Serializer, SermonV1Serializer,
+)
+
+DEFAULT_LIMIT = 20
+TRUE_VALUES = ('1', 'true', 'yes')
+FALSE_VALUES = ('0', 'false', 'no')
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination backed by core.pagination (ordering from ``view.ordering``)."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': ['Must be an integer.']})
+        try:
+            self.page = paginate(queryset, view.ordering, request.query_params.get('cursor'), limit)
+        except CursorError as exc:
+            raise ValidationError({'cursor': [str(exc)]})
+        self.request = request
+        return self.page.items
+
+    def get_next_link(self):
+        if not self.page.has_next:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), 'cursor', self.page.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'next_cursor': self.page.next_cursor,
+            'results': data,
+        })
+
+
+def _flag(request, name):
+    value = request.query_params.get(name)
+    if value is None or value == '':
+        return None
+    value = value.lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValidationError({name: ['Use true or false.']})
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class V1ListView(generics.ListAPIView):
+    """
+    Base of the v1 list endpoints. Subclasses set ``serializer_class``,
+    ``ordering`` and ``date_field`` and implement ``base_queryset()``.
+    """
+    renderer_classes = [JSONRenderer]
+    pagination_class = KeysetPagination
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'api_v1'
+    ordering = ('id',)
+    date_field = None
+    church_lookup = 'church_id'
+
+    def base_queryset(self):
+        raise NotImplementedError
+
+    def requested_fields(self):
+        """Fields from ?fields=, or None for all of them."""
+        if not hasattr(self, '_requested_fields'):
+            value = self.request.query_params.get('fields', '')
+            fields = [name.strip() for name in value.split(',') if name.strip()] or None
+            if fields:
+                unknown = sorted(set(fields) - set(self.serializer_class.Meta.fields))
+                if unknown:
+                    raise ValidationError({'fields': [f"Unknown field(s): {', '.join(unknown)}"]})
+            self._requested_fields = fields
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs['fields'] = self.requested_fields()
+        return super().get_serializer(*args, **kwargs)
+
+    def church_id(self):
+        value = self.request.query_params.get('church')
+        if not value:
+            return None
+        try:
+            return Church._meta.pk.to_python(value)
+        except DjangoValidationError:
+            raise ValidationError({'church': ['Not a valid church id.']})
+
+    def get_queryset(self):
+        queryset = self.base_queryset()
+        fields = self.requested_fields() or self.serializer_class.Meta.fields
+        lookups = self.serializer_class.model_fields(fields)
+        lookups.update(name.lstrip('-') for name in self.ordering)
+        if any('__' in lookup for lookup in lookups):
+            queryset = queryset.select_related('church')
+        return queryset.only(*lookups)
+
+    def filter_queryset(self, queryset):
+        params = self.request.query_params
+        church_id = self.church_id()
+        if church_id:
+            queryset = queryset.filter(**{self.church_lookup: church_id})
+
+        queryset = self.filter_visibility(queryset)
+
+        featured = _flag(self.request, 'featured')
+        if featured is not None:
+            queryset = queryset.filter(is_featured=featured)
+
+        updated_since = params.get('updated_since')
+        if updated_since:
+            try:
+                since = parse_datetime(updated_since)
+            except ValueError:
+                since = None
+            if since is None:
+                raise ValidationError({'updated_since': ['Use an ISO 8601 date-time.']})
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            queryset = queryset.filter(updated_at__gte=since)
+
+        if self.date_field:
+            bounds = {}
+            for name in ('date_from', 'date_to'):
+                if params.get(name):
+                    bounds[name] = parse_date(params[name])
+                    if bounds[name] is None:
+                        raise ValidationError({name: ['Use YYYY-MM-DD.']})
+            queryset = self.filter_dates(queryset, bounds.get('date_from'), bounds.get('date_to'))
+        return queryset
+
+    def filter_visibility(self, queryset):
+        """Public items only, unless a staff user asks for ?is_public=false or all."""
+        is_public = self.request.query_params.get('is_public', '').lower()
+        if not self.request.user.is_staff or not is_public or is_public in TRUE_VALUES:
+            return queryset.filter(is_public=True)
+        if is_public in FALSE_VALUES:
+            return queryset.filter(is_public=False)
+        if is_public != 'all':
+            raise ValidationError({'is_public': ['Use true, false or all.']})
+        return queryset
+
+    def filter_dates(self, queryset, date_from, date_to):
+        if date_from:
+            queryset = queryset.filter(**{f'{self.date_field}__gte': date_from})
+        if date_to:
+            queryset = queryset.filter(**{f'{self.date_field}__lte': date_to})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        etag, modified = conditional.validators(request, self.church_id(), vary=request.user.is_staff)
+        response = conditional.not_modified(request, etag, modified) if etag else None
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        if etag and response.status_code in (200, 304):
+            conditional.set_validators(response, etag, modified)
+            max_age = getattr(settings, 'API_CACHE_MAX_AGE', 60)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, max_age=max_age)
+            else:
+                patch_cache_control(response, public=True, max_age=max_age)
+        return response
+
+
+class ChurchListView(V1ListView):
+    serializer_class = ChurchV1Serializer
+    ordering = ('name', 'id')
+    church_lookup = 'id'
+
+    def base_queryset(self):
+        return Church.objects.filter(is_approved=True, is_active=True)
+
+    def filter_visibility(self, queryset):
+        return queryset  # approved and active churches are public
+
+
+class EventListView(V1ListView):
+    serializer_class = EventV1Serializer
+    ordering = ('start_date', 'id')
+    date_field = 'start_date'
+
+    def base_queryset(self):
+        return Event.objects.filter(church__is_approved=True, church__is_active=True)
+
+    def filter_dates(self, queryset, date_from, date_to):
+        # Events that overlap the range
+        if date_from:
+            queryset = queryset.filter(end_date__gte=_day_start(date_from))
+        if date_to:
+            queryset = queryset.filter(start_date__lt=_day_start(date_to + timedelta(days=1)))
+        return queryset
+
+
+class MinistryListView(V1ListView):
+    serializer_class = MinistryV1Serializer
+    ordering = ('name', 'id')
+
+    def base_queryset(self):
+        return Ministry.objects.filter(is_active=True, church__is_approved=True, church__is_active=True)
+
+
+class NewsListView(V1ListView):
+    serializer_class = NewsV1Serializer
+    ordering = ('-date', '-created_at', 'id')
+    date_field = 'date'
+
+    def base_queryset(self):
+        return News.objects.filter(church__is_approved=True, church__is_active=True)
+
+
+class SermonListView(V1ListView):
+    serializer_class = SermonV1Serializer
+    ordering = ('-date', '-created_at', 'id')
+    date_field = 'date'
+
+    def base_queryset(self):
+        return Sermon.objects.filter(church__is_approved=True, church__is_active=True)
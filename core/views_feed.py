@@ -0,0 +1,53 @@
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.template.loader import render_to_string
+from django.views.decorators.http import require_GET
+
+from .listings import LISTINGS
+from .models import Church
+from .pagination import DEFAULT_PAGE_SIZE, CursorError, paginate
+
+
+@require_GET
+def listing_feed(request, name):
+    """
+    Next page of a public listing for infinite scroll:
+    ?cursor=...&limit=12&church=<uuid>&card=watch plus the listing's filters.
+    Returns the items as JSON, the rendered cards and the next cursor (null on
+    the last page).
+    """
+    listing = LISTINGS.get(name)
+    if listing is None:
+        return JsonResponse({'error': 'Unknown listing'}, status=404)
+
+    church = None
+    church_id = request.GET.get('church')
+    if church_id:
+        try:
+            church = Church.objects.filter(id=church_id, is_approved=True, is_active=True).first()
+        except ValidationError:
+            return JsonResponse({'error': 'Invalid church id'}, status=400)
+        if church is None:
+            return JsonResponse({'error': 'Unknown church'}, status=404)
+
+    card = listing['cards'].get(request.GET.get('card', 'default'))
+    if card is None:
+        return JsonResponse({'error': 'Unknown card'}, status=400)
+    try:
+        limit = int(request.GET.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+
+    try:
+        page = paginate(listing['queryset'](request.GET), listing['ordering'], request.GET.get('cursor'), limit)
+    except CursorError as exc:
+        return JsonResponse({'error': str(exc)}, status=400)
+
+    serialize = listing['json']
+    return JsonResponse({
+        'results': [serialize(obj) for obj in page],
+        'next_cursor': page.next_cursor,
+        'html': ''.join(
+            render_to_string(card, {listing['item_name']: obj, 'church': church}, request=request) for obj in page
+        ),
+    })
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .metrics import render_text
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and constant_time_compare(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+        return True
+    return request.user.is_staff
+
+
+@require_GET
+def metrics(request):
+    """/metrics: Prometheus text format, for staff users or a scraper with METRICS_TOKEN."""
+    if not _authorized(request):
+        return HttpResponseForbidden('Forbidden')
+    return HttpResponse(render_text(), content_type='text/plain; version=0.0.4; charset=utf-8')
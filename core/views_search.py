@@ -0,0 +1,80 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.views.decorators.http import require_GET
+
+from .models import Church
+from .search import INDEXED_MODELS, MAX_RESULTS, search as run_search
+
+PAGE_SIZE = 20
+
+
+def _search_params(request):
+    query = request.GET.get('q', '').strip()
+    kinds = [k for k in request.GET.getlist('type') if k in INDEXED_MODELS.values()]
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        page = 1
+    try:
+        limit = min(int(request.GET.get('limit', PAGE_SIZE)), MAX_RESULTS)
+    except ValueError:
+        limit = PAGE_SIZE
+    return query, kinds, page, max(1, limit)
+
+
+def _results(request, church=None):
+    query, kinds, page, limit = _search_params(request)
+    # One extra row tells whether there is a next page
+    hits = run_search(query, church_id=church.id if church else None, kinds=kinds, limit=limit + 1, offset=(page - 1) * limit)
+    return query, kinds, page, hits[:limit], len(hits) > limit
+
+
+@require_GET
+def search(request, church_id=None):
+    """Site-wide search page, or one church's when church_id is given."""
+    church = get_object_or_404(Church, id=church_id, is_approved=True, is_active=True) if church_id else None
+    query, kinds, page, results, has_next = _results(request, church)
+    context = {
+        'church': church,
+        'query': query,
+        'kinds': kinds,
+        'kind_choices': [(kind, kind.capitalize()) for kind in INDEXED_MODELS.values()],
+        'results': results,
+        'page': page,
+        'has_next': has_next,
+        'is_church_site': church is not None,
+        'meta_robots': 'noindex, follow',
+    }
+    return render(request, 'core/search.html', context)
+
+
+@require_GET
+def search_api(request):
+    """JSON search: ?q=...&church=<uuid>&type=sermon&type=event&page=2&limit=20"""
+    church = None
+    church_id = request.GET.get('church')
+    if church_id:
+        try:
+            church = Church.objects.filter(id=church_id, is_approved=True, is_active=True).first()
+        except Exception:
+            church = None
+        if church is None:
+            return JsonResponse({'error': 'Unknown church'}, status=404)
+    query, kinds, page, results, has_next = _results(request, church)
+    return JsonResponse({
+        'query': query,
+        'page': page,
+        'has_next': has_next,
+        'results': [
+            {
+                'type': hit['kind'],
+                'id': hit['id'],
+                'church_id': hit['church_id'],
+                'title': hit['title'],
+                'date': hit['date'].isoformat() if hit['date'] else None,
+                'snippet': str(hit['snippet']),
+                'url': request.build_absolute_uri(hit['url']),
+            }
+            for hit in results
+        ],
+    })
@@ -0,0 +1,43 @@
+import hashlib
+
+from django.http import FileResponse, Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+
+from . import sitemap_files
+
+
+def _serve(request, filename, content_type):
+    """File bytes with an ETag (size and mtime) and Last-Modified (the content's lastmod); 304 when current."""
+    path = sitemap_files.root() / filename
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise Http404('No such sitemap')
+    etag = quote_etag(hashlib.sha1(f'{filename}:{stat.st_size}:{stat.st_mtime_ns}'.encode()).hexdigest())
+    lastmod = sitemap_files.last_modified(filename)
+    modified = int(lastmod.timestamp()) if lastmod else None
+    response = get_conditional_response(request, etag=etag, last_modified=modified)
+    if response is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    response['ETag'] = etag
+    if modified:
+        response['Last-Modified'] = http_date(modified)
+    response['X-Robots-Tag'] = 'noindex, noodp, noarchive'
+    return response
+
+
+@require_GET
+def sitemap_index(request):
+    """/sitemap.xml: the precomputed index (rebuilt first if content changed)."""
+    sitemap_files.ensure_current()
+    return _serve(request, sitemap_files.INDEX_NAME, 'application/xml')
+
+
+@require_GET
+def sitemap_file(request, filename):
+    """/sitemaps/sitemap-<section>-<page>.xml.gz"""
+    if not sitemap_files.FILE_NAME_RE.match(filename):
+        raise Http404('No such sitemap')
+    return _serve(request, filename, 'application/gzip')
@@ -0,0 +1,74 @@
+/**
+ * Infinite scroll for keyset-paginated listings.
+ *
+ * A "Load more" link with data-feed-more="<container id>" points at the next
+ * page; the container carries data-feed-url (the /api/feed/ endpoint) and
+ * data-next-cursor. When the link scrolls into view (or is clicked) the next
+ * cards are fetched as HTML and appended; a "feed:appended" event with the new
+ * elements lets page scripts wire them up. Without JS the link still works.
+ */
+(function () {
+  function init(link) {
+    var container = document.getElementById(link.getAttribute('data-feed-more'));
+    if (!container || !container.getAttribute('data-feed-url') || !window.fetch) return;
+    var cursor = container.getAttribute('data-next-cursor');
+    var loading = false;
+    var observer = null;
+
+    function done() {
+      if (observer) observer.disconnect();
+      link.parentNode.removeChild(link);
+    }
+
+    function load() {
+      if (loading || !cursor) return;
+      loading = true;
+      var base = container.getAttribute('data-feed-url');
+      var url = base + (base.indexOf('?') === -1 ? '?' : '&') + 'cursor=' + encodeURIComponent(cursor);
+      fetch(url, { headers: { 'Accept': 'application/json' }, credentials: 'same-origin' })
+        .then(function (response) {
+          if (!response.ok) throw new Error('HTTP ' + response.status);
+          return response.json();
+        })
+        .then(function (data) {
+          var holder = document.createElement('div');
+          holder.innerHTML = data.html;
+          var added = Array.prototype.slice.call(holder.children);
+          added.forEach(function (el) { container.appendChild(el); });
+          container.dispatchEvent(new CustomEvent('feed:appended', { detail: { items: added } }));
+          cursor = data.next_cursor;
+          loading = false;
+          if (!cursor) return done();
+          link.href = link.href.replace(/([?&]cursor=)[^&]*/, '$1' + encodeURIComponent(cursor));
+        })
+        .catch(function () {
+          // Leave the plain link to the next page in place
+          if (observer) observer.disconnect();
+          loading = false;
+          cursor = null;
+        });
+    }
+
+    link.addEventListener('click', function (e) {
+      if (!cursor) return;
+      e.preventDefault();
+      load();
+    });
+    if ('IntersectionObserver' in window) {
+      observer = new IntersectionObserver(function (entries) {
+        if (entries.some(function (entry) { return entry.isIntersecting; })) load();
+      }, { rootMargin: '600px 0px' });
+      observer.observe(link);
+    }
+  }
+
+  function start() {
+    Array.prototype.forEach.call(document.querySelectorAll('[data-feed-more]'), init);
+  }
+
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', start);
+  } else {
+    start();
+  }
+})();